@@ -1,15 +1,71 @@
+from django import forms
 from django.contrib import admin
 from django.contrib import messages
+from django.db import transaction
 from django.http import HttpRequest
-from .models import AttendanceLog, SyncState
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from .models import AttendanceLog, SyncState, WebhookEndpoint
+from .services import snapshots
+from .services.usb_import import stage_upload
+from .tasks.usb_import import import_usb_file_task
 from .tasks.sync import run_sync_job
 
 
+class USBImportForm(forms.Form):
+    export_file = forms.FileField(label="ملف التصدير (attlog.dat)")
+
+
 @admin.register(AttendanceLog)
 class AttendanceLogAdmin(admin.ModelAdmin):
     list_display = ("employee", "check_time", "log_type", "source", "created_at")
     list_filter = ("log_type", "source")
     search_fields = ("employee__employee_id", "employee__full_name")
+    change_list_template = "admin/attendance/attendancelog/change_list.html"
+
+    def get_urls(self):
+        urls = [
+            path(
+                "import-usb/",
+                self.admin_site.admin_view(self.import_usb_view),
+                name="attendance_attendancelog_import_usb",
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            snapshots.logs_changed(AttendanceLog.objects.filter(pk=obj.pk))
+            super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            snapshots.logs_changed(queryset)
+            super().delete_queryset(request, queryset)
+
+    def import_usb_view(self, request: HttpRequest):
+        if not self.has_add_permission(request):
+            return redirect("admin:attendance_attendancelog_changelist")
+        form = USBImportForm(request.POST or None, request.FILES or None)
+        if request.method == "POST" and form.is_valid():
+            upload = form.cleaned_data["export_file"]
+            # A large export takes minutes; the worker imports it from the staged copy.
+            path = stage_upload(upload)
+            import_usb_file_task.delay(str(path), f"usb:{upload.name}")
+            self.message_user(
+                request,
+                f"تمت جدولة استيراد {upload.name}؛ تظهر السجلات عند انتهاء المهمة (راجع سجلات العامل).",
+                level=messages.INFO,
+            )
+            return redirect("admin:attendance_attendancelog_changelist")
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "form": form,
+            "title": "استيراد ملف تصدير USB",
+        }
+        return TemplateResponse(request, "admin/attendance/attendancelog/import_usb.html", context)
 
 
 @admin.register(SyncState)
@@ -22,4 +78,12 @@ class SyncStateAdmin(admin.ModelAdmin):
         run_sync_job()
         self.message_user(request, "تم تشغيل مهمة المزامنة بنجاح (راجع السجلات).", level=messages.INFO)
 
-    run_sync_now.short_description = "تشغيل المزامنة الآن"
\ No newline at end of file
+    run_sync_now.short_description = "تشغيل المزامنة الآن"
+
+
+@admin.register(WebhookEndpoint)
+class WebhookEndpointAdmin(admin.ModelAdmin):
+    list_display = ("name", "url", "is_active", "last_event_id", "failures", "next_attempt_at", "updated_at")
+    list_filter = ("is_active",)
+    search_fields = ("name", "url")
+    readonly_fields = ("last_event_id", "failures", "next_attempt_at", "last_error", "updated_at")
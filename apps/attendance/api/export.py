@@ -0,0 +1,108 @@
+"""Streaming bodies for ``/api/attendance-logs/export``.
+
+Rows are encoded a chunk at a time as they come off a server-side cursor, so
+memory stays flat whatever the range and the first bytes leave before the
+query has finished. Each row is the list serializer's representation (see
+``apps/core/fastjson.py``), as one JSON object per line or one CSV record.
+"""
+from __future__ import annotations
+import csv
+from io import StringIO
+from typing import Iterable, Iterator
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+
+from apps.core import fastjson
+
+# Rows fetched from the cursor and written per chunk.
+CHUNK_ROWS = 2000
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Selects ``?format=ndjson``; the export streams its own body, errors come out as one line."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return fastjson.dumps(data) + b"\n"
+
+
+class CSVRenderer(BaseRenderer):
+    """Selects ``?format=csv``; error payloads come out as a header and one record."""
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not isinstance(data, dict):
+            data = {"detail": data}
+        buffer = StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(list(data))
+        writer.writerow([str(value) for value in data.values()])
+        return buffer.getvalue().encode(self.charset)
+
+
+def _batches(rows: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def ndjson_chunks(plan: fastjson.Plan, rows: Iterable) -> Iterator[bytes]:
+    for batch in _batches(rows, CHUNK_ROWS):
+        yield b"".join(fastjson.dumps(plan.one(row)) + b"\n" for row in batch)
+
+
+def csv_chunks(plan: fastjson.Plan, rows: Iterable) -> Iterator[bytes]:
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _, _ in plan.items])
+    # The header goes out before the first fetch.
+    yield buffer.getvalue().encode()
+    for batch in _batches(rows, CHUNK_ROWS):
+        buffer.seek(0)
+        buffer.truncate()
+        for row in batch:
+            writer.writerow(["" if value is None else value for value in plan.one(row).values()])
+        yield buffer.getvalue().encode()
+
+
+async def _aiter(chunks: Iterator[bytes]):
+    # The cursor belongs to the request's sync thread; pull every chunk there.
+    end = object()
+    pull = sync_to_async(next, thread_sensitive=True)
+    try:
+        while True:
+            chunk = await pull(chunks, end)
+            if chunk is end:
+                return
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close, thread_sensitive=True)()
+
+
+def stream(request, chunks: Iterator[bytes], content_type: str, filename: str) -> StreamingHttpResponse:
+    """Chunked response over ``chunks`` that is consumed lazily under both WSGI and ASGI.
+
+    Django buffers a sync iterator completely when serving ASGI (and an async
+    one under WSGI), so the iterator type follows the handler.
+    """
+    if isinstance(getattr(request, "_request", request), ASGIRequest):
+        chunks = _aiter(chunks)
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response["Content-Disposition"] = f"attachment; filename={filename}"
+    # Let a buffering reverse proxy pass chunks through as they are written.
+    response["X-Accel-Buffering"] = "no"
+    return response
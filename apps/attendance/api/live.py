@@ -0,0 +1,93 @@
+"""``GET /api/live``: a server-sent event stream of ``services/live.py`` events.
+
+The view authenticates and checks permissions like any other endpoint, then
+returns an async iterator that the ASGI server drives on its event loop: an
+open stream holds one Redis subscription and no worker thread or database
+connection. Frames are relayed as published, filtered by ``?events=``.
+"""
+from __future__ import annotations
+import asyncio
+from typing import AsyncIterator, FrozenSet, Optional
+
+import redis.asyncio as aioredis
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.attendance.services import live
+from apps.core.permissions import IsAuditorOrReadOnly, IsDeptManagerReadOnly
+
+# Reconnection delay suggested to EventSource clients, in milliseconds.
+RETRY_MS = 3000
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Selects ``text/event-stream`` (what EventSource sends); errors come out as one ``error`` event."""
+
+    media_type = "text/event-stream"
+    format = "event-stream"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return live.frame("error", data)
+
+
+async def _frames(events: Optional[FrozenSet[str]], keepalive: float) -> AsyncIterator[bytes]:
+    client = aioredis.Redis.from_url(settings.REDIS_URL)
+    pubsub = client.pubsub()
+    loop = asyncio.get_running_loop()
+    try:
+        await pubsub.subscribe(live.CHANNEL)
+        yield f"retry: {RETRY_MS}\n\n".encode()
+        written = loop.time()
+        while True:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=keepalive)
+            if message is not None and (events is None or live.event_name(message["data"]) in events):
+                yield message["data"]
+                written = loop.time()
+            elif loop.time() - written >= keepalive:
+                yield b": keepalive\n\n"
+                written = loop.time()
+    finally:
+        # Runs when the client disconnects (the response is cancelled).
+        await pubsub.aclose()
+        await client.aclose()
+
+
+class LiveEventsView(APIView):
+    """New punches, presence changes and sync outcomes as they happen.
+
+    ``?events=punches,presence,sync`` selects event types (default: all).
+    Needs ``REDIS_URL`` and the ASGI server; a WSGI server would buffer the
+    never-ending body.
+    """
+
+    permission_classes = [IsAuthenticated, IsDeptManagerReadOnly, IsAuditorOrReadOnly]
+    renderer_classes = [EventStreamRenderer, JSONRenderer]
+
+    def get(self, request, *args, **kwargs):
+        events = None
+        raw = request.query_params.get("events")
+        if raw:
+            events = frozenset(name.strip() for name in raw.split(",") if name.strip())
+            unknown = sorted(events - set(live.EVENTS))
+            if unknown or not events:
+                return Response(
+                    {"detail": f"unknown event(s) {', '.join(unknown) or '(none)'}; available: {', '.join(live.EVENTS)}"},
+                    status=400,
+                )
+        if not live.enabled():
+            return Response({"detail": "live events need REDIS_URL"}, status=503)
+        if not isinstance(request._request, ASGIRequest):
+            return Response({"detail": "live events are served by the ASGI server only"}, status=501)
+
+        keepalive = float(getattr(settings, "LIVE_EVENTS_KEEPALIVE_SECONDS", 15))
+        response = StreamingHttpResponse(_frames(events, keepalive), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        # Let a buffering reverse proxy pass events through as they are written.
+        response["X-Accel-Buffering"] = "no"
+        return response
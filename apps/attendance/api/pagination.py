@@ -0,0 +1,173 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination on ``(<ordering field>, id)`` for attendance logs.
+
+    Each page is ``WHERE (check_time, id) < (last check_time, last id)`` (or
+    ``>`` ascending) ``ORDER BY check_time, id LIMIT page_size + 1``: it walks
+    ``idx_att_time`` from the cursor, so page N costs the same as page 1, and no
+    ``COUNT(*)`` is run. Rows arriving meanwhile never shift a page.
+
+    ``cursor`` is URL-safe base64 of ``{"v": 1, "k": [<iso value>, <id>], "r": <bool>}``;
+    ``r`` marks a "previous" link, which reads backwards from the key.
+    ``page_size`` defaults to ``ATTENDANCE_LOGS_PAGE_SIZE`` and is capped at
+    ``ATTENDANCE_LOGS_MAX_PAGE_SIZE``.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    version = 1
+
+    def paginate_queryset(self, queryset, request, view=None, extra_rows=()):
+        """One page of ``queryset`` (or a list), merged with ``extra_rows`` such as archived logs.
+
+        Rows may be model instances or ``values()`` dicts that include ``id``
+        and the ordering field. ``extra_rows`` may be a callable
+        ``(field, key, backwards, limit)`` returning the rows for this page, so
+        a large source is read from the cursor on instead of in full.
+        """
+        self.request = request
+        self.page_size = self._page_size(request)
+        self.field, self.descending = self._ordering(request, queryset, view)
+        key, reverse = self._decode(request.query_params.get(self.cursor_query_param))
+        # A "previous" page is read in the opposite direction and flipped back.
+        backwards = self.descending != reverse
+
+        if isinstance(queryset, list):
+            rows = self._page_of_list(queryset, key, backwards)
+        else:
+            rows = self._page_of_queryset(queryset, key, backwards)
+        if callable(extra_rows):
+            extra_rows = extra_rows(self.field, key, backwards, self.page_size + 1)
+        if extra_rows:
+            rows = self._page_of_list(rows + list(extra_rows), key, backwards)
+
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+        self.rows = rows
+        self.has_next = has_more if not reverse else key is not None
+        self.has_previous = key is not None if not reverse else has_more
+        return rows
+
+    def get_paginated_data(self, data):
+        return OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data),
+        ])
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or not self.rows:
+            return None
+        return self._link(self.rows[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.rows:
+            return None
+        return self._link(self.rows[0], reverse=True)
+
+    def _page_size(self, request) -> int:
+        default = int(getattr(settings, "ATTENDANCE_LOGS_PAGE_SIZE", 100))
+        maximum = int(getattr(settings, "ATTENDANCE_LOGS_MAX_PAGE_SIZE", 1000))
+        raw = request.query_params.get(self.page_size_query_param)
+        if not raw:
+            return min(default, maximum)
+        try:
+            size = int(raw)
+        except ValueError:
+            raise ValidationError({self.page_size_query_param: "must be an integer"})
+        if size < 1:
+            raise ValidationError({self.page_size_query_param: "must be positive"})
+        return min(size, maximum)
+
+    @staticmethod
+    def _ordering(request, queryset, view):
+        if isinstance(queryset, list):
+            queryset = view.get_queryset()
+        ordering = filters.OrderingFilter().get_ordering(request, queryset, view) or view.ordering
+        field = ordering[0]
+        return field.lstrip("-"), field.startswith("-")
+
+    def _decode(self, cursor):
+        if not cursor:
+            return None, False
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            if data.get("v") != self.version:
+                raise ValueError("unsupported cursor version")
+            value, last_id = data["k"]
+            value = parse_datetime(value)
+            if value is None:
+                raise ValueError("bad cursor value")
+            return (value, int(last_id)), bool(data.get("r"))
+        except (ValueError, KeyError, TypeError, UnicodeError):
+            raise ValidationError({self.cursor_query_param: "invalid cursor"})
+
+    def _key(self, row):
+        if isinstance(row, dict):
+            return row[self.field], row["id"]
+        return getattr(row, self.field), row.id
+
+    def _encode(self, row, reverse: bool) -> str:
+        value, last_id = self._key(row)
+        data = {"v": self.version, "k": [value.isoformat(), last_id], "r": reverse}
+        raw = json.dumps(data, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    def _link(self, row, reverse: bool) -> str:
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, self._encode(row, reverse))
+
+    def _page_of_queryset(self, queryset, key, backwards: bool):
+        field = self.field
+        if key is not None:
+            value, last_id = key
+            op = "lt" if backwards else "gt"
+            # The plain range bound lets the planner scan the index from the cursor.
+            bound = "lte" if backwards else "gte"
+            queryset = queryset.filter(
+                Q(**{f"{field}__{bound}": value}),
+                Q(**{f"{field}__{op}": value}) | Q(**{field: value, f"id__{op}": last_id}),
+            )
+        prefix = "-" if backwards else ""
+        return list(queryset.order_by(f"{prefix}{field}", f"{prefix}id")[: self.page_size + 1])
+
+    def _page_of_list(self, rows, key, backwards: bool):
+        sort_key = self._key
+        if key is not None:
+            if backwards:
+                rows = [row for row in rows if sort_key(row) < key]
+            else:
+                rows = [row for row in rows if sort_key(row) > key]
+        rows = sorted(rows, key=sort_key, reverse=backwards)
+        return rows[: self.page_size + 1]
@@ -3,6 +3,10 @@ from apps.attendance.models import AttendanceLog
 
 
 class AttendanceLogSerializer(serializers.ModelSerializer):
+    # The row stores Employee.log_key and a LogSource id; expose the same
+    # UUID and source string as before the compact layout.
+    employee = serializers.UUIDField(source="employee.id", read_only=True)
+    source = serializers.CharField(source="source.name", read_only=True, allow_null=True)
     employee_employee_id = serializers.CharField(source="employee.employee_id", read_only=True)
     employee_full_name = serializers.CharField(source="employee.full_name", read_only=True)
 
@@ -14,6 +18,7 @@ class AttendanceLogSerializer(serializers.ModelSerializer):
             "employee_employee_id",
             "employee_full_name",
             "check_time",
+            "work_date",
             "log_type",
             "source",
             "created_at",
@@ -1,26 +1,48 @@
 from datetime import datetime
+from itertools import chain, islice
+from django.conf import settings
+from django.http import Http404
 from rest_framework import viewsets, filters
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.utils import timezone
 from django.utils.dateparse import parse_datetime
+from django.core.exceptions import ValidationError
 from django.db.models import Q
 
-from apps.attendance.models import AttendanceLog
+from apps.attendance.models import AttendanceLog, LogSource
+from apps.attendance.services import archive, presence, timeline as timelines, watermark
+from apps.core import fastjson
+from apps.core.fieldsets import SparseFieldsMixin
+from apps.core.filters import NormalizedSearchFilter
+from apps.core.text import normalize
+from apps.employees.models import Department, Employee
+from . import export as log_export
+from .pagination import KeysetPagination
 from .serializers import AttendanceLogSerializer
-from apps.core.permissions import IsDeptManagerReadOnly, IsAuditorOrReadOnly
+from apps.core.permissions import IsAuditorOrHRAdmin, IsDeptManagerReadOnly, IsAuditorOrReadOnly
 
 
-class AttendanceLogViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = AttendanceLog.objects.select_related("employee").all()
+# Per-punch fields of the timeline lookup; the employee ones are given once per group.
+TIMELINE_LOG_FIELDS = ("id", "check_time", "work_date", "log_type", "source", "created_at")
+
+
+class AttendanceLogViewSet(SparseFieldsMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = AttendanceLog.objects.select_related("employee", "source").all()
     serializer_class = AttendanceLogSerializer
     permission_classes = [IsAuthenticated, IsDeptManagerReadOnly, IsAuditorOrReadOnly]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [NormalizedSearchFilter, filters.OrderingFilter]
     search_fields = [
-        "employee__employee_id",
-        "employee__full_name",
-        "source",
+        "employee__search_text",
+        "source__name",
     ]
     ordering_fields = ["check_time", "created_at"]
     ordering = ["-check_time"]
+    pagination_class = KeysetPagination
+    # Keyset cursors are built from these even when ?fields= leaves them out.
+    sparse_loaded_fields = ("id", "check_time", "created_at")
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -41,4 +63,316 @@ class AttendanceLogViewSet(viewsets.ReadOnlyModelViewSet):
             dt = parse_datetime(end)
             if dt:
                 qs = qs.filter(check_time__lte=dt)
-        return qs
\ No newline at end of file
+        return qs
+
+    def _reaches_archive(self) -> bool:
+        """Only a ``start`` inside an archived month consults the archive, so the
+        usual "latest logs" listing never touches it."""
+        params = self.request.query_params
+        start = parse_datetime(params.get("start") or "")
+        return bool(start) and bool(archive.archived_months(start, parse_datetime(params.get("end") or "")))
+
+    def _archived_page(self, field, key, descending, limit):
+        """Archived rows for one keyset page: at most ``limit`` past ``key`` in page order.
+
+        Archives are stored in check_time order, so ``list`` only pages them by
+        ``check_time``.
+        """
+        return list(islice(self._iter_archived_logs(key, descending, chunk_rows=limit), limit))
+
+    def _iter_archived_logs(self, key=None, descending=False, chunk_rows=log_export.CHUNK_ROWS):
+        """Archived punches matching the list filters, as unsaved AttendanceLog objects.
+
+        Oldest first (newest first if ``descending``), starting after the
+        ``(check_time, id)`` keyset ``key``. Employees are loaded per chunk of
+        rows, for the rows that matched.
+        """
+        params = self.request.query_params
+        start = parse_datetime(params.get("start") or "")
+        if not start:
+            return
+        end = parse_datetime(params.get("end") or "")
+        if key is not None:
+            if descending:
+                end = key[0] if end is None else min(end, key[0])
+            else:
+                start = max(start, key[0])
+        if not archive.archived_months(start, end):
+            return
+
+        employee_ids = None
+        if params.get("employee_id"):
+            employee_ids = set(
+                Employee.objects.filter(employee_id=params["employee_id"]).values_list("log_key", flat=True)
+            )
+        log_type = params.get("log_type")
+        # Same matching as NormalizedSearchFilter on the hot table: each term in
+        # the employee's search_text (looked up once) or in the source name.
+        terms = [
+            (term.lower(), set(
+                Employee.objects.filter(search_text__contains=normalize(term)).values_list("log_key", flat=True)
+            ))
+            for term in NormalizedSearchFilter().get_search_terms(self.request)
+        ]
+
+        rows = archive.rows(start, end, end_inclusive=True, employee_ids=employee_ids, reverse=descending)
+        employees = {}
+        while True:
+            chunk = list(islice(rows, chunk_rows))
+            if not chunk:
+                return
+            logs = []
+            for row in chunk:
+                log = self._from_archive(row)
+                if key is not None and (
+                    (log.check_time, log.id) >= key if descending else (log.check_time, log.id) <= key
+                ):
+                    continue
+                if log_type in ("IN", "OUT") and log.log_type != log_type:
+                    continue
+                source = log.source.name.lower() if log.source else ""
+                if all(log.employee_id in matched or term in source for term, matched in terms):
+                    logs.append(log)
+            missing = {log.employee_id for log in logs} - employees.keys()
+            if missing:
+                employees.update(Employee.objects.in_bulk(missing, field_name="log_key"))
+            for log in logs:
+                log.employee = employees[log.employee_id]
+                yield log
+
+    @staticmethod
+    def _from_archive(row) -> AttendanceLog:
+        values = dict(zip(archive.COLUMNS, row))
+        source = values.pop("source")
+        log = AttendanceLog(**values)
+        # Unsaved lookup row: serializers only read its name.
+        log.source = LogSource(name=source) if source else None
+        return log
+
+    def list(self, request, *args, **kwargs):
+        archived = self._reaches_archive()
+        if archived:
+            ordering = filters.OrderingFilter().get_ordering(request, self.get_queryset(), self) or self.ordering
+            if ordering[0].lstrip("-") != "check_time":
+                # Any other order would sort every archived match in memory.
+                return Response(
+                    {"detail": "ranges that reach archived months can only be ordered by check_time"}, status=400
+                )
+        fast = fastjson.accepts(request)
+        if not archived and not fast:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if fast:
+            plan = self.get_fast_plan()
+            if not archived:
+                # Plain dicts straight from the cursor; no model instances.
+                queryset = queryset.values(*dict.fromkeys(plan.sources + self.sparse_loaded_fields))
+        # One page worth of hot rows and of archived rows, merged.
+        page = self.paginator.paginate_queryset(
+            queryset, request, view=self, extra_rows=self._archived_page if archived else ()
+        )
+        if fast:
+            return fastjson.response(self.paginator.get_paginated_data(plan.many(page)))
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    def get_object(self):
+        try:
+            return super().get_object()
+        except Http404:
+            pk = self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+            row = archive.get_row(int(pk)) if str(pk).isdigit() else None
+            if row is None:
+                raise
+            log = self._from_archive(row)
+            self.check_object_permissions(self.request, log)
+            return log
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="export",
+        renderer_classes=[log_export.NDJSONRenderer, log_export.CSVRenderer],
+    )
+    def export(self, request, *args, **kwargs):
+        """Every log matching the list filters, oldest first, streamed as ``?format=ndjson|csv``.
+
+        Archived months come first, then the hot table through a server-side
+        cursor; rows have the list's fields (or ``?fields=``) and values.
+        """
+        plan = self.get_fast_plan()
+        queryset = self.filter_queryset(self.get_queryset()).order_by("check_time", "id")
+        rows = chain(
+            self._iter_archived_logs(),
+            queryset.values(*plan.sources).iterator(chunk_size=log_export.CHUNK_ROWS),
+        )
+        params = request.query_params
+        start = parse_datetime(params.get("start") or "")
+        end = parse_datetime(params.get("end") or "")
+        name = f"attendance-logs_{start.date() if start else 'all'}_{end.date() if end else 'all'}"
+        if request.accepted_renderer.format == "csv":
+            chunks = log_export.csv_chunks(plan, rows)
+            return log_export.stream(request, chunks, "text/csv; charset=utf-8", f"{name}.csv")
+        chunks = log_export.ndjson_chunks(plan, rows)
+        return log_export.stream(request, chunks, "application/x-ndjson", f"{name}.ndjson")
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="timeline",
+        permission_classes=[IsAuthenticated, IsDeptManagerReadOnly, IsAuditorOrHRAdmin],
+    )
+    def timeline(self, request, *args, **kwargs):
+        """Punches of many employees over one range, grouped per employee.
+
+        Body: ``{"employee_ids": ["E1", ...], "start": <ISO datetime>, "end": <ISO datetime>}``
+        with ``end`` inclusive, like the list filters. Known employees come back
+        in request order with their ``logs`` oldest first (list fields without the
+        employee ones); ids matching no employee are listed in ``unknown``. At
+        most ``ATTENDANCE_TIMELINE_MAX_EMPLOYEES`` ids per call.
+        """
+        data = request.data if isinstance(request.data, dict) else {}
+        employee_ids = data.get("employee_ids")
+        if (
+            not isinstance(employee_ids, list)
+            or not employee_ids
+            or not all(isinstance(i, str) and i for i in employee_ids)
+        ):
+            return Response({"detail": "employee_ids must be a non-empty list of employee ids"}, status=400)
+        employee_ids = list(dict.fromkeys(employee_ids))
+        max_employees = int(getattr(settings, "ATTENDANCE_TIMELINE_MAX_EMPLOYEES", 500))
+        if len(employee_ids) > max_employees:
+            return Response({"detail": f"at most {max_employees} employee_ids per request"}, status=400)
+
+        start = parse_datetime(str(data.get("start") or ""))
+        end = parse_datetime(str(data.get("end") or ""))
+        if not start or not end:
+            return Response({"detail": "start and end are required ISO datetimes"}, status=400)
+        start, end = (timezone.make_aware(dt) if timezone.is_naive(dt) else dt for dt in (start, end))
+        if start > end:
+            return Response({"detail": "invalid start/end"}, status=400)
+
+        employees = Employee.objects.only("id", "employee_id", "full_name", "log_key").in_bulk(
+            employee_ids, field_name="employee_id"
+        )
+        plan = fastjson.plan_for(self.get_serializer_class(), TIMELINE_LOG_FIELDS)
+        grouped = timelines.punches([e.log_key for e in employees.values()], start, end, plan.sources)
+
+        results = []
+        for employee_id in employee_ids:
+            employee = employees.get(employee_id)
+            if employee is not None:
+                results.append({
+                    "employee": employee.id,
+                    "employee_employee_id": employee.employee_id,
+                    "employee_full_name": employee.full_name,
+                    "logs": plan.many(grouped[employee.log_key]),
+                })
+        return fastjson.json_response(request, {
+            "start": start,
+            "end": end,
+            "count": len(results),
+            "results": results,
+            "unknown": [i for i in employee_ids if i not in employees],
+        })
+
+    @action(detail=False, methods=["get"], url_path="changes")
+    def changes(self, request, *args, **kwargs):
+        """Rows inserted after ``cursor`` (an ``id``), oldest first, as compact columns.
+
+        Only ids up to ``watermark.settled_id`` are returned (a batch still being
+        written may hold lower ids than one already committed), so resuming
+        from ``next_cursor`` never misses a row, including late punches with
+        old ``check_time``.
+        """
+        try:
+            cursor = int(request.query_params.get("cursor") or 0)
+        except ValueError:
+            return Response({"detail": "cursor must be an integer"}, status=400)
+        max_limit = int(getattr(settings, "CHANGE_FEED_MAX_LIMIT", 10000))
+        try:
+            limit = min(int(request.query_params.get("limit") or 1000), max_limit)
+        except ValueError:
+            return Response({"detail": "limit must be an integer"}, status=400)
+        if limit < 1:
+            return Response({"detail": "limit must be at least 1"}, status=400)
+
+        qs = AttendanceLog.objects.filter(id__gt=cursor, id__lte=watermark.settled_id())
+        employee_id = request.query_params.get("employee_id")
+        if employee_id:
+            qs = qs.filter(employee__employee_id=employee_id)
+        rows = list(
+            qs.order_by("id").values_list(
+                "id", "employee__id", "employee__employee_id", "check_time", "log_type", "source__name"
+            )[: limit + 1]
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return fastjson.json_response(request, {
+            "cursor": cursor,
+            "next_cursor": rows[-1][0] if rows else cursor,
+            "has_more": has_more,
+            "columns": ["id", "employee", "employee_employee_id", "check_time", "log_type", "source"],
+            "rows": rows,
+        })
+
+
+class PresenceView(APIView):
+    """Who is inside now: per department, employees whose last punch of today is IN.
+
+    ``?department=<id>`` limits the answer to one department and ``?members=0``
+    returns the counts only. ``seen`` counts everyone who punched today.
+    """
+
+    permission_classes = [IsAuthenticated, IsDeptManagerReadOnly, IsAuditorOrReadOnly]
+
+    def get(self, request, *args, **kwargs):
+        department_id = request.query_params.get("department")
+        with_members = request.query_params.get("members", "1").lower() not in {"0", "false", "no", "off"}
+
+        names = dict(Department.objects.values_list("id", "name"))
+        if department_id:
+            try:
+                department = Department.objects.filter(pk=department_id).first()
+            except ValidationError:
+                department = None
+            if department is None:
+                return Response({"detail": "unknown department"}, status=400)
+            department_ids = [department.pk]
+        else:
+            department_ids = [*names, None]
+
+        counts, source = presence.departments(department_ids, members=with_members)
+        employees = {}
+        if with_members:
+            keys = {member.log_key for row in counts for member in row.members}
+            employees = Employee.objects.in_bulk(keys, field_name="log_key") if keys else {}
+
+        results = []
+        for row in counts:
+            members = [
+                (employees[m.log_key], m) for m in row.members if m.log_key in employees
+            ]
+            members.sort(key=lambda pair: pair[0].full_name)
+            results.append({
+                "department_id": row.department_id,
+                "department_name": names.get(row.department_id),
+                "inside": row.inside,
+                "seen": row.seen,
+                "members": [
+                    {
+                        "employee": employee.id,
+                        "employee_employee_id": employee.employee_id,
+                        "employee_full_name": employee.full_name,
+                        "check_time": timezone.localtime(member.check_time),
+                        "log_type": member.log_type,
+                    }
+                    for employee, member in members
+                ],
+            })
+        return fastjson.json_response(request, {
+            "work_date": presence.today(),
+            "source": source,
+            "inside": sum(row.inside for row in counts),
+            "departments": results,
+        })
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class AttendanceConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.attendance"
-    verbose_name = "Attendance"
\ No newline at end of file
+    verbose_name = "Attendance"
+    def ready(self):
+        # Signal receivers that invalidate month snapshots on edits.
+        from apps.attendance.services import snapshots  # noqa: F401
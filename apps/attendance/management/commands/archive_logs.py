@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.attendance.services.archive import archive_month, archive_old_months
+
+
+class Command(BaseCommand):
+    help = "Move old monthly partitions of attendance_logs into compressed archive files."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--after-months",
+            type=int,
+            default=None,
+            help="Archive months older than this (default: ATTENDANCE_ARCHIVE_AFTER_MONTHS).",
+        )
+        parser.add_argument("--month", default=None, help="Archive one month (YYYY-MM) instead.")
+
+    def handle(self, *args, **options):
+        if options["month"]:
+            try:
+                month = datetime.strptime(options["month"], "%Y-%m").date()
+            except ValueError:
+                raise CommandError(f"Invalid month '{options['month']}', expected YYYY-MM.")
+            entry = archive_month(month)
+            count = entry.row_count if entry else 0
+            self.stdout.write(self.style.SUCCESS(f"[OK] Archived {options['month']}: {count} logs."))
+            return
+
+        archived = archive_old_months(after_months=options["after_months"])
+        for name in archived:
+            self.stdout.write(f"  archived {name}")
+        self.stdout.write(self.style.SUCCESS(f"[OK] Archived {len(archived)} month(s)."))
@@ -0,0 +1,76 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count, Max, Min, Q
+from django.utils.dateparse import parse_datetime
+
+from apps.attendance.models import AttendanceLog
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN ANALYZE the report queries over a time range and time them. "
+        "Run before and after an index change to compare plans."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", required=True, help="ISO datetime (inclusive).")
+        parser.add_argument("--end", required=True, help="ISO datetime (inclusive).")
+        parser.add_argument("--department", default=None, help="Department id filter.")
+        parser.add_argument("--runs", type=int, default=5, help="Timed executions per query.")
+        parser.add_argument(
+            "--vacuum",
+            action="store_true",
+            help="VACUUM (ANALYZE) attendance_logs first so index-only scans see a fresh visibility map.",
+        )
+
+    def handle(self, *args, **options):
+        start = parse_datetime(options["start"])
+        end = parse_datetime(options["end"])
+        if not start or not end or start > end:
+            raise CommandError("invalid --start/--end")
+
+        if options["vacuum"]:
+            with connection.cursor() as cursor:
+                cursor.execute("VACUUM (ANALYZE) attendance_logs")
+
+        logs = AttendanceLog.objects.filter(check_time__gte=start, check_time__lte=end)
+        if options["department"]:
+            logs = logs.filter(employee__department_id=options["department"])
+
+        queries = {
+            "monthly": logs.values("employee_id", "employee__employee_id", "employee__full_name").annotate(
+                total_logs=Count("id"),
+                first_seen=Min("check_time"),
+                last_seen=Max("check_time"),
+                first_check_in=Min("check_time", filter=Q(log_type="IN")),
+                last_check_out=Max("check_time", filter=Q(log_type="OUT")),
+            ).order_by("employee__full_name"),
+            "department-summary": logs.values("employee__department__id", "employee__department__name").annotate(
+                employees_count=Count("employee", distinct=True),
+                logs_count=Count("id"),
+            ).order_by("employee__department__name"),
+            "daily": logs.values("employee_id", "work_date").annotate(
+                punches=Count("id"),
+                first_seen=Min("check_time"),
+                last_seen=Max("check_time"),
+            ).order_by("employee_id", "work_date"),
+            "work-hours": logs.order_by("employee_id", "check_time").values_list(
+                "employee_id", "check_time", "log_type"
+            ),
+        }
+
+        for name, queryset in queries.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(f"== {name}"))
+            self.stdout.write(queryset.explain(analyze=True, buffers=True))
+            timings = []
+            for _ in range(max(options["runs"], 1)):
+                began = time.perf_counter()
+                rows = len(list(queryset.all()))
+                timings.append(time.perf_counter() - began)
+            timings.sort()
+            self.stdout.write(self.style.SUCCESS(
+                f"[OK] {name}: {rows} rows, best {timings[0] * 1000:.1f} ms, "
+                f"median {timings[len(timings) // 2] * 1000:.1f} ms"
+            ))
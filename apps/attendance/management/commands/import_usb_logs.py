@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.attendance.services.usb_import import import_export_file
+
+
+class Command(BaseCommand):
+    help = "Import attendance logs from terminal USB export files (*_attlog.dat)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="+", help="Export file(s) to import.")
+        parser.add_argument(
+            "--source",
+            default=None,
+            help="Value stored in AttendanceLog.source (default: usb:<file name>).",
+        )
+
+    def handle(self, *args, **options):
+        for path in options["paths"]:
+            try:
+                result = import_export_file(path, source=options["source"])
+            except OSError as exc:
+                raise CommandError(f"Cannot read {path}: {exc}")
+            self.stdout.write(self.style.SUCCESS(
+                f"[OK] {path}: {result.received} lines, {result.inserted_count} new, "
+                f"{result.duplicates} duplicates, {result.unknown_employees} unknown employees."
+            ))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from apps.attendance.services.partitions import maintain_partitions
+
+
+class Command(BaseCommand):
+    help = "Pre-create future monthly partitions of attendance_logs and detach expired ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            default=None,
+            help="Months to create ahead (default: ATTENDANCE_PARTITION_MONTHS_AHEAD).",
+        )
+        parser.add_argument(
+            "--retention",
+            type=int,
+            default=None,
+            help="Months to keep attached, 0 keeps all (default: ATTENDANCE_PARTITION_RETENTION_MONTHS).",
+        )
+
+    def handle(self, *args, **options):
+        created, detached = maintain_partitions(
+            months_ahead=options["ahead"],
+            retention_months=options["retention"],
+        )
+        for name in created:
+            self.stdout.write(f"  created {name}")
+        for name in detached:
+            self.stdout.write(f"  detached {name}")
+        self.stdout.write(self.style.SUCCESS(
+            f"[OK] Partitions: {len(created)} created, {len(detached)} detached."
+        ))
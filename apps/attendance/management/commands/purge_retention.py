@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.attendance.services.retention import TABLES, Policy, policies, purge
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete attendance data past its retention (ATTENDANCE_RETENTION_DAYS) in small "
+        "throttled batches, dropping whole expired month partitions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--table", choices=sorted(TABLES), default=None, help="Only this table.")
+        parser.add_argument("--days", type=int, default=None, help="Override the days kept (needs --table).")
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--pause", type=float, default=None, help="Seconds between batches.")
+        parser.add_argument("--max-seconds", type=float, default=None, help="Stop and checkpoint after this long.")
+
+    def handle(self, *args, **options):
+        if options["days"] is not None:
+            if not options["table"]:
+                raise CommandError("--days needs --table.")
+            if options["days"] <= 0:
+                raise CommandError("--days must be positive.")
+            selected = [Policy(options["table"], options["days"])]
+        else:
+            selected = [p for p in policies() if options["table"] in (None, p.table)]
+        if not selected:
+            self.stdout.write(self.style.WARNING("[SKIP] No retention policy configured."))
+            return
+
+        for policy in selected:
+            result = purge(
+                policy,
+                batch_size=options["batch_size"],
+                pause=options["pause"],
+                max_seconds=options["max_seconds"],
+            )
+            for name in result.dropped:
+                self.stdout.write(f"  dropped {name}")
+            status = "" if result.finished else " (paused; run again to continue)"
+            self.stdout.write(self.style.SUCCESS(
+                f"[OK] {result.table}: deleted {result.deleted} rows before {result.cutoff:%Y-%m-%d %H:%M}{status}."
+            ))
@@ -0,0 +1,81 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Max, Min
+
+from apps.attendance.models import ArchivedMonth, AttendanceLog
+from apps.attendance.services import workdays
+from apps.attendance.services.projections import (
+    get_projections,
+    month_shards,
+    next_month_start,
+    replay,
+)
+
+
+def _parse_month(value: str) -> datetime:
+    try:
+        return workdays.day_start(datetime.strptime(value, "%Y-%m").date())
+    except ValueError:
+        raise CommandError(f"Invalid month '{value}', expected YYYY-MM.")
+
+
+def _history_bounds():
+    """``(first, last)`` check_time over the hot table and the archived months, or Nones."""
+    hot = AttendanceLog.objects.aggregate(first=Min("check_time"), last=Max("check_time"))
+    cold = ArchivedMonth.objects.aggregate(first=Min("first_check_time"), last=Max("last_check_time"))
+    firsts = [t for t in (hot["first"], cold["first"]) if t is not None]
+    lasts = [t for t in (hot["last"], cold["last"]) if t is not None]
+    return (min(firsts) if firsts else None), (max(lasts) if lasts else None)
+
+
+class Command(BaseCommand):
+    help = "Replay attendance history into a projection, one month shard per worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", help="Projection name (see ATTENDANCE_PROJECTIONS).")
+        parser.add_argument("--from", dest="start", help="First month (YYYY-MM). Default: oldest log, archived or not.")
+        parser.add_argument("--to", dest="end", help="Last month, inclusive (YYYY-MM). Default: newest log, archived or not.")
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        projections = get_projections()
+        projection = projections.get(options["name"])
+        if projection is None:
+            raise CommandError(
+                f"Unknown projection '{options['name']}'. Registered: {', '.join(projections) or '-'}"
+            )
+
+        first, last = _history_bounds()
+        if first is None and not (options["start"] and options["end"]):
+            self.stdout.write(self.style.WARNING("[SKIP] No attendance logs to replay."))
+            return
+        # Whole work months, so a reset also clears days that no longer have
+        # punches (e.g. after ATTENDANCE_WORKDAY_CUTOVER changed).
+        if options["start"]:
+            start = _parse_month(options["start"])
+        else:
+            start = workdays.day_start(workdays.work_date(first).replace(day=1))
+        end = next_month_start(_parse_month(options["end"]) if options["end"] else last)
+        shards = month_shards(start, end)
+
+        def run(shard):
+            try:
+                return shard, replay(projection, shard[0], shard[1], options["batch_size"])
+            finally:
+                # Worker threads own their connections.
+                connection.close()
+
+        total = 0
+        with ThreadPoolExecutor(max_workers=max(1, options["workers"])) as pool:
+            for future in as_completed([pool.submit(run, shard) for shard in shards]):
+                (shard_start, _), count = future.result()
+                total += count
+                self.stdout.write(f"  {workdays.work_date(shard_start):%Y-%m}: {count} logs")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"[OK] Rebuilt projection '{projection.name}' from {total} logs in {len(shards)} month shard(s)."
+        ))
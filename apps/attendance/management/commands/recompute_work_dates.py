@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from apps.attendance.services.workdays import WORK_DATE_SQL, attribute_shifts, max_shift, sql_params
+from apps.employees.models import Employee
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-derive attendance_logs.work_date after changing ATTENDANCE_WORKDAY_CUTOVER or "
+        "ATTENDANCE_MAX_SHIFT_HOURS. Run `rebuild_projection attendance_day` afterwards. "
+        "Archived months keep their stored dates."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50_000, help="Rows per id range (one transaction each).")
+
+    def handle(self, *args, **options):
+        params = sql_params()
+        batch = max(1, options["batch_size"])
+        changed = 0
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COALESCE(min(id), 1), COALESCE(max(id), 0) FROM attendance_logs")
+            low, high = cursor.fetchone()
+            for start in range(low - 1, high, batch):
+                cursor.execute(
+                    f"UPDATE attendance_logs SET work_date = {WORK_DATE_SQL} "
+                    f"WHERE id > %(low)s AND id <= %(high)s AND work_date IS DISTINCT FROM {WORK_DATE_SQL}",
+                    dict(params, low=start, high=start + batch),
+                )
+                changed += cursor.rowcount
+
+            # Then give night shifts' OUTs the day of their IN, one week per transaction.
+            if max_shift():
+                employees = list(Employee.objects.values_list("log_key", flat=True))
+                cursor.execute("SELECT min(check_time), max(check_time) FROM attendance_logs")
+                first, last = cursor.fetchone()
+                start = first
+                while employees and start is not None and start <= last:
+                    with transaction.atomic():
+                        changed += len(attribute_shifts(cursor, employees, start, start + timedelta(days=7)))
+                    start += timedelta(days=7)
+        self.stdout.write(self.style.SUCCESS(f"[OK] Updated work_date on {changed} logs."))
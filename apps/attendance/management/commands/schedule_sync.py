@@ -5,7 +5,7 @@ import json
 
 
 class Command(BaseCommand):
-    help = "Create or update Celery Beat schedule for attendance sync job."
+    help = "Create or update Celery Beat schedules for attendance sync, outbox dispatch, partition maintenance, archiving, retention and presence rebuilds."
 
     def handle(self, *args, **options):
         minutes = int(getattr(settings, "SYNC_INTERVAL_MINUTES", 5) or 5)
@@ -24,4 +24,71 @@ class Command(BaseCommand):
         )
         self.stdout.write(self.style.SUCCESS(
             f"[OK] Scheduled attendance sync every {minutes} minute(s)."
-        ))
\ No newline at end of file
+        ))
+
+        seconds = int(getattr(settings, "OUTBOX_DISPATCH_INTERVAL_SECONDS", 30) or 30)
+        outbox_schedule, _ = IntervalSchedule.objects.get_or_create(
+            every=seconds, period=IntervalSchedule.SECONDS
+        )
+        PeriodicTask.objects.update_or_create(
+            name="attendance_outbox_dispatch",
+            defaults={
+                "interval": outbox_schedule,
+                "task": "attendance.dispatch_outbox",
+                "args": json.dumps([]),
+                "kwargs": json.dumps({}),
+                "enabled": True,
+            },
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"[OK] Scheduled webhook outbox dispatch every {seconds} second(s)."
+        ))
+
+        daily, _ = IntervalSchedule.objects.get_or_create(every=1, period=IntervalSchedule.DAYS)
+        PeriodicTask.objects.update_or_create(
+            name="attendance_partition_maintenance",
+            defaults={
+                "interval": daily,
+                "task": "attendance.maintain_partitions",
+                "args": json.dumps([]),
+                "kwargs": json.dumps({}),
+                "enabled": True,
+            },
+        )
+        self.stdout.write(self.style.SUCCESS("[OK] Scheduled daily partition maintenance."))
+
+        PeriodicTask.objects.update_or_create(
+            name="attendance_archive",
+            defaults={
+                "interval": daily,
+                "task": "attendance.archive_months",
+                "args": json.dumps([]),
+                "kwargs": json.dumps({}),
+                "enabled": True,
+            },
+        )
+        self.stdout.write(self.style.SUCCESS("[OK] Scheduled daily cold archiving."))
+
+        PeriodicTask.objects.update_or_create(
+            name="attendance_retention",
+            defaults={
+                "interval": daily,
+                "task": "attendance.purge_retention",
+                "args": json.dumps([]),
+                "kwargs": json.dumps({}),
+                "enabled": True,
+            },
+        )
+        self.stdout.write(self.style.SUCCESS("[OK] Scheduled daily retention purge (maintenance queue)."))
+
+        PeriodicTask.objects.update_or_create(
+            name="attendance_presence_rebuild",
+            defaults={
+                "interval": daily,
+                "task": "attendance.rebuild_presence",
+                "args": json.dumps([]),
+                "kwargs": json.dumps({}),
+                "enabled": True,
+            },
+        )
+        self.stdout.write(self.style.SUCCESS("[OK] Scheduled daily presence rebuild."))
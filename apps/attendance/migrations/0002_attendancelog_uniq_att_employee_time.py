@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+# Earlier syncs de-duplicated in Python; drop any stragglers so the constraint applies.
+DELETE_DUPLICATES = """
+    DELETE FROM attendance_logs a
+    USING attendance_logs b
+    WHERE a.employee_id = b.employee_id
+      AND a.check_time = b.check_time
+      AND a.id > b.id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunSQL(DELETE_DUPLICATES, migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name='attendancelog',
+            constraint=models.UniqueConstraint(fields=('employee', 'check_time'), name='uniq_att_employee_time'),
+        ),
+    ]
@@ -0,0 +1,95 @@
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.db import migrations
+
+# Converts attendance_logs into a table partitioned by local calendar month on
+# check_time. Postgres requires the partition key in every unique constraint,
+# so the primary key becomes (id, check_time); Django keeps treating ``id`` as
+# the pk, which is still unique because it comes from one sequence. Runs in a
+# single transaction and copies every row: schedule downtime on large tables.
+
+COLUMNS = "id, check_time, log_type, source, created_at, employee_id"
+
+
+def _add_months(month, n):
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _month_start(month, tz):
+    return datetime(month.year, month.month, 1, tzinfo=tz)
+
+
+def partition_table(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    tz = ZoneInfo(settings.TIME_ZONE)
+    execute = schema_editor.execute
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT min(check_time), max(check_time) FROM attendance_logs")
+        lo, hi = cursor.fetchone()
+    today = datetime.now(tz).date().replace(day=1)
+    first = lo.astimezone(tz).date().replace(day=1) if lo else today
+    last = max(hi.astimezone(tz).date().replace(day=1) if hi else today, today)
+    last = _add_months(last, 3)
+
+    execute(
+        """
+        CREATE TABLE attendance_logs_new (
+            id bigint NOT NULL,
+            check_time timestamptz NOT NULL,
+            log_type varchar(3) NOT NULL,
+            source varchar(100) NULL,
+            created_at timestamptz NOT NULL,
+            employee_id uuid NOT NULL
+        ) PARTITION BY RANGE (check_time)
+        """
+    )
+    month = first
+    while month <= last:
+        execute(
+            f"CREATE TABLE attendance_logs_{month.year:04d}_{month.month:02d} "
+            f"PARTITION OF attendance_logs_new FOR VALUES FROM (%s) TO (%s)",
+            [_month_start(month, tz), _month_start(_add_months(month, 1), tz)],
+        )
+        month = _add_months(month, 1)
+    execute("CREATE TABLE attendance_logs_default PARTITION OF attendance_logs_new DEFAULT")
+
+    execute(f"INSERT INTO attendance_logs_new ({COLUMNS}) SELECT {COLUMNS} FROM attendance_logs")
+    execute("DROP TABLE attendance_logs")
+    execute("ALTER TABLE attendance_logs_new RENAME TO attendance_logs")
+
+    execute("CREATE SEQUENCE attendance_logs_id_seq OWNED BY attendance_logs.id")
+    execute("SELECT setval('attendance_logs_id_seq', COALESCE((SELECT max(id) FROM attendance_logs), 0) + 1, false)")
+    execute("ALTER TABLE attendance_logs ALTER COLUMN id SET DEFAULT nextval('attendance_logs_id_seq')")
+
+    # Same names as before so Django's migration state still matches the schema.
+    execute("ALTER TABLE attendance_logs ADD CONSTRAINT attendance_logs_pkey PRIMARY KEY (id, check_time)")
+    execute(
+        "ALTER TABLE attendance_logs ADD CONSTRAINT uniq_att_employee_time "
+        "UNIQUE (employee_id, check_time)"
+    )
+    execute("CREATE INDEX idx_att_employee_time ON attendance_logs (employee_id, check_time)")
+    execute("CREATE INDEX idx_att_time ON attendance_logs (check_time)")
+    execute("CREATE INDEX attendance_logs_employee_id_7fe06155 ON attendance_logs (employee_id)")
+    execute(
+        "ALTER TABLE attendance_logs ADD CONSTRAINT attendance_logs_employee_id_7fe06155_fk_employees_id "
+        "FOREIGN KEY (employee_id) REFERENCES employees (id) DEFERRABLE INITIALLY DEFERRED"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0003_outbox'),
+        ('employees', '0001_initial'),
+    ]
+
+    operations = [
+        # The partitioned table is schema-compatible with the old one, so there
+        # is nothing to undo for Django when migrating backwards.
+        migrations.RunPython(partition_table, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,110 @@
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Replaces the plain (employee_id, check_time) B-tree and the FK index with one
+# covering index INCLUDE (log_type), and adds a BRIN index on check_time.
+#
+# CREATE INDEX CONCURRENTLY is not supported on a partitioned table, so each
+# index is declared ON ONLY the parent (invalid until every partition has one),
+# built concurrently on every partition and attached. Ingest keeps writing the
+# whole time, so the migration is non-atomic. A failed concurrent build leaves
+# an INVALID index that IF NOT EXISTS would skip; re-running drops it first.
+
+NEW_INDEXES = [
+    ("idx_att_emp_time_cov", "cov", "USING btree (employee_id, check_time) INCLUDE (log_type)"),
+    ("brin_att_time", "brin", "USING brin (check_time) WITH (autosummarize = on)"),
+]
+OLD_INDEXES = ["idx_att_employee_time", "attendance_logs_employee_id_7fe06155"]
+
+
+def build_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_class p ON p.oid = i.inhparent
+            WHERE p.relname = 'attendance_logs'
+            ORDER BY c.relname
+            """
+        )
+        partitions = [row[0] for row in cursor.fetchall()]
+
+        for name, suffix, definition in NEW_INDEXES:
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY attendance_logs {definition}")
+            for partition in partitions:
+                child = f"{partition}_{suffix}"
+                cursor.execute(
+                    "SELECT NOT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                    "WHERE c.relname = %s",
+                    [child],
+                )
+                row = cursor.fetchone()
+                if row and row[0]:
+                    cursor.execute(f"DROP INDEX CONCURRENTLY {child}")
+                cursor.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {child} ON {partition} {definition}")
+                cursor.execute(
+                    "SELECT EXISTS (SELECT 1 FROM pg_inherits i "
+                    "JOIN pg_class c ON c.oid = i.inhrelid "
+                    "JOIN pg_class p ON p.oid = i.inhparent "
+                    "WHERE c.relname = %s AND p.relname = %s)",
+                    [child, name],
+                )
+                if not cursor.fetchone()[0]:
+                    cursor.execute(f"ALTER INDEX {name} ATTACH PARTITION {child}")
+
+        for name in OLD_INDEXES:
+            cursor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+def restore_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_att_employee_time ON attendance_logs (employee_id, check_time)")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS attendance_logs_employee_id_7fe06155 ON attendance_logs (employee_id)"
+        )
+        for name, _, _ in NEW_INDEXES:
+            cursor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('attendance', '0004_partition_attendance_logs'),
+        ('employees', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(build_indexes, restore_indexes, atomic=False),
+            ],
+            state_operations=[
+                migrations.RemoveIndex(
+                    model_name='attendancelog',
+                    name='idx_att_employee_time',
+                ),
+                migrations.AlterField(
+                    model_name='attendancelog',
+                    name='employee',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_logs', to='employees.employee'),
+                ),
+                migrations.AddIndex(
+                    model_name='attendancelog',
+                    index=models.Index(fields=['employee', 'check_time'], include=('log_type',), name='idx_att_emp_time_cov'),
+                ),
+                migrations.AddIndex(
+                    model_name='attendancelog',
+                    index=django.contrib.postgres.indexes.BrinIndex(autosummarize=True, fields=['check_time'], name='brin_att_time'),
+                ),
+            ],
+        ),
+    ]
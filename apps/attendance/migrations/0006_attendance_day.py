@@ -0,0 +1,98 @@
+# Generated by Django 5.0.6 on 2026-10-19 14:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Fills attendance_days from existing punches; a frozen copy of
+# services/rollup.REFRESH_SQL applied to every (employee, local day).
+BACKFILL_SQL = """
+WITH punches AS (
+    SELECT employee_id, (check_time AT TIME ZONE %(tz)s)::date AS work_date, check_time, log_type
+    FROM attendance_logs
+),
+grouped AS (
+    SELECT p.*,
+           count(*) FILTER (WHERE log_type = 'OUT') OVER (
+               PARTITION BY employee_id, work_date ORDER BY check_time
+               ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+           ) AS grp
+    FROM punches p
+),
+paired AS (
+    SELECT employee_id, work_date,
+           min(check_time) FILTER (WHERE log_type = 'IN') AS opened,
+           max(check_time) FILTER (WHERE log_type = 'OUT') AS closed
+    FROM grouped
+    GROUP BY employee_id, work_date, grp
+),
+worked AS (
+    SELECT employee_id, work_date,
+           count(*) AS sessions,
+           sum(floor(extract(epoch FROM closed - opened)))::bigint AS worked_seconds
+    FROM paired
+    WHERE opened IS NOT NULL AND closed IS NOT NULL
+    GROUP BY employee_id, work_date
+),
+days AS (
+    SELECT employee_id, work_date,
+           min(check_time) FILTER (WHERE log_type = 'IN') AS first_in,
+           max(check_time) FILTER (WHERE log_type = 'OUT') AS last_out,
+           min(check_time) AS first_seen,
+           max(check_time) AS last_seen,
+           count(*) AS punch_count
+    FROM punches
+    GROUP BY employee_id, work_date
+)
+INSERT INTO attendance_days (
+    employee_id, work_date, first_in, last_out, first_seen, last_seen,
+    punch_count, sessions, worked_seconds, updated_at
+)
+SELECT d.employee_id, d.work_date, d.first_in, d.last_out, d.first_seen, d.last_seen,
+       d.punch_count, coalesce(w.sessions, 0), coalesce(w.worked_seconds, 0), now()
+FROM days d
+LEFT JOIN worked w USING (employee_id, work_date)
+"""
+
+
+def backfill(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(BACKFILL_SQL, {"tz": settings.TIME_ZONE})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0005_covering_and_brin_indexes'),
+        ('employees', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceDay',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('work_date', models.DateField()),
+                ('first_in', models.DateTimeField(blank=True, null=True)),
+                ('last_out', models.DateTimeField(blank=True, null=True)),
+                ('first_seen', models.DateTimeField()),
+                ('last_seen', models.DateTimeField()),
+                ('punch_count', models.PositiveIntegerField(default=0)),
+                ('sessions', models.PositiveIntegerField(default=0)),
+                ('worked_seconds', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_days', to='employees.employee')),
+            ],
+            options={
+                'db_table': 'attendance_days',
+                'ordering': ['-work_date'],
+                'indexes': [models.Index(fields=['work_date'], name='idx_att_day_date')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='attendanceday',
+            constraint=models.UniqueConstraint(fields=('employee', 'work_date'), name='uniq_att_day_employee_date'),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.6 on 2026-10-19 14:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0006_attendance_day'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the local calendar month', unique=True)),
+                ('path', models.CharField(help_text='Relative to ATTENDANCE_ARCHIVE_DIR', max_length=255)),
+                ('sha256', models.CharField(max_length=64)),
+                ('row_count', models.PositiveIntegerField()),
+                ('byte_size', models.BigIntegerField()),
+                ('min_id', models.BigIntegerField()),
+                ('max_id', models.BigIntegerField()),
+                ('first_check_time', models.DateTimeField()),
+                ('last_check_time', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'attendance_archives',
+                'ordering': ['month'],
+            },
+        ),
+    ]
@@ -0,0 +1,231 @@
+import apps.attendance.models
+import django.db.models.deletion
+from django.db import migrations, models, transaction
+
+# Rewrites attendance_logs into a compact row layout:
+#   employee_id  uuid         -> integer (employees.log_key)
+#   log_type     varchar(3)   -> smallint (1 = IN, 2 = OUT)
+#   source       varchar(100) -> smallint FK to attendance_sources
+# Columns are ordered widest first so rows carry no alignment padding.
+#
+# A new partitioned table with the same month partitions is filled in id
+# batches (one short transaction each) while ingest keeps writing to the old
+# one, then indexed and constrained while it is still offline. A trigger
+# records the id of every row inserted, updated or deleted from the moment the
+# copy starts; ingest commits out of id order, so a row below the batches'
+# high-water mark can still arrive after its batch was copied. Only the final
+# swap holds a write lock: it re-copies the recorded ids, checks that both
+# tables hold the same number of rows, drops the old table and renames the
+# new one into place. Deploy the new code right after; the old code cannot
+# write to the compact table. Safe to re-run.
+
+BATCH_SIZE = 50_000
+NEW_TABLE = "attendance_logs_compact"
+CHANGES_TABLE = "attendance_logs_compact_changes"
+
+_COPY_SQL = f"""
+    INSERT INTO {NEW_TABLE} (id, check_time, created_at, employee_id, log_type, source_id)
+    SELECT l.id, l.check_time, l.created_at, e.log_key,
+           CASE l.log_type WHEN 'IN' THEN 1 ELSE 2 END, s.id
+    FROM attendance_logs l
+    JOIN employees e ON e.id = l.employee_id
+    LEFT JOIN attendance_sources s ON s.name = l.source
+"""
+COPY_SQL = _COPY_SQL + "WHERE l.id > %s AND l.id <= %s"
+COPY_CHANGED_SQL = _COPY_SQL + f"WHERE l.id IN (SELECT id FROM {CHANGES_TABLE})"
+
+TRACK_SQL = [
+    f"CREATE TABLE {CHANGES_TABLE} (id bigint NOT NULL)",
+    f"""
+    CREATE FUNCTION {CHANGES_TABLE}_track() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN
+            INSERT INTO {CHANGES_TABLE} VALUES (OLD.id);
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            INSERT INTO {CHANGES_TABLE} VALUES (NEW.id);
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    # Waits for the writes in flight; every later one is recorded.
+    f"""
+    CREATE TRIGGER {CHANGES_TABLE}_track AFTER INSERT OR UPDATE OR DELETE ON attendance_logs
+    FOR EACH ROW EXECUTE FUNCTION {CHANGES_TABLE}_track()
+    """,
+]
+
+UNTRACK_SQL = [
+    f"DROP TRIGGER IF EXISTS {CHANGES_TABLE}_track ON attendance_logs",
+    f"DROP FUNCTION IF EXISTS {CHANGES_TABLE}_track()",
+    f"DROP TABLE IF EXISTS {CHANGES_TABLE}",
+]
+
+SOURCES_SQL = """
+    INSERT INTO attendance_sources (name)
+    SELECT DISTINCT source FROM attendance_logs WHERE source IS NOT NULL
+    ON CONFLICT (name) DO NOTHING
+"""
+
+
+def compact_logs(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {NEW_TABLE}")
+        for sql in UNTRACK_SQL:
+            cursor.execute(sql)
+        cursor.execute(SOURCES_SQL)
+        cursor.execute(
+            f"""
+            CREATE TABLE {NEW_TABLE} (
+                id bigint NOT NULL DEFAULT nextval('attendance_logs_id_seq'),
+                check_time timestamptz NOT NULL,
+                created_at timestamptz NOT NULL,
+                employee_id integer NOT NULL,
+                log_type smallint NOT NULL,
+                source_id smallint NULL
+            ) PARTITION BY RANGE (check_time)
+            """
+        )
+        cursor.execute(
+            """
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'attendance_logs'::regclass
+            """
+        )
+        partitions = cursor.fetchall()
+        for name, bound in partitions:
+            cursor.execute(f"CREATE TABLE {name}_compact PARTITION OF {NEW_TABLE} {bound}")
+
+        for sql in TRACK_SQL:
+            cursor.execute(sql)
+        cursor.execute("SELECT COALESCE(max(id), 0) FROM attendance_logs")
+        (high_water,) = cursor.fetchone()
+        for low in range(0, high_water, BATCH_SIZE):
+            cursor.execute(COPY_SQL, [low, low + BATCH_SIZE])
+
+        # Built before the swap, while nothing reads or writes the new table.
+        cursor.execute(f"ALTER TABLE {NEW_TABLE} ADD CONSTRAINT {NEW_TABLE}_pkey PRIMARY KEY (id, check_time)")
+        cursor.execute(
+            f"ALTER TABLE {NEW_TABLE} ADD CONSTRAINT uniq_att_employee_time_compact UNIQUE (employee_id, check_time)"
+        )
+        cursor.execute(
+            f"CREATE INDEX idx_att_emp_time_cov_compact ON {NEW_TABLE} (employee_id, check_time) INCLUDE (log_type)"
+        )
+        cursor.execute(f"CREATE INDEX idx_att_time_compact ON {NEW_TABLE} (check_time)")
+        cursor.execute(
+            f"CREATE INDEX brin_att_time_compact ON {NEW_TABLE} USING brin (check_time) WITH (autosummarize = on)"
+        )
+        cursor.execute(
+            f"ALTER TABLE {NEW_TABLE} ADD CONSTRAINT attendance_logs_employee_id_fk_employees_log_key "
+            "FOREIGN KEY (employee_id) REFERENCES employees (log_key) DEFERRABLE INITIALLY DEFERRED"
+        )
+        cursor.execute(
+            f"ALTER TABLE {NEW_TABLE} ADD CONSTRAINT attendance_logs_source_id_fk_attendance_sources_id "
+            "FOREIGN KEY (source_id) REFERENCES attendance_sources (id) DEFERRABLE INITIALLY DEFERRED"
+        )
+
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute("LOCK TABLE attendance_logs IN EXCLUSIVE MODE")
+        cursor.execute(SOURCES_SQL)
+        # Rows written, changed or deleted since the copy started: drop what a
+        # batch may have copied of them, then copy what the old table holds now.
+        cursor.execute(f"DELETE FROM {NEW_TABLE} WHERE id IN (SELECT id FROM {CHANGES_TABLE})")
+        cursor.execute(COPY_CHANGED_SQL)
+        cursor.execute(f"SELECT (SELECT count(*) FROM attendance_logs), (SELECT count(*) FROM {NEW_TABLE})")
+        old_rows, new_rows = cursor.fetchone()
+        if old_rows != new_rows:
+            # Rolls back; the old table stays in place and the migration can be re-run.
+            raise RuntimeError(f"compact copy has {new_rows} rows, attendance_logs has {old_rows}")
+        for sql in UNTRACK_SQL:
+            cursor.execute(sql)
+
+        cursor.execute("ALTER SEQUENCE attendance_logs_id_seq OWNED BY NONE")
+        cursor.execute("DROP TABLE attendance_logs")
+        cursor.execute(f"ALTER TABLE {NEW_TABLE} RENAME TO attendance_logs")
+        for name, _ in partitions:
+            cursor.execute(f"ALTER TABLE {name}_compact RENAME TO {name}")
+        cursor.execute("ALTER SEQUENCE attendance_logs_id_seq OWNED BY attendance_logs.id")
+        for old, new in (
+            (f"{NEW_TABLE}_pkey", "attendance_logs_pkey"),
+            ("uniq_att_employee_time_compact", "uniq_att_employee_time"),
+        ):
+            cursor.execute(f"ALTER TABLE attendance_logs RENAME CONSTRAINT {old} TO {new}")
+        for old, new in (
+            ("idx_att_emp_time_cov_compact", "idx_att_emp_time_cov"),
+            ("idx_att_time_compact", "idx_att_time"),
+            ("brin_att_time_compact", "brin_att_time"),
+        ):
+            cursor.execute(f"ALTER INDEX {old} RENAME TO {new}")
+
+        # attendance_days is small: convert it in place.
+        cursor.execute("ALTER TABLE attendance_days ADD COLUMN employee_key integer")
+        cursor.execute(
+            "UPDATE attendance_days d SET employee_key = e.log_key FROM employees e WHERE e.id = d.employee_id"
+        )
+        cursor.execute("ALTER TABLE attendance_days DROP COLUMN employee_id")
+        cursor.execute("ALTER TABLE attendance_days RENAME COLUMN employee_key TO employee_id")
+        cursor.execute("ALTER TABLE attendance_days ALTER COLUMN employee_id SET NOT NULL")
+        cursor.execute(
+            "ALTER TABLE attendance_days ADD CONSTRAINT uniq_att_day_employee_date UNIQUE (employee_id, work_date)"
+        )
+        cursor.execute(
+            "ALTER TABLE attendance_days ADD CONSTRAINT attendance_days_employee_id_fk_employees_log_key "
+            "FOREIGN KEY (employee_id) REFERENCES employees (log_key) DEFERRABLE INITIALLY DEFERRED"
+        )
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('attendance', '0007_archived_month'),
+        ('employees', '0002_employee_log_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LogSource',
+            fields=[
+                ('id', models.SmallAutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                'db_table': 'attendance_sources',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(compact_logs, atomic=False),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='attendanceday',
+                    name='employee',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_days', to='employees.employee', to_field='log_key'),
+                ),
+                migrations.AlterField(
+                    model_name='attendancelog',
+                    name='employee',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_logs', to='employees.employee', to_field='log_key'),
+                ),
+                migrations.AlterField(
+                    model_name='attendancelog',
+                    name='log_type',
+                    field=apps.attendance.models.DirectionField(choices=[('IN', 'IN'), ('OUT', 'OUT')]),
+                ),
+                migrations.AlterField(
+                    model_name='attendancelog',
+                    name='source',
+                    field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='attendance.logsource'),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,160 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models, transaction
+
+# Adds attendance_logs.work_date, the local work day of check_time (see
+# services/workdays.py), and an (employee_id, work_date) index.
+#
+# The column is added nullable (a catalog-only change) and back-filled in id
+# batches while ingest keeps writing; the index is then built CONCURRENTLY per
+# partition and attached, as in 0005. Only the final step blocks writes: it
+# fills the rows that arrived meanwhile and sets NOT NULL, which reads the
+# whole table under the lock. Night shifts are then attributed one week per
+# transaction, as new ingest does: an OUT at most ATTENDANCE_MAX_SHIFT_HOURS
+# after an IN of an earlier work day takes that IN's work_date. Deploy the new
+# code right after; the old code does not write work_date. Safe to re-run.
+#
+# The SQL is a frozen copy of services/workdays.py at the time of writing;
+# later changes there go through recompute_work_dates, not this migration.
+
+BATCH_SIZE = 50_000
+WORK_DATE_SQL = "((check_time AT TIME ZONE %(tz)s) - %(cutover)s::interval)::date"
+FILL_SQL = f"UPDATE attendance_logs SET work_date = {WORK_DATE_SQL} WHERE work_date IS NULL"
+SHIFT_WEEK = timedelta(days=7)
+# log_type codes: 1 = IN, 2 = OUT (0008).
+SHIFT_SQL = f"""
+WITH punches AS (
+    SELECT id, check_time, log_type,
+           {WORK_DATE_SQL} AS own_date,
+           lag(log_type) OVER w AS prev_type,
+           lag(check_time) OVER w AS prev_time,
+           lag(work_date) OVER w AS prev_date
+    FROM attendance_logs
+    WHERE check_time >= %(start)s::timestamptz - %(max_shift)s::interval
+      AND check_time <= %(end)s
+    WINDOW w AS (PARTITION BY employee_id ORDER BY check_time, log_type)
+),
+derived AS (
+    SELECT id, check_time,
+           CASE WHEN log_type = 2 AND prev_type = 1 AND prev_date < own_date
+                     AND check_time - prev_time <= %(max_shift)s::interval
+                THEN prev_date ELSE own_date END AS new_date
+    FROM punches
+    WHERE check_time >= %(start)s
+)
+UPDATE attendance_logs l
+SET work_date = d.new_date
+FROM derived d
+WHERE l.id = d.id AND l.check_time = d.check_time AND l.work_date <> d.new_date
+"""
+INDEX = ("idx_att_emp_workdate", "workdate", "USING btree (employee_id, work_date)")
+
+
+def sql_params():
+    """The settings the back-fill depends on, read without the service code."""
+    value = str(getattr(settings, "ATTENDANCE_WORKDAY_CUTOVER", "") or "00:00")
+    hours, _, minutes = value.partition(":")
+    return {
+        "tz": settings.TIME_ZONE,
+        "cutover": timedelta(hours=int(hours), minutes=int(minutes or 0)),
+        "max_shift": timedelta(hours=float(getattr(settings, "ATTENDANCE_MAX_SHIFT_HOURS", 16) or 0)),
+    }
+
+
+def add_work_date(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+    params = sql_params()
+    with connection.cursor() as cursor:
+        cursor.execute("ALTER TABLE attendance_logs ADD COLUMN IF NOT EXISTS work_date date")
+        cursor.execute("SELECT COALESCE(min(id), 1), COALESCE(max(id), 0) FROM attendance_logs")
+        low, high = cursor.fetchone()
+        for start in range(low - 1, high, BATCH_SIZE):
+            cursor.execute(
+                FILL_SQL + " AND id > %(low)s AND id <= %(high)s",
+                dict(params, low=start, high=start + BATCH_SIZE),
+            )
+
+        cursor.execute(
+            """
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_class p ON p.oid = i.inhparent
+            WHERE p.relname = 'attendance_logs'
+            ORDER BY c.relname
+            """
+        )
+        partitions = [row[0] for row in cursor.fetchall()]
+        name, suffix, definition = INDEX
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY attendance_logs {definition}")
+        for partition in partitions:
+            child = f"{partition}_{suffix}"
+            cursor.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {child} ON {partition} {definition}")
+            cursor.execute(
+                "SELECT EXISTS (SELECT 1 FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE c.relname = %s AND p.relname = %s)",
+                [child, name],
+            )
+            if not cursor.fetchone()[0]:
+                cursor.execute(f"ALTER INDEX {name} ATTACH PARTITION {child}")
+
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute("LOCK TABLE attendance_logs IN EXCLUSIVE MODE")
+        cursor.execute(FILL_SQL, params)
+        cursor.execute("ALTER TABLE attendance_logs ALTER COLUMN work_date SET NOT NULL")
+
+    if params["max_shift"]:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT min(check_time), max(check_time) FROM attendance_logs")
+            first, last = cursor.fetchone()
+        start = first
+        while start is not None and start <= last:
+            with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                cursor.execute(SHIFT_SQL, dict(params, start=start, end=start + SHIFT_WEEK))
+            start += SHIFT_WEEK
+
+    # The back-fill rewrote every row; reclaim the old versions and refresh the
+    # visibility map that index-only scans depend on.
+    with connection.cursor() as cursor:
+        cursor.execute("VACUUM (ANALYZE) attendance_logs")
+
+
+def drop_work_date(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"DROP INDEX IF EXISTS {INDEX[0]}")
+        cursor.execute("ALTER TABLE attendance_logs DROP COLUMN IF EXISTS work_date")
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('attendance', '0008_compact_attendance_logs'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(add_work_date, drop_work_date, atomic=False),
+            ],
+            state_operations=[
+                migrations.AddField(
+                    model_name='attendancelog',
+                    name='work_date',
+                    field=models.DateField(editable=False),
+                ),
+                migrations.AddIndex(
+                    model_name='attendancelog',
+                    index=models.Index(fields=['employee', 'work_date'], name='idx_att_emp_workdate'),
+                ),
+            ],
+        ),
+    ]
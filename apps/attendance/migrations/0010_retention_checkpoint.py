@@ -0,0 +1,26 @@
+# Generated by Django 5.0.6 on 2026-10-19 15:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0009_attendancelog_work_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RetentionCheckpoint',
+            fields=[
+                ('table', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('cutoff', models.DateTimeField(help_text='Rows before this were being deleted')),
+                ('last_id', models.BigIntegerField(default=0, help_text='Batches resume after this id')),
+                ('deleted', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'retention_checkpoints',
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.0.6 on 2026-10-19 15:19
+
+import apps.attendance.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+from apps.attendance.services.workdays import sql_params
+
+# Fills attendance_cube from the hot table (a frozen copy of
+# services/cube.APPLY_SQL over all rows). Months already in the cold archive
+# are added with `rebuild_projection attendance_cube --from YYYY-MM --to YYYY-MM`.
+BACKFILL_SQL = """
+INSERT INTO attendance_cube (department_id, work_date, hour, log_type, punch_count)
+SELECT e.department_id, l.work_date,
+       extract(hour FROM l.check_time AT TIME ZONE %(tz)s)::smallint,
+       l.log_type, count(*)
+FROM attendance_logs l
+JOIN employees e ON e.log_key = l.employee_id
+GROUP BY 1, 2, 3, 4
+"""
+
+
+def backfill(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(BACKFILL_SQL, sql_params())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0010_retention_checkpoint'),
+        ('employees', '0002_employee_log_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceCube',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('work_date', models.DateField()),
+                ('hour', models.PositiveSmallIntegerField(help_text='Local hour of check_time (0-23)')),
+                ('log_type', apps.attendance.models.DirectionField(choices=[('IN', 'IN'), ('OUT', 'OUT')])),
+                ('punch_count', models.PositiveIntegerField(default=0)),
+                ('department', models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='employees.department')),
+            ],
+            options={
+                'db_table': 'attendance_cube',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='attendancecube',
+            constraint=models.UniqueConstraint(fields=('work_date', 'department', 'hour', 'log_type'), name='uniq_att_cube_cell', nulls_distinct=False),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
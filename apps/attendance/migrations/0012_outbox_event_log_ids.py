@@ -0,0 +1,30 @@
+from django.db import migrations
+
+# Outbox events are now numbered by their batch's lowest log id (see
+# services/outbox.enqueue). Events were committed in log id order, so each
+# endpoint's cursor maps to the renumbered id of the last event it received;
+# with none of those left (pruned), every remaining event is still pending.
+FORWARD_SQL = [
+    """
+    UPDATE webhook_endpoints w
+    SET last_event_id = COALESCE((
+        SELECT max((SELECT min(x) FROM unnest(o.log_ids) AS x))
+        FROM attendance_outbox o
+        WHERE o.id <= w.last_event_id
+    ), 0)
+    """,
+    # Negate first so no renumbered id collides with an old one.
+    "UPDATE attendance_outbox SET id = -id",
+    "UPDATE attendance_outbox SET id = (SELECT min(x) FROM unnest(log_ids) AS x)",
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0011_attendance_cube'),
+    ]
+
+    operations = [
+        migrations.RunSQL(FORWARD_SQL, reverse_sql=migrations.RunSQL.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.6 on 2026-10-19 16:02
+
+from django.db import migrations
+
+# The B-tree idx_att_time already serves check_time ranges and is needed for
+# the keyset pagination order, so the BRIN index on the same column only cost
+# writes. Dropping the partitioned parent index drops it on every partition.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0012_outbox_event_log_ids'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='attendancelog',
+            name='brin_att_time',
+        ),
+    ]
@@ -1,7 +1,55 @@
+from django.contrib.postgres.fields import ArrayField
 from django.db import models
+from apps.attendance.services.workdays import work_date
 from apps.employees.models import Employee
 
 
+class DirectionField(models.SmallIntegerField):
+    """``LogType`` values ("IN"/"OUT") stored as a smallint code.
+
+    Python code, ORM lookups and serializers keep using the strings; only raw
+    SQL against ``attendance_logs.log_type`` sees ``CODES``.
+    """
+
+    CODES = {"IN": 1, "OUT": 2}
+    NAMES = {code: name for name, code in CODES.items()}
+
+    @property
+    def validators(self):
+        # IntegerField's range validators would compare against the string value.
+        return []
+
+    def from_db_value(self, value, expression, connection):
+        return None if value is None else self.NAMES[value]
+
+    def to_python(self, value):
+        if value is None or isinstance(value, str):
+            return value
+        return self.NAMES[int(value)]
+
+    def get_prep_value(self, value):
+        if value is None:
+            return None
+        return self.CODES[value] if isinstance(value, str) else int(value)
+
+    def formfield(self, **kwargs):
+        return models.Field.formfield(self, **kwargs)
+
+
+class LogSource(models.Model):
+    """Lookup for ``AttendanceLog.source`` ("FingerTec", "iclock:<SN>", "usb:<file>")."""
+
+    id = models.SmallAutoField(primary_key=True)
+    name = models.CharField(max_length=100, unique=True)
+
+    class Meta:
+        db_table = "attendance_sources"
+        ordering = ["name"]
+
+    def __str__(self) -> str:
+        return self.name
+
+
 class AttendanceLog(models.Model):
     class LogType(models.TextChoices):
         IN = "IN", "IN"
@@ -9,24 +57,158 @@ class AttendanceLog(models.Model):
 
     id = models.BigAutoField(primary_key=True)
     employee = models.ForeignKey(
-        Employee, on_delete=models.CASCADE, related_name="attendance_logs"
+        # The covering (employee, check_time) index below serves FK lookups.
+        Employee,
+        on_delete=models.CASCADE,
+        related_name="attendance_logs",
+        to_field="log_key",
+        db_index=False,
     )
     check_time = models.DateTimeField()
-    log_type = models.CharField(max_length=3, choices=LogType.choices)
-    source = models.CharField(max_length=100, blank=True, null=True)
+    # Local work day of check_time (ATTENDANCE_WORKDAY_CUTOVER applied), fixed at ingest.
+    work_date = models.DateField(editable=False)
+    log_type = DirectionField(choices=LogType.choices)
+    source = models.ForeignKey(
+        LogSource, on_delete=models.PROTECT, related_name="+", blank=True, null=True, db_index=False
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
+        # Range-partitioned by local month on check_time (migration 0004,
+        # services/partitions.py); the physical primary key is (id, check_time).
+        # Rows are kept compact (migration 0008): int4 employee key, smallint
+        # direction and source lookup.
         db_table = "attendance_logs"
         indexes = [
-            models.Index(fields=["employee", "check_time"], name="idx_att_employee_time"),
+            # Index-only scans for per-employee reports and work-hours pairing.
+            models.Index(
+                fields=["employee", "check_time"],
+                include=["log_type"],
+                name="idx_att_emp_time_cov",
+            ),
+            # Time-range filters and the keyset pagination order (check_time, id).
             models.Index(fields=["check_time"], name="idx_att_time"),
+            # Per-day reports and the attendance_days refresh seek on this.
+            models.Index(fields=["employee", "work_date"], name="idx_att_emp_workdate"),
+        ]
+        constraints = [
+            # Sync and push ingest rely on this for idempotent bulk inserts.
+            models.UniqueConstraint(fields=["employee", "check_time"], name="uniq_att_employee_time"),
         ]
         ordering = ["-check_time"]
 
     def __str__(self) -> str:
         return f"{self.employee.employee_id} {self.log_type} @ {self.check_time}"
 
+    def save(self, *args, **kwargs):
+        # Bulk ingest computes work_date itself (services/ingest.py).
+        if self.check_time is not None:
+            self.work_date = work_date(self.check_time)
+        super().save(*args, **kwargs)
+
+
+class AttendanceDay(models.Model):
+    """One employee's punches on one work day, maintained by ingest.
+
+    See ``services/rollup.py``; rebuild with ``rebuild_projection attendance_day``.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    employee = models.ForeignKey(
+        Employee, on_delete=models.CASCADE, related_name="attendance_days", to_field="log_key", db_index=False
+    )
+    work_date = models.DateField()
+    first_in = models.DateTimeField(null=True, blank=True)
+    last_out = models.DateTimeField(null=True, blank=True)
+    first_seen = models.DateTimeField()
+    last_seen = models.DateTimeField()
+    punch_count = models.PositiveIntegerField(default=0)
+    sessions = models.PositiveIntegerField(default=0)
+    worked_seconds = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "attendance_days"
+        indexes = [
+            models.Index(fields=["work_date"], name="idx_att_day_date"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["employee", "work_date"], name="uniq_att_day_employee_date"),
+        ]
+        ordering = ["-work_date"]
+
+    def __str__(self) -> str:
+        return f"{self.employee_id} {self.work_date}: {self.punch_count} punches"
+
+
+class AttendanceCube(models.Model):
+    """Punch counts per department, work day, local hour and direction, maintained by ingest.
+
+    See ``services/cube.py``; rebuild with ``rebuild_projection attendance_cube``.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    # Department of the employee when the punch was ingested; a rebuild re-attributes.
+    department = models.ForeignKey(
+        "employees.Department", on_delete=models.CASCADE, null=True, related_name="+", db_index=False
+    )
+    work_date = models.DateField()
+    hour = models.PositiveSmallIntegerField(help_text="Local hour of check_time (0-23)")
+    log_type = DirectionField(choices=AttendanceLog.LogType.choices)
+    punch_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "attendance_cube"
+        constraints = [
+            # Leads with work_date so it also serves date-range queries.
+            models.UniqueConstraint(
+                fields=["work_date", "department", "hour", "log_type"],
+                name="uniq_att_cube_cell",
+                nulls_distinct=False,
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.department_id} {self.work_date} {self.hour:02d}h {self.log_type}: {self.punch_count}"
+
+
+class ArchivedMonth(models.Model):
+    """Manifest entry for one month of punches moved to a cold archive file."""
+
+    month = models.DateField(unique=True, help_text="First day of the local calendar month")
+    path = models.CharField(max_length=255, help_text="Relative to ATTENDANCE_ARCHIVE_DIR")
+    sha256 = models.CharField(max_length=64)
+    row_count = models.PositiveIntegerField()
+    byte_size = models.BigIntegerField()
+    min_id = models.BigIntegerField()
+    max_id = models.BigIntegerField()
+    first_check_time = models.DateTimeField()
+    last_check_time = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "attendance_archives"
+        ordering = ["month"]
+
+    def __str__(self) -> str:
+        return f"{self.month:%Y-%m} ({self.row_count} logs)"
+
+
+class RetentionCheckpoint(models.Model):
+    """Progress of the retention purge of one table (see ``services/retention.py``)."""
+
+    table = models.CharField(max_length=64, primary_key=True)
+    cutoff = models.DateTimeField(help_text="Rows before this were being deleted")
+    last_id = models.BigIntegerField(default=0, help_text="Batches resume after this id")
+    deleted = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "retention_checkpoints"
+
+    def __str__(self) -> str:
+        return f"{self.table} < {self.cutoff}: {self.deleted} deleted"
+
 
 class SyncState(models.Model):
     key = models.CharField(max_length=64, primary_key=True)
@@ -39,4 +221,40 @@ class SyncState(models.Model):
         verbose_name_plural = "Sync States"
 
     def __str__(self) -> str:
-        return f"{self.key}: {self.last_sync_time}"
\ No newline at end of file
+        return f"{self.key}: {self.last_sync_time}"
+
+
+class OutboxEvent(models.Model):
+    """Newly inserted log ids from one ingest batch, written in the same transaction.
+
+    ``id`` is set to the batch's lowest log id (see ``services/outbox.enqueue``).
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    log_ids = ArrayField(models.BigIntegerField())
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "attendance_outbox"
+
+    def __str__(self) -> str:
+        return f"outbox #{self.id} ({len(self.log_ids)} logs)"
+
+
+class WebhookEndpoint(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+    url = models.URLField(max_length=500)
+    secret = models.CharField(max_length=255, blank=True, help_text="HMAC-SHA256 signing key")
+    is_active = models.BooleanField(default=True)
+    last_event_id = models.BigIntegerField(default=0)
+    failures = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "webhook_endpoints"
+        ordering = ["name"]
+
+    def __str__(self) -> str:
+        return self.name
@@ -0,0 +1,59 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import Iterable, Iterator, List, Union
+
+from apps.integrations.fingertec.adapters import LogRecord
+
+# ADMS punch states: 0 check-in, 1 check-out, 2 break-out, 3 break-in,
+# 4 overtime-in, 5 overtime-out.
+STATUS_TO_TYPE = {
+    "0": "IN",
+    "1": "OUT",
+    "2": "OUT",
+    "3": "IN",
+    "4": "IN",
+    "5": "OUT",
+}
+
+
+def parse_attlog_line(line: Union[bytes, str]) -> LogRecord | None:
+    """Parse one ``ATTLOG`` line: ``PIN\\tYYYY-mm-dd HH:MM:SS\\tStatus\\tVerify...``.
+
+    Returns ``None`` for blank or malformed lines. Timestamps are naive terminal
+    local time; the ingest writer makes them aware.
+    """
+    if isinstance(line, bytes):
+        line = line.decode("utf-8", "replace")
+    parts = line.strip().split("\t")
+    if len(parts) < 2 or not parts[0]:
+        return None
+    text = parts[1].strip()
+    # fromisoformat reads a bare date as midnight; a punch needs its time.
+    if len(text) <= len("YYYY-mm-dd"):
+        return None
+    try:
+        # fromisoformat is several times faster than strptime on large exports.
+        timestamp = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    status = parts[2].strip() if len(parts) > 2 else "0"
+    return LogRecord(
+        employee_id=parts[0].strip(),
+        timestamp=timestamp,
+        type=STATUS_TO_TYPE.get(status, "IN"),
+    )
+
+
+def iter_attlog_batches(lines: Iterable[Union[bytes, str]], batch_size: int) -> Iterator[List[LogRecord]]:
+    """Stream-parse ``ATTLOG`` lines into batches of at most ``batch_size`` records."""
+    batch: List[LogRecord] = []
+    for line in lines:
+        record = parse_attlog_line(line)
+        if record is None:
+            continue
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
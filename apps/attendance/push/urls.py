@@ -0,0 +1,10 @@
+from django.urls import path
+
+from . import views
+
+# Terminals hard-code these paths (ADMS "iclock" protocol), no trailing slash.
+urlpatterns = [
+    path("cdata", views.cdata),
+    path("getrequest", views.getrequest),
+    path("devicecmd", views.devicecmd),
+]
@@ -0,0 +1,82 @@
+from __future__ import annotations
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse, HttpResponseForbidden
+from django.views.decorators.csrf import csrf_exempt
+
+from apps.attendance.services.ingest import write_logs
+from .parser import iter_attlog_batches
+
+logger = logging.getLogger(__name__)
+
+
+def _serial_allowed(sn: str | None) -> bool:
+    # The endpoint is unauthenticated: no allowlist means no terminal may push.
+    return bool(sn) and sn in (getattr(settings, "ICLOCK_ALLOWED_SERIALS", None) or ())
+
+
+def _text(body: str) -> HttpResponse:
+    return HttpResponse(body, content_type="text/plain")
+
+
+def _handshake(sn: str) -> str:
+    return "\n".join([
+        f"GET OPTION FROM: {sn}",
+        "Stamp=9999",
+        "OpStamp=9999",
+        "ErrorDelay=30",
+        "Delay=10",
+        "TransTimes=00:00;14:05",
+        f"TransInterval={int(getattr(settings, 'ICLOCK_TRANS_INTERVAL', 1))}",
+        "TransFlag=1000000000",
+        "Realtime=1",
+        "Encrypt=0",
+    ])
+
+
+def _ingest_upload(request: HttpRequest, sn: str) -> int:
+    batch_size = int(getattr(settings, "ATTENDANCE_INGEST_BATCH_SIZE", 5000) or 5000)
+    received = 0
+    inserted = 0
+    # Iterating the request reads the (spooled) body line by line instead of
+    # materializing ``request.body``.
+    for batch in iter_attlog_batches(request, batch_size):
+        result = write_logs(batch, source=f"iclock:{sn}")
+        received += result.received
+        inserted += result.inserted_count
+    logger.info("iclock %s pushed %d logs (%d new).", sn, received, inserted)
+    return received
+
+
+@csrf_exempt
+async def cdata(request: HttpRequest) -> HttpResponse:
+    sn = request.GET.get("SN")
+    if not _serial_allowed(sn):
+        logger.warning("Rejected iclock request from unknown terminal: %s", sn)
+        return HttpResponseForbidden("UNKNOWN DEVICE")
+
+    if request.method == "GET":
+        return _text(_handshake(sn))
+
+    if request.GET.get("table") != "ATTLOG":
+        # OPERLOG/USERINFO/etc. are acknowledged but not stored.
+        return _text("OK")
+
+    count = await sync_to_async(_ingest_upload)(request, sn)
+    return _text(f"OK: {count}")
+
+
+async def getrequest(request: HttpRequest) -> HttpResponse:
+    if not _serial_allowed(request.GET.get("SN")):
+        return HttpResponseForbidden("UNKNOWN DEVICE")
+    # No server-side commands are queued for terminals yet.
+    return _text("OK")
+
+
+@csrf_exempt
+async def devicecmd(request: HttpRequest) -> HttpResponse:
+    if not _serial_allowed(request.GET.get("SN")):
+        return HttpResponseForbidden("UNKNOWN DEVICE")
+    return _text("OK")
@@ -0,0 +1,343 @@
+from __future__ import annotations
+import hashlib
+import json
+import logging
+import os
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.attendance.models import ArchivedMonth, DirectionField
+from apps.attendance.services import workdays
+from apps.attendance.services.partitions import (
+    PARENT_TABLE,
+    add_months,
+    list_partitions,
+    partition_name,
+)
+from apps.employees.models import Employee
+
+logger = logging.getLogger(__name__)
+
+# File layout: MAGIC, a little-endian uint32 header length, a JSON header and
+# one zlib-compressed blob per column. Integer columns are int64 arrays (ids
+# and microsecond timestamps delta-encoded); text and date columns are
+# dictionary codes. Rows are stored in (check_time, id) order. Version 1 files
+# predate work_date; it is derived from check_time when read. Files hold the employee
+# UUID and the source name, so they do not depend on surrogate keys; readers
+# get ``employee_id`` translated to ``Employee.log_key`` like the hot table.
+MAGIC = b"ATLSARC1"
+SUFFIX = ".atlarc"
+COLUMNS = ("id", "employee_id", "check_time", "log_type", "source", "created_at", "work_date")
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_MICRO = timedelta(microseconds=1)
+
+
+class ArchiveError(Exception):
+    """An archive file is missing, truncated or fails its checksum."""
+
+
+def archive_dir() -> Path:
+    return Path(getattr(settings, "ATTENDANCE_ARCHIVE_DIR", "var/archive"))
+
+
+def _to_micros(ts: datetime) -> int:
+    return (ts - _EPOCH) // _MICRO
+
+
+def _pack(values: Sequence[int], typecode: str, delta: bool = False) -> bytes:
+    data = array(typecode, values)
+    if delta:
+        for i in range(len(data) - 1, 0, -1):
+            data[i] -= data[i - 1]
+    if sys.byteorder == "big":
+        data.byteswap()
+    return zlib.compress(data.tobytes(), 9)
+
+
+def _unpack(blob: bytes, typecode: str, delta: bool = False) -> array:
+    data = array(typecode)
+    data.frombytes(zlib.decompress(blob))
+    if sys.byteorder == "big":
+        data.byteswap()
+    if delta:
+        for i in range(1, len(data)):
+            data[i] += data[i - 1]
+    return data
+
+
+def encode_month(month: date, rows: Sequence[tuple]) -> bytes:
+    """Serialize ``COLUMNS``-ordered rows of one month into archive bytes."""
+    columns = list(zip(*rows)) if rows else [()] * len(COLUMNS)
+    ids, employees, check_times, log_types, sources, created, work_dates = columns
+
+    blobs: List[Tuple[str, dict, bytes]] = [
+        ("id", {"encoding": "delta-int64"}, _pack(ids, "q", delta=True)),
+        ("check_time", {"encoding": "delta-int64-us"}, _pack([_to_micros(t) for t in check_times], "q", delta=True)),
+        ("created_at", {"encoding": "delta-int64-us"}, _pack([_to_micros(t) for t in created], "q", delta=True)),
+    ]
+    for name, values, typecode in (
+        ("employee_id", [str(v) for v in employees], "I"),
+        ("log_type", log_types, "B"),
+        ("source", sources, "I"),
+        ("work_date", [d.isoformat() for d in work_dates], "H"),
+    ):
+        codes: Dict[object, int] = {}
+        packed = _pack([codes.setdefault(v, len(codes)) for v in values], typecode)
+        blobs.append((name, {"encoding": f"dict-{typecode}", "dictionary": list(codes)}, packed))
+
+    header = {"version": 2, "month": month.strftime("%Y-%m"), "rows": len(rows), "columns": {}}
+    offset = 0
+    for name, meta, blob in blobs:
+        header["columns"][name] = dict(meta, offset=offset, length=len(blob))
+        offset += len(blob)
+    raw_header = json.dumps(header, separators=(",", ":")).encode()
+    return b"".join([MAGIC, struct.pack("<I", len(raw_header)), raw_header] + [blob for _, _, blob in blobs])
+
+
+class MonthArchive:
+    """Decoded view of one archive file; columns are decoded on first access."""
+
+    def __init__(self, data: bytes) -> None:
+        if data[: len(MAGIC)] != MAGIC:
+            raise ArchiveError("not an attendance archive file")
+        (length,) = struct.unpack_from("<I", data, len(MAGIC))
+        start = len(MAGIC) + 4
+        self.header = json.loads(data[start:start + length])
+        self._body = memoryview(data)[start + length:]
+        self._columns: Dict[str, list] = {}
+        self.rows = int(self.header["rows"])
+
+    def _blob(self, name: str) -> bytes:
+        meta = self.header["columns"][name]
+        return self._body[meta["offset"]:meta["offset"] + meta["length"]]
+
+    def column(self, name: str):
+        if name not in self._columns:
+            if name == "work_date" and name not in self.header["columns"]:
+                offset = workdays.cutover()
+                self._columns[name] = [workdays.work_date(t, offset) for t in self.timestamps("check_time")]
+                return self._columns[name]
+            meta = self.header["columns"][name]
+            encoding = meta["encoding"]
+            if encoding.startswith("delta-int64"):
+                values = _unpack(self._blob(name), "q", delta=True)
+            else:
+                dictionary = meta["dictionary"]
+                if name == "employee_id":
+                    dictionary = [UUID(v) for v in dictionary]
+                elif name == "work_date":
+                    dictionary = [date.fromisoformat(v) for v in dictionary]
+                codes = _unpack(self._blob(name), encoding.split("-", 1)[1])
+                values = [dictionary[c] for c in codes]
+            self._columns[name] = values
+        return self._columns[name]
+
+    def timestamps(self, name: str) -> List[datetime]:
+        key = f"{name}:datetime"
+        if key not in self._columns:
+            self._columns[key] = [_EPOCH + v * _MICRO for v in self.column(name)]
+        return self._columns[key]
+
+    def slice(self, start: Optional[datetime], end: Optional[datetime], end_inclusive: bool) -> range:
+        """Row positions with ``start <= check_time < end`` (``<= end`` if inclusive)."""
+        micros = self.column("check_time")
+        lo = 0 if start is None else bisect_left(micros, _to_micros(start))
+        if end is None:
+            hi = self.rows
+        elif end_inclusive:
+            hi = bisect_right(micros, _to_micros(end))
+        else:
+            hi = bisect_left(micros, _to_micros(end))
+        return range(lo, hi)
+
+
+@lru_cache(maxsize=12)
+def _open(path: str, sha256: str) -> MonthArchive:
+    try:
+        data = Path(path).read_bytes()
+    except OSError as exc:
+        raise ArchiveError(f"cannot read archive {path}: {exc}") from exc
+    if hashlib.sha256(data).hexdigest() != sha256:
+        raise ArchiveError(f"checksum mismatch for archive {path}")
+    return MonthArchive(data)
+
+
+def load(entry: ArchivedMonth) -> MonthArchive:
+    """Open and checksum-verify an archived month (cached per process)."""
+    return _open(str(archive_dir() / entry.path), entry.sha256)
+
+
+def archived_months(start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[ArchivedMonth]:
+    """Manifest entries whose punches overlap ``[start, end]``."""
+    entries = ArchivedMonth.objects.all()
+    if start is not None:
+        entries = entries.filter(last_check_time__gte=start)
+    if end is not None:
+        entries = entries.filter(first_check_time__lte=end)
+    return list(entries.order_by("month"))
+
+
+def _employee_keys() -> Dict[UUID, int]:
+    return dict(Employee.objects.values_list("id", "log_key"))
+
+
+def _columns(archive: MonthArchive, columns: Sequence[str], keys: Dict[UUID, int]) -> List[list]:
+    data = []
+    for name in columns:
+        if name in ("check_time", "created_at"):
+            data.append(archive.timestamps(name))
+        elif name == "employee_id":
+            data.append([keys.get(uuid) for uuid in archive.column(name)])
+        else:
+            data.append(archive.column(name))
+    return data
+
+
+def rows(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    *,
+    end_inclusive: bool = False,
+    employee_ids: Optional[Iterable[int]] = None,
+    columns: Sequence[str] = COLUMNS,
+    reverse: bool = False,
+) -> Iterator[tuple]:
+    """Yield archived rows as tuples of ``columns``, oldest first (newest first if ``reverse``).
+
+    ``employee_id`` is the employee's ``log_key``; punches of employees deleted
+    since archiving are skipped, as their hot rows would have been.
+    """
+    wanted = set(employee_ids) if employee_ids is not None else None
+    entries = archived_months(start, end)
+    keys = _employee_keys() if entries else {}
+    for entry in reversed(entries) if reverse else entries:
+        archive = load(entry)
+        employees = _columns(archive, ["employee_id"], keys)[0]
+        data = _columns(archive, columns, keys)
+        positions = archive.slice(start, end, end_inclusive)
+        for i in reversed(positions) if reverse else positions:
+            employee = employees[i]
+            if employee is not None and (wanted is None or employee in wanted):
+                yield tuple(column[i] for column in data)
+
+
+def get_row(log_id: int) -> Optional[tuple]:
+    """Find one archived row (``COLUMNS``) by id."""
+    for entry in ArchivedMonth.objects.filter(min_id__lte=log_id, max_id__gte=log_id):
+        archive = load(entry)
+        try:
+            i = archive.column("id").index(log_id)
+        except ValueError:
+            continue
+        row = tuple(column[i] for column in _columns(archive, COLUMNS, _employee_keys()))
+        return row if row[1] is not None else None
+    return None
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+    fd = os.open(path.parent, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def archive_month(month: date) -> Optional[ArchivedMonth]:
+    """Move one month partition into an archive file and drop the partition.
+
+    The partition is locked against writes while it is exported; the file is
+    fsync'd and re-read against its checksum before the manifest row and the
+    DETACH/DROP commit together.
+    """
+    name = partition_name(month)
+    if ArchivedMonth.objects.filter(month=month).exists():
+        logger.warning("Month %s is already archived; leaving %s in place.", month, name)
+        return None
+    if not any(existing == name for existing, _ in list_partitions()):
+        logger.warning("No partition %s to archive.", name)
+        return None
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {name} IN SHARE MODE")
+        cursor.execute(
+            f"""
+            SELECT l.id, e.id, l.check_time, l.log_type, s.name, l.created_at, l.work_date
+            FROM {name} l
+            JOIN employees e ON e.log_key = l.employee_id
+            LEFT JOIN attendance_sources s ON s.id = l.source_id
+            ORDER BY l.check_time, l.id
+            """
+        )
+        names = DirectionField.NAMES
+        data_rows = [row[:3] + (names[row[3]],) + row[4:] for row in cursor.fetchall()]
+        entry = None
+        if data_rows:
+            relative = f"{month:%Y}/{name}{SUFFIX}"
+            path = archive_dir() / relative
+            data = encode_month(month, data_rows)
+            _write_atomic(path, data)
+            sha256 = hashlib.sha256(data).hexdigest()
+            if list(_open(str(path), sha256).column("id")) != [row[0] for row in data_rows]:
+                raise ArchiveError(f"archive {path} does not round-trip")
+            entry = ArchivedMonth.objects.create(
+                month=month,
+                path=relative,
+                sha256=sha256,
+                row_count=len(data_rows),
+                byte_size=len(data),
+                min_id=min(row[0] for row in data_rows),
+                max_id=max(row[0] for row in data_rows),
+                first_check_time=data_rows[0][2],
+                last_check_time=data_rows[-1][2],
+            )
+        cursor.execute(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}")
+        cursor.execute(f"DROP TABLE {name}")
+    logger.info("Archived %s: %d logs.", name, len(data_rows))
+    return entry
+
+
+def delete_month(entry: ArchivedMonth) -> None:
+    """Remove an archived month for good: the manifest row first, then its file."""
+    path = archive_dir() / entry.path
+    entry.delete()
+    _open.cache_clear()
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+    except OSError as exc:
+        logger.warning("Removed the manifest for %s but not the file: %s", path, exc)
+
+
+def archive_old_months(after_months: Optional[int] = None, today: Optional[date] = None) -> List[str]:
+    """Archive every month partition older than ``after_months``; 0 disables archiving."""
+    if after_months is None:
+        after_months = int(getattr(settings, "ATTENDANCE_ARCHIVE_AFTER_MONTHS", 0))
+    if not after_months:
+        return []
+    cutoff = add_months((today or timezone.localdate()).replace(day=1), -after_months)
+    archived = []
+    for name, month in list_partitions():
+        if month is not None and month < cutoff:
+            archive_month(month)
+            archived.append(name)
+    return archived
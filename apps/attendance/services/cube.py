@@ -0,0 +1,115 @@
+from __future__ import annotations
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from django.db import connection
+from django.db.models import F, Sum
+from django.db.models.functions import ExtractIsoWeekDay, TruncMonth
+
+from apps.attendance.models import AttendanceCube, DirectionField
+from apps.attendance.services import workdays
+from apps.attendance.services.projections import Projection
+
+# Adds one batch of punches to the cube cells they fall in. Department is the
+# employee's department at ingest time; hour is the local hour of check_time
+# and work_date the cutover day of check_time alone (so a 02:00 punch before
+# the cutover lands in hour 2 of the previous work day). Unlike the stored
+# attendance_logs.work_date, night-shift attribution is not applied: it depends
+# on other punches and can move a row after it was counted, which additive
+# cells cannot follow, so a night OUT after the cutover counts on its own day.
+# Employees are joined on log_key.
+APPLY_SQL = f"""
+INSERT INTO attendance_cube AS c (department_id, work_date, hour, log_type, punch_count)
+SELECT e.department_id,
+       {workdays.WORK_DATE_SQL},
+       extract(hour FROM check_time AT TIME ZONE %(tz)s)::smallint,
+       t.log_type,
+       count(*)
+FROM unnest(%(employees)s::int[], %(times)s::timestamptz[], %(types)s::smallint[])
+     AS t(employee_id, check_time, log_type)
+JOIN employees e ON e.log_key = t.employee_id
+GROUP BY 1, 2, 3, 4
+ORDER BY 1, 2, 3, 4
+ON CONFLICT (work_date, department_id, hour, log_type)
+DO UPDATE SET punch_count = c.punch_count + EXCLUDED.punch_count
+"""
+
+# Group-by dimensions the API accepts: output key -> cube field name or expression.
+DIMENSIONS = {
+    "department": {"department_id": "department_id", "department_name": F("department__name")},
+    "day": {"day": F("work_date")},
+    "month": {"month": TruncMonth("work_date")},
+    "weekday": {"weekday": ExtractIsoWeekDay("work_date")},
+    "hour": {"hour": "hour"},
+    "direction": {"direction": F("log_type")},
+}
+
+
+class CubeProjection(Projection):
+    """Keeps ``attendance_cube`` counts current, inside the ingest transaction.
+
+    Cells only ever grow by the rows a batch inserted, so the update is a single
+    upsert. Cells are shared across employees, so concurrent batches may update
+    the same cell; they lock cells in key order and never deadlock.
+    """
+
+    name = "attendance_cube"
+
+    def apply(self, rows: Sequence[tuple]) -> None:
+        codes = DirectionField.CODES
+        with connection.cursor() as cursor:
+            cursor.execute(
+                APPLY_SQL,
+                {
+                    "employees": [row[1] for row in rows],
+                    "times": [row[2] for row in rows],
+                    "types": [codes[row[3]] if isinstance(row[3], str) else row[3] for row in rows],
+                    **workdays.sql_params(),
+                },
+            )
+
+    def reset(self, start: datetime, end: datetime) -> None:
+        AttendanceCube.objects.filter(
+            work_date__gte=workdays.work_date(start),
+            work_date__lt=workdays.work_date(end),
+        ).delete()
+
+
+def query(
+    group_by: Sequence[str],
+    start: date,
+    end: date,
+    department_id: Optional[str] = None,
+    direction: Optional[str] = None,
+    hours: Optional[Tuple[int, int]] = None,
+) -> List[Dict[str, object]]:
+    """Punch totals for work days ``start..end`` (inclusive), one row per combination of ``group_by``.
+
+    ``group_by`` must be keys of ``DIMENSIONS``; an empty list gives the grand total.
+    """
+    cells = AttendanceCube.objects.filter(work_date__gte=start, work_date__lte=end)
+    if department_id:
+        cells = cells.filter(department_id=department_id)
+    if direction:
+        cells = cells.filter(log_type=direction)
+    if hours is not None:
+        cells = cells.filter(hour__gte=hours[0], hour__lte=hours[1])
+
+    columns: Dict[str, object] = {}
+    for dimension in group_by:
+        columns.update(DIMENSIONS[dimension])
+    if not columns:
+        total = cells.aggregate(punches=Sum("punch_count"))["punches"] or 0
+        return [{"punches": total}] if total else []
+    order = [
+        F("department_name").asc(nulls_last=True) if key == "department_id" else key
+        for key in columns
+        if key != "department_name"
+    ]
+    fields = [key for key, column in columns.items() if isinstance(column, str)]
+    expressions = {key: column for key, column in columns.items() if not isinstance(column, str)}
+    return list(
+        cells.values(*fields, **expressions)
+        .annotate(punches=Sum("punch_count"))
+        .order_by(*order)
+    )
@@ -0,0 +1,192 @@
+from __future__ import annotations
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime, tzinfo
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.attendance.models import DirectionField
+from apps.employees.models import Employee
+from apps.integrations.fingertec.adapters import LogRecord
+from . import archive, live, outbox, projections, watermark, workdays
+from .workdays import cutover, work_date
+
+logger = logging.getLogger(__name__)
+
+# (id, employee_id, check_time, log_type) as returned by the INSERT;
+# employee_id is ``Employee.log_key`` and log_type "IN"/"OUT".
+InsertedLog = Tuple[int, int, datetime, str]
+
+# Transaction-scoped advisory locks (INGEST_LOCK_KEY, employee log_key) are
+# taken in key order on the batch's employees before the insert, so batches
+# for the same employee take turns (projections recompute that employee's
+# days from what they can see) while other batches run in parallel.
+INGEST_LOCK_KEY = 814_217
+
+EMPLOYEE_LOCK_SQL = "SELECT count(pg_advisory_xact_lock(%s, k)) FROM unnest(%s::int[]) AS k"
+
+# Rows are COPY'd into a per-session staging table and merged in one statement;
+# COPY avoids building (and quoting) huge parameter lists for every batch.
+STAGE_TABLE = "attendance_ingest_stage"
+
+CREATE_STAGE_SQL = f"""
+    CREATE TEMP TABLE IF NOT EXISTS {STAGE_TABLE} (
+        employee_id integer NOT NULL,
+        check_time timestamptz NOT NULL,
+        log_type smallint NOT NULL,
+        work_date date NOT NULL
+    ) ON COMMIT DELETE ROWS
+"""
+
+COPY_SQL = f"COPY {STAGE_TABLE} (employee_id, check_time, log_type, work_date) FROM STDIN (FORMAT BINARY)"
+
+# Sources are a smallint lookup; the NOT EXISTS guard keeps known names from
+# consuming a sequence value on every batch.
+SOURCE_SQL = """
+    INSERT INTO attendance_sources (name)
+    SELECT %(source)s WHERE NOT EXISTS (SELECT 1 FROM attendance_sources WHERE name = %(source)s)
+    ON CONFLICT (name) DO NOTHING
+"""
+
+MERGE_SQL = f"""
+    INSERT INTO attendance_logs (employee_id, check_time, work_date, log_type, source_id, created_at)
+    SELECT employee_id, check_time, work_date, log_type,
+           (SELECT id FROM attendance_sources WHERE name = %s), now()
+    FROM {STAGE_TABLE}
+    ON CONFLICT (employee_id, check_time) DO NOTHING
+    RETURNING id, employee_id, check_time, log_type
+"""
+
+
+@dataclass
+class IngestResult:
+    received: int = 0
+    inserted: List[InsertedLog] = field(default_factory=list)
+    unknown_employees: int = 0
+    duplicates: int = 0
+
+    @property
+    def inserted_count(self) -> int:
+        return len(self.inserted)
+
+    @property
+    def latest_check_time(self) -> Optional[datetime]:
+        if not self.inserted:
+            return None
+        return max(row[2] for row in self.inserted)
+
+
+def resolve_employees(employee_ids: Iterable[str]) -> Dict[str, int]:
+    """Map device employee identifiers to ``Employee.log_key`` in one query."""
+    ids = set(employee_ids)
+    if not ids:
+        return {}
+    return dict(
+        Employee.objects.filter(employee_id__in=ids).values_list("employee_id", "log_key")
+    )
+
+
+def drop_archived(rows: List[Tuple[int, datetime, int, date]]) -> List[Tuple[int, datetime, int, date]]:
+    """Rows not already in the cold archive.
+
+    The unique constraint only covers the hot table, so a punch of an archived
+    month that is delivered again would otherwise land in the default
+    partition and be read twice. New punches of archived months are kept.
+    """
+    times = [row[1] for row in rows]
+    if not rows or not archive.archived_months(min(times), max(times)):
+        return rows
+    archived = set(archive.rows(
+        min(times), max(times),
+        end_inclusive=True,
+        employee_ids={row[0] for row in rows},
+        columns=("employee_id", "check_time"),
+    ))
+    return [row for row in rows if (row[0], row[1]) not in archived]
+
+
+def ensure_aware(ts: datetime, tz: tzinfo | None = None) -> datetime:
+    # Devices and the Ingress DB report wall-clock time in the site time zone.
+    if ts.tzinfo is None:
+        return ts.replace(tzinfo=tz or timezone.get_current_timezone())
+    return ts
+
+
+def write_logs(records: Iterable[LogRecord], source: str) -> IngestResult:
+    """Insert attendance records in bulk, skipping unknown employees and duplicates.
+
+    Records are de-duplicated on ``(employee, check_time)`` inside the batch,
+    against the cold archive and against the table (``ON CONFLICT DO NOTHING``),
+    so re-delivering the same batch is harmless. Registered projections see
+    exactly the inserted rows, in the same transaction. Returns the rows that
+    were actually inserted.
+    """
+    records = list(records)
+    result = IngestResult(received=len(records))
+    if not records:
+        return result
+
+    employees = resolve_employees(r.employee_id for r in records)
+    unknown = set()
+    seen = set()
+    tz = timezone.get_current_timezone()
+    offset = cutover()
+    codes = DirectionField.CODES
+    rows: List[Tuple[int, datetime, int, date]] = []
+    for rec in records:
+        emp_key = employees.get(rec.employee_id)
+        if emp_key is None:
+            unknown.add(rec.employee_id)
+            result.unknown_employees += 1
+            continue
+        check_time = ensure_aware(rec.timestamp, tz)
+        key = (emp_key, check_time)
+        if key in seen:
+            result.duplicates += 1
+            continue
+        seen.add(key)
+        rows.append((emp_key, check_time, codes[rec.type], work_date(check_time, offset)))
+
+    for employee_id in sorted(unknown):
+        logger.warning("Skipping log for unknown employee ID: %s", employee_id)
+
+    fresh = drop_archived(rows)
+    result.duplicates += len(rows) - len(fresh)
+    rows = fresh
+
+    if rows:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(CREATE_STAGE_SQL)
+                with cursor.copy(COPY_SQL) as copy:
+                    copy.set_types(["int4", "timestamptz", "int2", "date"])
+                    for row in rows:
+                        copy.write_row(row)
+                cursor.execute(SOURCE_SQL, {"source": source})
+                cursor.execute(EMPLOYEE_LOCK_SQL, [INGEST_LOCK_KEY, sorted({row[0] for row in rows})])
+                watermark.hold(cursor)
+                cursor.execute(MERGE_SQL, [source])
+                names = DirectionField.NAMES
+                result.inserted.extend(
+                    (log_id, employee_id, check_time, names[log_type])
+                    for log_id, employee_id, check_time, log_type in cursor.fetchall()
+                )
+                shift = workdays.max_shift()
+                if result.inserted and shift:
+                    times = [row[2] for row in result.inserted]
+                    workdays.attribute_shifts(
+                        cursor, sorted({row[1] for row in result.inserted}), min(times), max(times) + shift
+                    )
+                cursor.execute(f"TRUNCATE {STAGE_TABLE}")
+            if result.inserted:
+                # Listeners only ever hear about committed rows.
+                transaction.on_commit(lambda: live.publish_punches(result.inserted, source), robust=True)
+            projections.dispatch(result.inserted)
+            outbox.enqueue(result.inserted)
+
+    result.duplicates += len(rows) - len(result.inserted)
+    if result.duplicates:
+        logger.info("Skipped %d duplicate attendance logs.", result.duplicates)
+    return result
@@ -0,0 +1,81 @@
+"""Live events for dashboards, relayed by ``GET /api/live`` (see ``api/live.py``).
+
+Publishers send one ready-made server-sent event frame per message on the
+``atlas:live`` Redis pub/sub channel, so a frame is encoded once however many
+streams relay it:
+
+- ``punches``  the rows of one committed ingest batch, in the columns of
+  ``/api/attendance-logs/changes/``; the frame id is a feed cursor
+  (``watermark.settled_id`` once the batch committed), which can be below
+  the batch's own ids while an earlier batch is still being written
+- ``presence`` the presence changes one batch caused (``services/presence.py``)
+- ``sync``     the outcome of each sync run
+
+Nothing is stored: a client that was disconnected catches up with
+``/api/attendance-logs/changes/?cursor=<last event id>`` and drops the rows
+it already has by ``id``. Without ``REDIS_URL``
+publishing does nothing, and a failed publish is logged, never raised.
+"""
+from __future__ import annotations
+import logging
+from functools import lru_cache
+from typing import Any, Optional, Sequence
+
+import redis
+from django.conf import settings
+
+from apps.attendance.services import watermark
+from apps.core import fastjson
+from apps.employees.models import Employee
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "atlas:live"
+EVENTS = ("punches", "presence", "sync")
+PUNCH_COLUMNS = ["id", "employee", "employee_employee_id", "check_time", "log_type", "source"]
+
+
+def enabled() -> bool:
+    return bool(getattr(settings, "REDIS_URL", None))
+
+
+@lru_cache(maxsize=1)
+def _client() -> "redis.Redis":
+    return redis.Redis.from_url(settings.REDIS_URL)
+
+
+def frame(event: str, data: Any, event_id: Optional[int] = None) -> bytes:
+    """``event:``/``id:``/``data:`` lines of one event; ``event:`` always comes first."""
+    head = f"event: {event}\n" if event_id is None else f"event: {event}\nid: {event_id}\n"
+    # Compact JSON never contains a raw newline, so one data line is enough.
+    return head.encode() + b"data: " + fastjson.dumps(data) + b"\n\n"
+
+
+def event_name(message: bytes) -> str:
+    return message[len(b"event: "): message.index(b"\n")].decode()
+
+
+def publish(event: str, data: Any, event_id: Optional[int] = None) -> None:
+    if not enabled():
+        return
+    try:
+        _client().publish(CHANNEL, frame(event, data, event_id))
+    except redis.RedisError as exc:
+        logger.warning("Live %s event not published: %s", event, exc)
+
+
+def publish_punches(rows: Sequence[tuple], source: str) -> None:
+    """One ``punches`` event for the ``(id, log_key, check_time, log_type)`` rows of a committed batch."""
+    if not rows or not enabled():
+        return
+    employees = {
+        log_key: (pk, code)
+        for log_key, pk, code in Employee.objects.filter(log_key__in={row[1] for row in rows}).values_list(
+            "log_key", "id", "employee_id"
+        )
+    }
+    out = []
+    for log_id, log_key, check_time, log_type in rows:
+        pk, code = employees.get(log_key, (None, None))
+        out.append([log_id, pk, code, check_time, log_type, source])
+    publish("punches", {"columns": PUNCH_COLUMNS, "rows": out}, event_id=watermark.settled_id())
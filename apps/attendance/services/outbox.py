@@ -0,0 +1,124 @@
+from __future__ import annotations
+import gzip
+import hashlib
+import hmac
+import json
+import logging
+import urllib.error
+import urllib.request
+from datetime import timedelta
+from typing import List, Sequence
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Min, Q
+from django.utils import timezone
+
+from apps.attendance.models import AttendanceLog, OutboxEvent, WebhookEndpoint
+from apps.attendance.services import watermark
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ["id", "employee", "employee_employee_id", "check_time", "log_type"]
+
+
+def enqueue(rows: Sequence[tuple]) -> None:
+    """Record the ids of newly inserted logs; must run inside the ingest transaction.
+
+    The event id is the batch's lowest log id. Batches may commit out of
+    order, so the dispatcher only reads events up to ``watermark.settled_id``
+    and its cursor never skips a slower transaction.
+    Events are recorded even with no active endpoint, so one configured later
+    still receives the last ``OUTBOX_RETENTION_HOURS`` of logs.
+    """
+    if not rows:
+        return
+    log_ids = [row[0] for row in rows]
+    OutboxEvent.objects.create(id=min(log_ids), log_ids=log_ids)
+
+
+def build_payload(events: List[OutboxEvent]) -> bytes:
+    """Coalesce events into one gzip-compressed, columnar JSON document."""
+    log_ids = [log_id for event in events for log_id in event.log_ids]
+    rows = (
+        AttendanceLog.objects.filter(id__in=log_ids)
+        .order_by("id")
+        .values_list("id", "employee__id", "employee__employee_id", "check_time", "log_type")
+    )
+    body = {
+        "first_event_id": events[0].id,
+        "last_event_id": events[-1].id,
+        "columns": COLUMNS,
+        "rows": list(rows),
+    }
+    raw = json.dumps(body, cls=DjangoJSONEncoder, separators=(",", ":")).encode()
+    return gzip.compress(raw)
+
+
+def _post(endpoint: WebhookEndpoint, body: bytes) -> None:
+    request = urllib.request.Request(endpoint.url, data=body, method="POST")
+    request.add_header("Content-Type", "application/json")
+    request.add_header("Content-Encoding", "gzip")
+    if endpoint.secret:
+        signature = hmac.new(endpoint.secret.encode(), body, hashlib.sha256).hexdigest()
+        request.add_header("X-Atlas-Signature", f"sha256={signature}")
+    timeout = float(getattr(settings, "OUTBOX_WEBHOOK_TIMEOUT", 10))
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        response.read()
+
+
+def deliver(endpoint: WebhookEndpoint) -> int:
+    """Send pending events to one endpoint in coalesced batches; return logs delivered."""
+    max_logs = int(getattr(settings, "OUTBOX_BATCH_MAX_LOGS", 5000))
+    delivered = 0
+    while True:
+        events: List[OutboxEvent] = []
+        size = 0
+        pending = OutboxEvent.objects.filter(id__gt=endpoint.last_event_id, id__lte=watermark.settled_id())
+        for event in pending.order_by("id").iterator():
+            if events and size + len(event.log_ids) > max_logs:
+                break
+            events.append(event)
+            size += len(event.log_ids)
+        if not events:
+            return delivered
+
+        try:
+            _post(endpoint, build_payload(events))
+        except (urllib.error.URLError, OSError) as exc:
+            endpoint.failures += 1
+            backoff = min(2 ** endpoint.failures, 3600)
+            endpoint.next_attempt_at = timezone.now() + timedelta(seconds=backoff)
+            endpoint.last_error = str(exc)[:1000]
+            endpoint.save(update_fields=["failures", "next_attempt_at", "last_error", "updated_at"])
+            logger.warning("Webhook %s failed (attempt %d); retrying in %ds.", endpoint.name, endpoint.failures, backoff)
+            return delivered
+
+        endpoint.last_event_id = events[-1].id
+        endpoint.failures = 0
+        endpoint.next_attempt_at = None
+        endpoint.last_error = ""
+        endpoint.save(update_fields=["last_event_id", "failures", "next_attempt_at", "last_error", "updated_at"])
+        delivered += size
+
+
+def dispatch_outbox() -> int:
+    """Deliver to every due endpoint, then drop events all active endpoints have
+    received and events older than ``OUTBOX_RETENTION_HOURS``.
+
+    Delivery is at-least-once: the endpoint cursor only advances after a 2xx,
+    so receivers should de-duplicate on ``last_event_id``/log ``id``.
+    """
+    now = timezone.now()
+    delivered = 0
+    due = WebhookEndpoint.objects.filter(is_active=True).exclude(next_attempt_at__gt=now)
+    for endpoint in due:
+        delivered += deliver(endpoint)
+
+    retention = timedelta(hours=float(getattr(settings, "OUTBOX_RETENTION_HOURS", 72)))
+    stale = Q(created_at__lt=now - retention)
+    floor = WebhookEndpoint.objects.filter(is_active=True).aggregate(m=Min("last_event_id"))["m"]
+    if floor is not None:
+        stale |= Q(id__lte=floor)
+    OutboxEvent.objects.filter(stale).delete()
+    return delivered
@@ -0,0 +1,135 @@
+from __future__ import annotations
+import logging
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "attendance_logs"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+
+
+def add_months(month: date, n: int) -> date:
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_bounds(month: date) -> Tuple[datetime, datetime]:
+    """``[start, end)`` of a calendar month in the site time zone."""
+    start = timezone.make_aware(datetime(month.year, month.month, 1))
+    nxt = add_months(month, 1)
+    return start, timezone.make_aware(datetime(nxt.year, nxt.month, 1))
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_{month.year:04d}_{month.month:02d}"
+
+
+def list_partitions() -> List[Tuple[str, Optional[date]]]:
+    """Attached partitions as ``(table, month)``; ``month`` is None for the default one."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_class p ON p.oid = i.inhparent
+            WHERE p.relname = %s
+            ORDER BY c.relname
+            """,
+            [PARENT_TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    partitions = []
+    for name in names:
+        suffix = name[len(PARENT_TABLE) + 1:]
+        try:
+            year, month = suffix.split("_")
+            partitions.append((name, date(int(year), int(month), 1)))
+        except ValueError:
+            partitions.append((name, None))
+    return partitions
+
+
+def create_partition(month: date) -> bool:
+    """Create the partition for ``month`` if missing; return True if it was created.
+
+    Rows that already landed in the default partition for that month are moved
+    into the new partition in the same transaction. Inserts wait until it
+    commits: one landing in the default partition between the check and the
+    CREATE/ATTACH would make PostgreSQL reject the new partition. Partitions
+    are normally created ahead (``maintain_partitions``), so this is brief.
+    """
+    name = partition_name(month)
+    if any(existing == name for existing, _ in list_partitions()):
+        return False
+    start, end = month_bounds(month)
+    with transaction.atomic(), connection.cursor() as cursor:
+        # The parent first (the order inserts take), then every partition with it.
+        cursor.execute(f"LOCK TABLE {PARENT_TABLE} IN SHARE ROW EXCLUSIVE MODE")
+        cursor.execute(
+            f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE check_time >= %s AND check_time < %s)",
+            [start, end],
+        )
+        if not cursor.fetchone()[0]:
+            cursor.execute(
+                f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} FOR VALUES FROM (%s) TO (%s)",
+                [start, end],
+            )
+        else:
+            cursor.execute(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS)")
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+                f"WHERE check_time >= %s AND check_time < %s RETURNING *) "
+                f"INSERT INTO {name} SELECT * FROM moved",
+                [start, end],
+            )
+            cursor.execute(
+                f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)",
+                [start, end],
+            )
+    logger.info("Created partition %s.", name)
+    return True
+
+
+def detach_partition(name: str) -> None:
+    """Detach a month partition; the table is kept for archival or retention jobs."""
+    with connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}")
+    logger.info("Detached partition %s.", name)
+
+
+def maintain_partitions(
+    months_ahead: Optional[int] = None,
+    retention_months: Optional[int] = None,
+    today: Optional[date] = None,
+) -> Tuple[List[str], List[str]]:
+    """Pre-create future month partitions and detach those past retention.
+
+    Returns ``(created, detached)`` table names. A ``retention_months`` of 0
+    (the default) keeps every partition attached.
+    """
+    if months_ahead is None:
+        months_ahead = int(getattr(settings, "ATTENDANCE_PARTITION_MONTHS_AHEAD", 3))
+    if retention_months is None:
+        retention_months = int(getattr(settings, "ATTENDANCE_PARTITION_RETENTION_MONTHS", 0))
+    current = (today or timezone.localdate()).replace(day=1)
+
+    created = [
+        partition_name(month)
+        for month in (add_months(current, n) for n in range(months_ahead + 1))
+        if create_partition(month)
+    ]
+
+    detached: List[str] = []
+    if retention_months:
+        cutoff = add_months(current, -retention_months)
+        for name, month in list_partitions():
+            if month is not None and month < cutoff:
+                detach_partition(name)
+                detached.append(name)
+    return created, detached
@@ -0,0 +1,396 @@
+"""Live "who is inside now" state for the current work day, kept in Redis at ingest.
+
+Per work day (``atlas:presence:<YYYY-MM-DD>:``, expiring after two days):
+
+- ``last``         hash  log_key -> "<epoch µs>:<IN|OUT>:<department>"
+- ``dept:<dept>``  hash  log_key -> "<epoch µs>:<IN|OUT>", everyone seen today
+- ``in:<dept>``    set   log_keys whose last punch today is IN
+- ``depts``        set   departments with at least one entry
+- ``built``        set by ``rebuild()``; a day without it is rebuilt on first read
+
+``<dept>`` is the department id, or ``-`` for employees without one. A
+department's inside count is one ``SCARD`` and its members one ``SMEMBERS``;
+nothing scans punches. ``PresenceProjection`` updates the keys after every
+committed ingest batch with a Lua script that only moves an employee forward
+in time, so late or replayed punches cannot undo a newer one, and publishes
+what changed as a ``presence`` live event (``services/live.py``). ``rebuild()``
+(nightly task, or ``rebuild_projection attendance_presence``) rewrites the day
+from ``attendance_logs`` atomically; reads rebuild a day that has no
+``built`` marker, so a flushed Redis heals on the next request. Without
+``REDIS_URL`` the same state is computed from the database on each request.
+"""
+from __future__ import annotations
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import redis
+from django.conf import settings
+from django.utils import timezone
+
+from apps.attendance.models import AttendanceLog
+from apps.attendance.services import live, watermark, workdays
+from apps.attendance.services.projections import Projection, get_projections
+from apps.employees.models import Employee
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "atlas:presence"
+NO_DEPARTMENT = "-"
+TTL_SECONDS = 2 * 86400
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_MICRO = timedelta(microseconds=1)
+
+# KEYS: none (all keys share ARGV[1]); ARGV: prefix, ttl, then
+# (log_key, epoch µs, direction, department) for each punch, oldest first.
+# Returns the applied punches as flat (log_key, epoch µs, direction,
+# department, previous department or '') and the new (department, inside,
+# seen) of every department they touched.
+_APPLY_LUA = """
+local prefix, ttl = ARGV[1], tonumber(ARGV[2])
+local last_key, depts_key = prefix .. 'last', prefix .. 'depts'
+local changes, touched = {}, {}
+for i = 3, #ARGV, 4 do
+  local emp, t, dir, dept = ARGV[i], ARGV[i + 1], ARGV[i + 2], ARGV[i + 3]
+  local last = redis.call('HGET', last_key, emp)
+  local old_t, old_dept = nil, nil
+  if last then
+    old_t, old_dept = string.match(last, '^(%d+):%a+:(.*)$')
+  end
+  if not last or tonumber(t) > tonumber(old_t) then
+    local moved = ''
+    if old_dept and old_dept ~= dept then
+      redis.call('HDEL', prefix .. 'dept:' .. old_dept, emp)
+      redis.call('SREM', prefix .. 'in:' .. old_dept, emp)
+      moved = old_dept
+      touched[old_dept] = true
+    end
+    redis.call('HSET', last_key, emp, t .. ':' .. dir .. ':' .. dept)
+    redis.call('HSET', prefix .. 'dept:' .. dept, emp, t .. ':' .. dir)
+    if dir == 'IN' then
+      redis.call('SADD', prefix .. 'in:' .. dept, emp)
+    else
+      redis.call('SREM', prefix .. 'in:' .. dept, emp)
+    end
+    redis.call('SADD', depts_key, dept)
+    redis.call('EXPIRE', prefix .. 'dept:' .. dept, ttl)
+    redis.call('EXPIRE', prefix .. 'in:' .. dept, ttl)
+    touched[dept] = true
+    for _, value in ipairs({emp, t, dir, dept, moved}) do
+      table.insert(changes, value)
+    end
+  end
+end
+redis.call('EXPIRE', last_key, ttl)
+redis.call('EXPIRE', depts_key, ttl)
+local counts = {}
+for dept in pairs(touched) do
+  table.insert(counts, dept)
+  table.insert(counts, redis.call('SCARD', prefix .. 'in:' .. dept))
+  table.insert(counts, redis.call('HLEN', prefix .. 'dept:' .. dept))
+end
+return {changes, counts}
+"""
+
+# Deletes every key of one day; ARGV[1] is the day prefix.
+_CLEAR_LUA = """
+local prefix = ARGV[1]
+for _, dept in ipairs(redis.call('SMEMBERS', prefix .. 'depts')) do
+  redis.call('DEL', prefix .. 'dept:' .. dept, prefix .. 'in:' .. dept)
+end
+redis.call('DEL', prefix .. 'last', prefix .. 'depts', prefix .. 'built')
+return 1
+"""
+
+
+@dataclass(frozen=True)
+class Member:
+    log_key: int
+    check_time: datetime
+    log_type: str
+
+
+@dataclass
+class DepartmentPresence:
+    department_id: Optional[str]
+    inside: int
+    seen: int
+    members: List[Member]
+
+
+def available() -> bool:
+    """Live state is kept only with Redis configured and the projection registered."""
+    return bool(getattr(settings, "REDIS_URL", None)) and PresenceProjection.name in get_projections()
+
+
+@lru_cache(maxsize=1)
+def _client() -> "redis.Redis":
+    return redis.Redis.from_url(settings.REDIS_URL)
+
+
+@lru_cache(maxsize=1)
+def _scripts():
+    client = _client()
+    return client.register_script(_APPLY_LUA), client.register_script(_CLEAR_LUA)
+
+
+def today() -> date:
+    return workdays.work_date(timezone.now())
+
+
+def _prefix(day: date) -> str:
+    return f"{KEY_PREFIX}:{day.isoformat()}:"
+
+
+def _dept_token(department_id) -> str:
+    return NO_DEPARTMENT if department_id is None else str(department_id)
+
+
+def _micros(ts: datetime) -> int:
+    return (ts - _EPOCH) // _MICRO
+
+
+def _from_micros(value) -> datetime:
+    return _EPOCH + int(value) * _MICRO
+
+
+def _day_logs(day: date):
+    # The check_time bounds let the planner prune to one month partition; they
+    # reach max_shift past the day for night-shift OUTs stored on it.
+    return AttendanceLog.objects.filter(
+        work_date=day,
+        check_time__gte=workdays.day_start(day),
+        check_time__lt=workdays.day_start(day + timedelta(days=1)) + workdays.max_shift(),
+    )
+
+
+def _rows_of_day(day: date, rows: Sequence[tuple]) -> List[tuple]:
+    """The ``(id, log_key, check_time, log_type)`` rows whose stored work_date is ``day``.
+
+    Presence follows the stored, shift-attributed work day like ``_day_logs``,
+    so a night OUT after the cutover closes the day its IN opened. A stored
+    day is the punch's own day or the one before, so only rows whose own day
+    is ``day`` or the next are looked up.
+    """
+    candidates = [row for row in rows if workdays.work_date(row[2]) in (day, day + timedelta(days=1))]
+    if not candidates:
+        return []
+    times = [row[2] for row in candidates]
+    on_day = set(
+        AttendanceLog.objects.filter(
+            id__in=[row[0] for row in candidates],
+            check_time__gte=min(times),
+            check_time__lte=max(times),
+            work_date=day,
+        ).values_list("id", flat=True)
+    )
+    return [row for row in candidates if row[0] in on_day]
+
+
+def _moves_into_previous_day(day: date, rows: Sequence[tuple]) -> bool:
+    """Whether ``rows`` hold an IN of the day before ``day`` that may have pulled a punch of ``day`` back to it."""
+    shift = workdays.max_shift()
+    if not shift:
+        return False
+    start = workdays.day_start(day)
+    return any(row[3] == "IN" and start - shift < row[2] < start for row in rows)
+
+
+def _department_id(token) -> Optional[str]:
+    token = token.decode() if isinstance(token, bytes) else token
+    return None if token == NO_DEPARTMENT else token
+
+
+def _apply(day: date, rows: Sequence[tuple]) -> None:
+    """Apply the punches of ``rows`` that belong to work day ``day`` and publish what changed.
+
+    A late IN of the previous day can move an OUT of ``day`` that was already
+    applied back to that IN's day; the day's ``built`` marker is then dropped
+    so the next read rebuilds it from the stored work days.
+    """
+    if _moves_into_previous_day(day, rows):
+        _client().delete(_prefix(day) + "built")
+    todays = _rows_of_day(day, rows)
+    if not todays:
+        return
+    employees = {
+        log_key: (department_id, pk, code)
+        for log_key, department_id, pk, code in Employee.objects.filter(
+            log_key__in={row[1] for row in todays}
+        ).values_list("log_key", "department_id", "id", "employee_id")
+    }
+    args: List[object] = []
+    for _, log_key, check_time, log_type in sorted(todays, key=lambda row: row[2]):
+        if log_key in employees:
+            args += [log_key, _micros(check_time), log_type, _dept_token(employees[log_key][0])]
+    if not args:
+        return
+    apply_script, _ = _scripts()
+    changes, counts = apply_script(args=[_prefix(day), TTL_SECONDS, *args])
+    if not changes or not live.enabled():
+        return
+    listed = []
+    for i in range(0, len(changes), 5):
+        log_key, micros, log_type, dept, moved = changes[i:i + 5]
+        _, pk, code = employees[int(log_key)]
+        listed.append({
+            "employee": pk,
+            "employee_employee_id": code,
+            "department_id": _department_id(dept),
+            "previous_department_id": _department_id(moved) if moved else None,
+            "check_time": timezone.localtime(_from_micros(micros)),
+            "log_type": log_type.decode(),
+        })
+    live.publish("presence", {
+        "work_date": day,
+        "rebuilt": False,
+        "changes": listed,
+        "departments": [
+            {"department_id": _department_id(counts[i]), "inside": counts[i + 1], "seen": counts[i + 2]}
+            for i in range(0, len(counts), 3)
+        ],
+    })
+
+
+class PresenceProjection(Projection):
+    """Keeps today's presence keys current from each committed ingest batch."""
+
+    name = "attendance_presence"
+    after_commit = True
+
+    def apply(self, rows: Sequence[tuple]) -> None:
+        if not getattr(settings, "REDIS_URL", None):
+            return
+        _apply(today(), rows)
+
+    def reset(self, start: datetime, end: datetime) -> None:
+        if not getattr(settings, "REDIS_URL", None):
+            return
+        day = today()
+        if start < workdays.day_start(day + timedelta(days=1)) and end > workdays.day_start(day):
+            _, clear_script = _scripts()
+            clear_script(args=[_prefix(day)])
+
+
+def _state_from_database(day: date, max_id: Optional[int] = None) -> Dict[int, Tuple[datetime, str, Optional[str]]]:
+    """``{log_key: (check_time, log_type, department token)}`` of each employee's last punch of ``day``."""
+    logs = _day_logs(day)
+    if max_id is not None:
+        logs = logs.filter(id__lte=max_id)
+    rows = (
+        logs.order_by("employee_id", "-check_time", "-id")
+        .distinct("employee_id")
+        .values_list("employee_id", "check_time", "log_type", "employee__department_id")
+    )
+    return {key: (check_time, log_type, _dept_token(dept)) for key, check_time, log_type, dept in rows}
+
+
+def rebuild(day: Optional[date] = None) -> int:
+    """Rewrite the presence keys of ``day`` (default: today) from ``attendance_logs``.
+
+    The day is replaced in one MULTI, then punches committed after the
+    snapshot are applied again, as ingest may have written them just before
+    the MULTI replaced them. Returns the number of employees seen.
+    """
+    if not getattr(settings, "REDIS_URL", None):
+        return 0
+    day = day or today()
+    max_id = watermark.settled_id()
+    state = _state_from_database(day, max_id)
+    prefix = _prefix(day)
+    _, clear_script = _scripts()
+
+    by_department: Dict[str, Dict[int, str]] = {}
+    inside: Dict[str, List[int]] = {}
+    last = {}
+    for log_key, (check_time, log_type, dept) in state.items():
+        value = f"{_micros(check_time)}:{log_type}"
+        last[log_key] = f"{value}:{dept}"
+        by_department.setdefault(dept, {})[log_key] = value
+        if log_type == "IN":
+            inside.setdefault(dept, []).append(log_key)
+
+    pipe = _client().pipeline(transaction=True)
+    clear_script(args=[prefix], client=pipe)
+    pipe.set(prefix + "built", 1, ex=TTL_SECONDS)
+    if last:
+        pipe.hset(prefix + "last", mapping=last)
+        pipe.sadd(prefix + "depts", *by_department)
+        for dept, members in by_department.items():
+            pipe.hset(f"{prefix}dept:{dept}", mapping=members)
+            pipe.expire(f"{prefix}dept:{dept}", TTL_SECONDS)
+        for dept, members in inside.items():
+            pipe.sadd(f"{prefix}in:{dept}", *members)
+            pipe.expire(f"{prefix}in:{dept}", TTL_SECONDS)
+        pipe.expire(prefix + "last", TTL_SECONDS)
+        pipe.expire(prefix + "depts", TTL_SECONDS)
+    pipe.execute()
+
+    # Listeners drop their deltas and read /api/presence again.
+    live.publish("presence", {"work_date": day, "rebuilt": True, "changes": [], "departments": []})
+    _apply(day, list(_day_logs(day).filter(id__gt=max_id).values_list("id", "employee_id", "check_time", "log_type")))
+    return len(state)
+
+
+def _from_database(day: date, department_ids, tokens, members: bool) -> List[DepartmentPresence]:
+    state = _state_from_database(day)
+    result = []
+    for department_id, token in zip(department_ids, tokens):
+        seen = [(key, value) for key, value in state.items() if value[2] == token]
+        inside = [Member(key, value[0], value[1]) for key, value in seen if value[1] == "IN"]
+        result.append(DepartmentPresence(department_id, len(inside), len(seen), inside if members else []))
+    return result
+
+
+def _from_redis(day: date, department_ids, tokens, members: bool) -> List[DepartmentPresence]:
+    prefix = _prefix(day)
+    if not _client().exists(prefix + "built"):
+        rebuild(day)
+    pipe = _client().pipeline(transaction=False)
+    for token in tokens:
+        pipe.scard(f"{prefix}in:{token}")
+        pipe.hlen(f"{prefix}dept:{token}")
+        if members:
+            pipe.smembers(f"{prefix}in:{token}")
+    replies = iter(pipe.execute())
+
+    counts = []
+    for _ in tokens:
+        counts.append((next(replies), next(replies), sorted(int(k) for k in next(replies)) if members else []))
+    times = iter(())
+    if members:
+        pipe = _client().pipeline(transaction=False)
+        for token, (_, _, keys) in zip(tokens, counts):
+            if keys:
+                pipe.hmget(f"{prefix}dept:{token}", keys)
+        times = iter(pipe.execute())
+
+    result = []
+    for department_id, (inside, seen, keys) in zip(department_ids, counts):
+        listed = []
+        if keys:
+            for key, value in zip(keys, next(times)):
+                if value is not None:
+                    micros, _, log_type = value.decode().partition(":")
+                    listed.append(Member(key, _from_micros(micros), log_type))
+        result.append(DepartmentPresence(department_id, inside, seen, listed))
+    return result
+
+
+def departments(department_ids: Sequence[Optional[str]], members: bool = True) -> Tuple[List[DepartmentPresence], str]:
+    """Today's presence for each of ``department_ids`` (None = no department), and its source.
+
+    From Redis when ``available()``: a constant number of commands per
+    department in one round trip. Otherwise, or when Redis cannot be reached,
+    from today's punches in the database.
+    """
+    day = today()
+    tokens = [_dept_token(d) for d in department_ids]
+    if available():
+        try:
+            return _from_redis(day, department_ids, tokens, members), "redis"
+        except redis.RedisError as exc:
+            logger.warning("Presence: Redis read failed, using the database (%s)", exc)
+    return _from_database(day, department_ids, tokens, members), "database"
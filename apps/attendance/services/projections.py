@@ -0,0 +1,126 @@
+from __future__ import annotations
+import logging
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, List, Sequence, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from apps.attendance.models import AttendanceLog
+from apps.attendance.services import archive, workdays
+
+logger = logging.getLogger(__name__)
+
+
+class Projection:
+    """Derived data kept up to date from newly inserted attendance logs.
+
+    ``apply`` receives the rows inserted by one ingest batch as
+    ``(id, employee_id, check_time, log_type)`` tuples. By default it runs inside
+    the ingest transaction, so the projection commits or rolls back together
+    with the logs; set ``after_commit = True`` for projections that write to
+    external stores (caches, Redis) and must only see committed data.
+
+    ``reset`` removes everything the projection derived from logs with
+    ``start <= check_time < end``; the rebuild command calls it before replaying
+    that range through ``apply``.
+    """
+
+    name: str = ""
+    after_commit: bool = False
+
+    def apply(self, rows: Sequence[tuple]) -> None:  # pragma: no cover - interface
+        raise NotImplementedError
+
+    def reset(self, start: datetime, end: datetime) -> None:  # pragma: no cover - interface
+        raise NotImplementedError
+
+
+@lru_cache(maxsize=None)
+def get_projections() -> Dict[str, Projection]:
+    projections: Dict[str, Projection] = {}
+    for dotted_path in getattr(settings, "ATTENDANCE_PROJECTIONS", []):
+        projection = import_string(dotted_path)()
+        projections[projection.name] = projection
+    return projections
+
+
+def _apply_after_commit(projection: Projection, rows: Sequence[tuple]) -> None:
+    try:
+        projection.apply(rows)
+    except Exception as exc:
+        # The logs are committed; a rebuild repairs the projection.
+        logger.exception("Projection %s failed after commit.", projection.name, exc_info=exc)
+
+
+def dispatch(rows: Sequence[tuple]) -> None:
+    """Hand one committed-batch worth of inserted rows to every registered projection."""
+    if not rows:
+        return
+    for projection in get_projections().values():
+        if projection.after_commit:
+            transaction.on_commit(lambda p=projection: _apply_after_commit(p, rows))
+        else:
+            projection.apply(rows)
+
+
+def next_month_start(ts: datetime) -> datetime:
+    """Start of the first work day of the month after the work day of ``ts``.
+
+    Local midnight unless ``ATTENDANCE_WORKDAY_CUTOVER`` is set, so a work day
+    never straddles two shards.
+    """
+    day = workdays.work_date(ts)
+    first = (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+    return workdays.day_start(first)
+
+
+def month_shards(start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+    """Split ``[start, end)`` on work-month boundaries (see ``next_month_start``)."""
+    shards = []
+    cursor = start
+    while cursor < end:
+        nxt = next_month_start(cursor)
+        shards.append((cursor, min(nxt, end)))
+        cursor = nxt
+    return shards
+
+
+def replay(projection: Projection, start: datetime, end: datetime, batch_size: int = 5000) -> int:
+    """Rebuild ``projection`` for ``[start, end)`` from ``attendance_logs`` and the cold archive.
+
+    Database projections are rebuilt in one transaction. ``after_commit``
+    projections write to stores that cannot roll back, so, like in ingest,
+    they never run inside a transaction: called in one, the replay is
+    deferred until it commits (and 0 is returned).
+    """
+    if projection.after_commit and transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: replay(projection, start, end, batch_size))
+        return 0
+    hot = (
+        AttendanceLog.objects.filter(check_time__gte=start, check_time__lt=end)
+        .order_by("check_time", "id")
+        .values_list("id", "employee_id", "check_time", "log_type")
+    )
+    rows = chain(
+        archive.rows(start, end, columns=("id", "employee_id", "check_time", "log_type")),
+        hot.iterator(chunk_size=batch_size),
+    )
+    count = 0
+    with nullcontext() if projection.after_commit else transaction.atomic():
+        projection.reset(start, end)
+        batch: List[tuple] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                projection.apply(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            projection.apply(batch)
+            count += len(batch)
+    return count
@@ -0,0 +1,243 @@
+from __future__ import annotations
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+from django.utils import timezone
+
+from apps.attendance.models import ArchivedMonth, RetentionCheckpoint
+from apps.attendance.services import archive, snapshots, watermark, workdays
+from apps.attendance.services.ingest import INGEST_LOCK_KEY
+from apps.attendance.services.partitions import PARENT_TABLE, list_partitions, month_bounds
+
+logger = logging.getLogger(__name__)
+
+# Tables the engine can age out, with the column compared against the cutoff
+# and whether that column is a work-day DATE. Every table needs a bigint ``id``
+# to page on. attendance_days and attendance_cube are rollups of attendance_logs;
+# by default they follow the logs' policy (see ATTENDANCE_RETENTION_DAYS).
+TABLES: Dict[str, tuple] = {
+    PARENT_TABLE: ("check_time", False),
+    "attendance_days": ("work_date", True),
+    "attendance_cube": ("work_date", True),
+}
+
+# DDL on the partitioned parent needs an ACCESS EXCLUSIVE lock; never queue for
+# it behind a long report, since ingest would then queue behind us.
+DDL_LOCK_TIMEOUT = "2s"
+
+# Any ingest batch's employee or in-flight lock; waiters count too, as an
+# ingest batch blocked on a lock is still the sync lane.
+INGEST_BUSY_SQL = """
+    SELECT EXISTS (
+        SELECT 1 FROM pg_locks
+        WHERE locktype = 'advisory'
+          AND ((objsubid = 2 AND classid = %s) OR (objsubid = 1 AND classid::bigint >= %s))
+    )
+"""
+
+
+@dataclass(frozen=True)
+class Policy:
+    table: str
+    keep_days: int
+
+    @property
+    def column(self) -> str:
+        return TABLES[self.table][0]
+
+    @property
+    def by_date(self) -> bool:
+        return TABLES[self.table][1]
+
+    def first_kept_day(self, today: Optional[date] = None) -> date:
+        return (today or workdays.work_date(timezone.now())) - timedelta(days=self.keep_days)
+
+    def cutoff(self, today: Optional[date] = None) -> datetime:
+        """Rows before this instant are expired; always the start of a work day."""
+        return workdays.day_start(self.first_kept_day(today))
+
+
+@dataclass
+class PurgeResult:
+    table: str
+    cutoff: datetime
+    deleted: int = 0
+    dropped: List[str] = field(default_factory=list)
+    finished: bool = True
+
+
+def policies() -> List[Policy]:
+    """Configured policies; tables with 0 days keep everything and are skipped."""
+    configured = getattr(settings, "ATTENDANCE_RETENTION_DAYS", {}) or {}
+    unknown = set(configured) - set(TABLES)
+    if unknown:
+        logger.warning("No retention support for tables: %s", ", ".join(sorted(unknown)))
+    return [
+        Policy(table, int(days))
+        for table, days in configured.items()
+        if table in TABLES and int(days or 0) > 0
+    ]
+
+
+def ingest_busy() -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute(INGEST_BUSY_SQL, [INGEST_LOCK_KEY, watermark.IN_FLIGHT_BASE >> 32])
+        return cursor.fetchone()[0]
+
+
+class _Throttle:
+    """Paces batches, steps aside while ingest is writing and enforces a time budget."""
+
+    def __init__(self, pause: float, deadline: float) -> None:
+        self.pause = pause
+        self.deadline = deadline
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.deadline
+
+    def wait(self) -> bool:
+        """Sleep between batches; False once the time budget is spent."""
+        time.sleep(self.pause)
+        while ingest_busy():
+            if self.expired():
+                return False
+            time.sleep(max(self.pause, 0.05))
+        return not self.expired()
+
+
+def _drop_expired_partitions(cutoff: datetime, result: PurgeResult) -> None:
+    """DETACH + DROP month partitions, leftover detached ones and archive files wholly before ``cutoff``."""
+    for name, month in list_partitions():
+        if month is None or month_bounds(month)[1] > cutoff:
+            continue
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(f"SET LOCAL lock_timeout = '{DDL_LOCK_TIMEOUT}'")
+                cursor.execute(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}")
+                cursor.execute(f"DROP TABLE {name}")
+        except OperationalError as exc:
+            logger.warning("Could not drop partition %s now (%s); will retry next run.", name, exc)
+            continue
+        result.dropped.append(name)
+
+    # Partitions detached by maintain_partitions() past ATTENDANCE_PARTITION_RETENTION_MONTHS.
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname FROM pg_class c
+            WHERE c.relkind = 'r' AND c.relname ~ %s
+              AND NOT EXISTS (SELECT 1 FROM pg_inherits i WHERE i.inhrelid = c.oid)
+            ORDER BY c.relname
+            """,
+            [rf"^{PARENT_TABLE}_\d{{4}}_\d{{2}}$"],
+        )
+        detached = [row[0] for row in cursor.fetchall()]
+    for name in detached:
+        year, month = name[len(PARENT_TABLE) + 1:].split("_")
+        if month_bounds(date(int(year), int(month), 1))[1] > cutoff:
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {name}")
+        result.dropped.append(name)
+
+    for entry in ArchivedMonth.objects.order_by("month"):
+        if month_bounds(entry.month)[1] > cutoff:
+            break
+        archive.delete_month(entry)
+        result.dropped.append(entry.path)
+
+
+def _purge_rows(policy: Policy, cutoff, result: PurgeResult, batch_size: int, throttle: _Throttle) -> None:
+    """Delete expired rows in ``id`` order, one short transaction per batch, checkpointing as it goes."""
+    state, _ = RetentionCheckpoint.objects.get_or_create(
+        table=policy.table, defaults={"cutoff": result.cutoff}
+    )
+    if state.cutoff != result.cutoff:
+        # A later cutoff also covers rows below the old checkpoint.
+        state.cutoff, state.last_id, state.deleted = result.cutoff, 0, 0
+        state.save()
+
+    sql = f"""
+        WITH batch AS (
+            SELECT id FROM {policy.table}
+            WHERE {policy.column} < %(cutoff)s AND id > %(after)s
+            ORDER BY id
+            LIMIT %(limit)s
+        ), gone AS (
+            DELETE FROM {policy.table} t USING batch
+            WHERE t.id = batch.id AND t.{policy.column} < %(cutoff)s
+            RETURNING t.id
+        )
+        SELECT count(*), max(id) FROM gone
+    """
+    while True:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(sql, {"cutoff": cutoff, "after": state.last_id, "limit": batch_size})
+            count, last_id = cursor.fetchone()
+            if count:
+                state.last_id = last_id
+                state.deleted += count
+                state.save(update_fields=["last_id", "deleted", "updated_at"])
+        result.deleted += count
+        if count < batch_size:
+            return
+        if not throttle.wait():
+            result.finished = False
+            logger.info(
+                "Retention on %s paused at id %s after %d rows; resuming next run.",
+                policy.table, state.last_id, state.deleted,
+            )
+            return
+
+
+def purge(
+    policy: Policy,
+    today: Optional[date] = None,
+    batch_size: Optional[int] = None,
+    pause: Optional[float] = None,
+    max_seconds: Optional[float] = None,
+) -> PurgeResult:
+    """Age out ``policy.table`` rows older than its cutoff.
+
+    Whole month partitions (and archived months) past the cutoff are dropped;
+    the remaining expired rows are deleted in small ``id``-ordered batches that
+    pause between each other and while an ingest transaction is writing.
+    Progress is checkpointed in ``retention_checkpoints`` so a run that hits
+    ``max_seconds`` resumes where it stopped.
+    """
+    if batch_size is None:
+        batch_size = int(getattr(settings, "ATTENDANCE_RETENTION_BATCH_SIZE", 5000))
+    if pause is None:
+        pause = float(getattr(settings, "ATTENDANCE_RETENTION_PAUSE_SECONDS", 0.2))
+    if max_seconds is None:
+        max_seconds = float(getattr(settings, "ATTENDANCE_RETENTION_MAX_SECONDS", 600))
+    throttle = _Throttle(pause, time.monotonic() + max_seconds)
+
+    cutoff = policy.cutoff(today)
+    result = PurgeResult(table=policy.table, cutoff=cutoff)
+    if policy.table == PARENT_TABLE:
+        _drop_expired_partitions(cutoff, result)
+    _purge_rows(
+        policy,
+        policy.first_kept_day(today) if policy.by_date else cutoff,
+        result,
+        max(1, batch_size),
+        throttle,
+    )
+    if policy.table == PARENT_TABLE and (result.deleted or result.dropped):
+        # Months that lost rows are rebuilt from what is left on next read.
+        result.dropped += snapshots.discard(before=cutoff)
+    logger.info(
+        "Retention on %s before %s: %d rows deleted, dropped %s.",
+        policy.table, cutoff, result.deleted, result.dropped or "-",
+    )
+    return result
+
+
+def purge_all(**kwargs) -> List[PurgeResult]:
+    return [purge(policy, **kwargs) for policy in policies()]
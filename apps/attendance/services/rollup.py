@@ -0,0 +1,338 @@
+from __future__ import annotations
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.db import connection
+
+from apps.attendance.models import ArchivedMonth, AttendanceDay, AttendanceLog, DirectionField
+from apps.attendance.services import archive, workdays
+from apps.attendance.services.projections import Projection
+from apps.employees.models import Employee
+
+# Recomputes the attendance_days rows for a set of (employee_id, work_date) keys
+# from the raw punches of those days, seeking on the stored work_date (the
+# check_time bounds only let the planner prune month partitions; a night
+# shift's OUT can fall up to max_shift into the next day). Sessions pair
+# the first IN after an OUT with the next OUT: numbering rows by "OUTs seen
+# before this row" puts each OUT in one group with the INs that precede it.
+# log_type is the smallint DirectionField code.
+REFRESH_SQL = """
+WITH touched AS (
+    SELECT DISTINCT employee_id, work_date
+    FROM unnest(%(employees)s::int[], %(dates)s::date[]) AS t(employee_id, work_date)
+),
+punches AS (
+    SELECT l.employee_id, t.work_date, l.check_time, l.log_type
+    FROM touched t
+    JOIN attendance_logs l
+      ON l.employee_id = t.employee_id
+     AND l.work_date = t.work_date
+     AND l.check_time >= (t.work_date + %(cutover)s::interval) AT TIME ZONE %(tz)s
+     AND l.check_time < ((t.work_date + 1 + %(cutover)s::interval) AT TIME ZONE %(tz)s) + %(max_shift)s::interval
+),
+grouped AS (
+    SELECT p.*,
+           count(*) FILTER (WHERE log_type = %(out)s) OVER (
+               PARTITION BY employee_id, work_date ORDER BY check_time
+               ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+           ) AS grp
+    FROM punches p
+),
+paired AS (
+    SELECT employee_id, work_date,
+           min(check_time) FILTER (WHERE log_type = %(in)s) AS opened,
+           max(check_time) FILTER (WHERE log_type = %(out)s) AS closed
+    FROM grouped
+    GROUP BY employee_id, work_date, grp
+),
+worked AS (
+    SELECT employee_id, work_date,
+           count(*) AS sessions,
+           sum(floor(extract(epoch FROM closed - opened)))::bigint AS worked_seconds
+    FROM paired
+    WHERE opened IS NOT NULL AND closed IS NOT NULL
+    GROUP BY employee_id, work_date
+),
+days AS (
+    SELECT employee_id, work_date,
+           min(check_time) FILTER (WHERE log_type = %(in)s) AS first_in,
+           max(check_time) FILTER (WHERE log_type = %(out)s) AS last_out,
+           min(check_time) AS first_seen,
+           max(check_time) AS last_seen,
+           count(*) AS punch_count
+    FROM punches
+    GROUP BY employee_id, work_date
+)
+INSERT INTO attendance_days AS a (
+    employee_id, work_date, first_in, last_out, first_seen, last_seen,
+    punch_count, sessions, worked_seconds, updated_at
+)
+SELECT d.employee_id, d.work_date, d.first_in, d.last_out, d.first_seen, d.last_seen,
+       d.punch_count, coalesce(w.sessions, 0), coalesce(w.worked_seconds, 0), now()
+FROM days d
+LEFT JOIN worked w USING (employee_id, work_date)
+ON CONFLICT (employee_id, work_date) DO UPDATE SET
+    first_in = EXCLUDED.first_in,
+    last_out = EXCLUDED.last_out,
+    first_seen = EXCLUDED.first_seen,
+    last_seen = EXCLUDED.last_seen,
+    punch_count = EXCLUDED.punch_count,
+    sessions = EXCLUDED.sessions,
+    worked_seconds = EXCLUDED.worked_seconds,
+    updated_at = EXCLUDED.updated_at
+"""
+
+
+# Drops the rows of touched days left without punches (a night shift's OUT
+# moved to the day of its IN).
+PRUNE_SQL = """
+DELETE FROM attendance_days a
+USING unnest(%(employees)s::int[], %(dates)s::date[]) AS t(employee_id, work_date)
+WHERE a.employee_id = t.employee_id AND a.work_date = t.work_date
+  AND NOT EXISTS (
+      SELECT 1 FROM attendance_logs l
+      WHERE l.employee_id = t.employee_id
+        AND l.work_date = t.work_date
+        AND l.check_time >= (t.work_date + %(cutover)s::interval) AT TIME ZONE %(tz)s
+        AND l.check_time < ((t.work_date + 1 + %(cutover)s::interval) AT TIME ZONE %(tz)s) + %(max_shift)s::interval
+  )
+"""
+
+
+def refresh_days(keys: Iterable[Tuple[int, date]]) -> None:
+    """Recompute the rollup rows of the given ``(employee_id, work_date)`` keys."""
+    keys = set(keys)
+    if not keys:
+        return
+    employees, dates = zip(*keys)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            REFRESH_SQL,
+            {
+                "employees": list(employees),
+                "dates": list(dates),
+                **workdays.sql_params(),
+                "in": DirectionField.CODES["IN"],
+                "out": DirectionField.CODES["OUT"],
+            },
+        )
+        cursor.execute(PRUNE_SQL, {"employees": list(employees), "dates": list(dates), **workdays.sql_params()})
+
+
+class DailyRollup(Projection):
+    """Keeps ``attendance_days`` current for the days each ingest batch touched.
+
+    Runs inside the ingest transaction, which already holds the batch's
+    employee locks, so concurrent batches for the same day cannot interleave.
+    """
+
+    name = "attendance_day"
+
+    def apply(self, rows: Sequence[tuple]) -> None:
+        offset = workdays.cutover()
+        # A punch can move a night shift's OUT (its own or the next one) to or
+        # from the work day max_shift before or after it.
+        shift = workdays.max_shift()
+        moments = (timedelta(0), -shift, shift) if shift else (timedelta(0),)
+        keys = {(row[1], workdays.work_date(row[2] + delta, offset)) for row in rows for delta in moments}
+        archived = set(ArchivedMonth.objects.values_list("month", flat=True)) if keys else set()
+        cold = {key for key in keys if key[1].replace(day=1) in archived}
+        refresh_days(keys - cold)
+        if cold:
+            refresh_archived_days(cold)
+
+    def reset(self, start: datetime, end: datetime) -> None:
+        AttendanceDay.objects.filter(
+            work_date__gte=workdays.work_date(start),
+            work_date__lt=workdays.work_date(end),
+        ).delete()
+
+
+def refresh_archived_days(keys: Iterable[Tuple[int, date]]) -> None:
+    """Recompute rollup rows for days in archived months from archive plus hot punches."""
+    by_month: Dict[date, set] = defaultdict(set)
+    for key in keys:
+        by_month[key[1].replace(day=1)].add(key)
+    for month_keys in by_month.values():
+        # A work day's punches can run past midnight into the next month.
+        dates = [work_date for _, work_date in month_keys]
+        start = workdays.day_start(min(dates))
+        end = workdays.day_start(max(dates) + timedelta(days=1)) + workdays.max_shift()
+        employees = {employee_id for employee_id, _ in month_keys}
+        punches = list(_punches(start, end, end_inclusive=False, employee_ids=employees))
+        days = [day for day in summarize_days(punches) if (day["employee_id"], day["work_date"]) in month_keys]
+        empty = month_keys - {(day["employee_id"], day["work_date"]) for day in days}
+        for employee_id, work_date in empty:
+            AttendanceDay.objects.filter(employee_id=employee_id, work_date=work_date).delete()
+        AttendanceDay.objects.bulk_create(
+            [AttendanceDay(**day) for day in days],
+            update_conflicts=True,
+            unique_fields=["employee", "work_date"],
+            update_fields=[
+                "first_in", "last_out", "first_seen", "last_seen",
+                "punch_count", "sessions", "worked_seconds", "updated_at",
+            ],
+        )
+
+
+def pair_sessions(punches: Sequence[Tuple[datetime, str]]) -> Tuple[int, int]:
+    """``(sessions, worked_seconds)`` for time-ordered ``(check_time, log_type)`` punches.
+
+    Same pairing as ``REFRESH_SQL``: each IN is closed by the next OUT and any
+    INs in between are ignored.
+    """
+    seconds = 0
+    sessions = 0
+    i = 0
+    while i < len(punches):
+        if punches[i][1] == "IN":
+            j = i + 1
+            while j < len(punches) and punches[j][1] != "OUT":
+                j += 1
+            if j < len(punches):
+                delta = (punches[j][0] - punches[i][0]).total_seconds()
+                if delta > 0:
+                    seconds += int(delta)
+                    sessions += 1
+                i = j + 1
+                continue
+        i += 1
+    return sessions, seconds
+
+
+def _empty_totals() -> Dict[str, object]:
+    return {
+        "punch_count": 0,
+        "first_in": None,
+        "last_out": None,
+        "first_seen": None,
+        "last_seen": None,
+        "sessions": 0,
+        "worked_seconds": 0,
+    }
+
+
+def _merge(totals: Dict[str, object], day: Dict[str, object]) -> None:
+    def pick(key, fn):
+        values = [v for v in (totals[key], day[key]) if v is not None]
+        totals[key] = fn(values) if values else None
+
+    totals["punch_count"] += day["punch_count"]
+    totals["sessions"] += day["sessions"]
+    totals["worked_seconds"] += day["worked_seconds"]
+    pick("first_in", min)
+    pick("last_out", max)
+    pick("first_seen", min)
+    pick("last_seen", max)
+
+
+def _punches(
+    start: datetime,
+    end: datetime,
+    end_inclusive: bool,
+    department_id: Optional[str] = None,
+    employee_ids: Optional[set] = None,
+) -> Iterable[Tuple[int, date, datetime, str]]:
+    """``(employee_id, work_date, check_time, log_type)`` from the hot table and any archived months."""
+    logs = AttendanceLog.objects.filter(check_time__gte=start)
+    logs = logs.filter(check_time__lte=end) if end_inclusive else logs.filter(check_time__lt=end)
+    if department_id:
+        logs = logs.filter(employee__department_id=department_id)
+    if employee_ids is not None:
+        logs = logs.filter(employee_id__in=employee_ids)
+    yield from logs.values_list("employee_id", "work_date", "check_time", "log_type").iterator()
+
+    if archive.archived_months(start, end):
+        if department_id:
+            in_department = set(
+                Employee.objects.filter(department_id=department_id).values_list("log_key", flat=True)
+            )
+            employee_ids = in_department if employee_ids is None else employee_ids & in_department
+        yield from archive.rows(
+            start, end,
+            end_inclusive=end_inclusive,
+            employee_ids=employee_ids,
+            columns=("employee_id", "work_date", "check_time", "log_type"),
+        )
+
+
+def summarize_days(punches: Iterable[Tuple[int, date, datetime, str]]) -> List[Dict[str, object]]:
+    """Aggregate punches per employee and work day, like ``REFRESH_SQL``."""
+    by_day: Dict[Tuple[int, date], List[Tuple[datetime, str]]] = defaultdict(list)
+    for employee_id, work_date, check_time, log_type in punches:
+        by_day[(employee_id, work_date)].append((check_time, log_type))
+
+    days = []
+    for (employee_id, work_date), day in by_day.items():
+        day.sort()
+        sessions, seconds = pair_sessions(day)
+        ins = [t for t, kind in day if kind == "IN"]
+        outs = [t for t, kind in day if kind == "OUT"]
+        days.append({
+            "employee_id": employee_id,
+            "work_date": work_date,
+            "punch_count": len(day),
+            "first_in": ins[0] if ins else None,
+            "last_out": outs[-1] if outs else None,
+            "first_seen": day[0][0],
+            "last_seen": day[-1][0],
+            "sessions": sessions,
+            "worked_seconds": seconds,
+        })
+    return days
+
+
+def employee_totals(
+    start: datetime, end: datetime, department_id: Optional[str] = None
+) -> Dict[int, Dict[str, object]]:
+    """Per-employee totals for punches with ``start <= check_time <= end``.
+
+    Whole work days come from ``attendance_days``; only the partial days at
+    either edge of the range are aggregated from raw punches, reading through
+    to the cold archive where needed. With month snapshots enabled and built
+    for every month of the range, the whole range is aggregated from the
+    mapped arrays instead (see ``snapshots``).
+
+    A rollup day holds the punches stored with its ``work_date``, which for a
+    night shift's OUT runs up to ``max_shift`` into the next day. Only days
+    whose whole span ``[day_start, next day_start + max_shift)`` lies inside
+    the range are read from the rollup, and the edges take the raw punches of
+    the other work days, so every punch is counted once.
+    """
+    from apps.attendance.services import snapshots
+
+    if snapshots.available():
+        totals = snapshots.employee_totals(start, end, department_id)
+        if totals is not None:
+            return totals
+
+    shift = workdays.max_shift()
+    first_full = workdays.work_date(start)
+    if workdays.day_start(first_full) < start:
+        first_full += timedelta(days=1)
+    last_full = workdays.work_date(end) - timedelta(days=1)
+    while last_full >= first_full and workdays.day_start(last_full + timedelta(days=1)) + shift > end:
+        last_full -= timedelta(days=1)
+
+    if first_full > last_full:
+        rows = summarize_days(_punches(start, end, True, department_id))
+    else:
+        days = AttendanceDay.objects.filter(work_date__gte=first_full, work_date__lte=last_full)
+        if department_id:
+            days = days.filter(employee__department_id=department_id)
+        rows = list(days.values(
+            "employee_id", "punch_count", "first_in", "last_out",
+            "first_seen", "last_seen", "sessions", "worked_seconds",
+        ))
+        # Earlier work days end at most max_shift into first_full; later ones
+        # start at the day after last_full. Both edges are at most two days.
+        before = _punches(start, workdays.day_start(first_full) + shift, False, department_id)
+        rows += summarize_days(p for p in before if p[1] < first_full)
+        after = _punches(workdays.day_start(last_full + timedelta(days=1)), end, True, department_id)
+        rows += summarize_days(p for p in after if p[1] > last_full)
+
+    totals: Dict[int, Dict[str, object]] = defaultdict(_empty_totals)
+    for row in rows:
+        _merge(totals[row["employee_id"]], row)
+    return dict(totals)
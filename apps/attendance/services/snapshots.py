@@ -0,0 +1,465 @@
+from __future__ import annotations
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max, Min
+from django.db.models.signals import post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.attendance.models import AttendanceLog, DirectionField
+from apps.attendance.services import archive, watermark
+from apps.attendance.services.partitions import add_months, month_bounds
+from apps.attendance.services.projections import Projection, get_projections
+from apps.employees.models import Employee
+
+try:
+    import numpy as np
+except Exception:  # pragma: no cover
+    np = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+# One file per local calendar month (the partition month): MAGIC, a
+# little-endian uint32 header length, a JSON header, then one raw
+# little-endian array per column at a 64-byte aligned offset, all rows sorted
+# by (employee_id, check_time). Readers mmap the file and wrap the columns
+# with numpy.frombuffer, so every worker process shares the same page-cache
+# pages and nothing is copied or decoded. Files are replaced atomically;
+# processes that still map the old inode keep a consistent view.
+#
+# Files are built by the ``attendance.build_snapshot`` task on the maintenance
+# worker; until a month has one, ``employee_totals`` returns None and the
+# reports read the daily rollup. Edits that rewrite stored rows (the admin,
+# employee deletes) touch a ``.stale`` marker next to the month's file, and a
+# snapshot whose build started before the marker was touched is ignored.
+MAGIC = b"ATLSNAP1"
+SUFFIX = ".atlsnap"
+ALIGN = 64
+# check_time is epoch microseconds (reports print microseconds), work_date is
+# days since 1970-01-01 and log_type the DirectionField code.
+DTYPES = {"employee_id": "<i4", "check_time": "<i8", "log_type": "|i1", "work_date": "<i4"}
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_MICRO = timedelta(microseconds=1)
+_NONE_MIN = 2 ** 63 - 1
+_NONE_MAX = -(2 ** 63)
+
+HOT_SQL = """
+    SELECT id, employee_id, (extract(epoch FROM check_time) * 1000000)::bigint,
+           log_type, work_date - DATE '1970-01-01'
+    FROM attendance_logs
+    WHERE check_time >= %s AND check_time < %s AND id > %s AND id <= %s
+"""
+
+# Upper id bound for reads that want every row already committed.
+MAX_ID = 2 ** 63 - 1
+
+
+class SnapshotError(Exception):
+    """A snapshot file is truncated or not in the expected format."""
+
+
+def snapshot_dir() -> Path:
+    return Path(getattr(settings, "ATTENDANCE_SNAPSHOT_DIR", "var/snapshots"))
+
+
+def available() -> bool:
+    """Snapshots are used when NumPy is installed and the projection is registered."""
+    return np is not None and MonthSnapshots.name in get_projections()
+
+
+def _path(month: date) -> Path:
+    return snapshot_dir() / f"attendance_{month:%Y_%m}{SUFFIX}"
+
+
+def _stale_path(month: date) -> Path:
+    return snapshot_dir() / f"attendance_{month:%Y_%m}{SUFFIX}.stale"
+
+
+def _invalidated_at(month: date) -> float:
+    try:
+        return os.stat(_stale_path(month)).st_mtime
+    except FileNotFoundError:
+        return 0.0
+
+
+def _refresh_seconds() -> float:
+    return float(getattr(settings, "ATTENDANCE_SNAPSHOT_REFRESH_SECONDS", 60))
+
+
+def _month_of(ts: datetime) -> date:
+    return timezone.localtime(ts).date().replace(day=1)
+
+
+def _to_micros(ts: datetime) -> int:
+    return (ts - _EPOCH) // _MICRO
+
+
+def _from_micros(value: int) -> datetime:
+    return _EPOCH + int(value) * _MICRO
+
+
+class MonthSnapshot:
+    """Read-only column arrays of one month, backed by a shared memory map."""
+
+    def __init__(self, path: Path) -> None:
+        with open(path, "rb") as fh:
+            self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[: len(MAGIC)] != MAGIC:
+            raise SnapshotError(f"{path} is not an attendance snapshot")
+        (length,) = struct.unpack_from("<I", self._map, len(MAGIC))
+        start = len(MAGIC) + 4
+        self.header = json.loads(self._map[start:start + length])
+        self.rows = int(self.header["rows"])
+        self.max_id = int(self.header["max_id"])
+        self.built_at = float(self.header["built_at"])
+        self.columns = {}
+        for name, meta in self.header["columns"].items():
+            end = meta["offset"] + self.rows * np.dtype(meta["dtype"]).itemsize
+            if end > len(self._map):
+                raise SnapshotError(f"{path} is truncated")
+            self.columns[name] = np.frombuffer(self._map, dtype=meta["dtype"], count=self.rows, offset=meta["offset"])
+
+
+_cache: Dict[Path, Tuple[Tuple[int, int], MonthSnapshot]] = {}
+
+
+def load(month: date) -> Optional[MonthSnapshot]:
+    """The mapped snapshot of ``month``, re-mapped when the file was replaced; None if missing or stale."""
+    path = _path(month)
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        _cache.pop(path, None)
+        return None
+    stamp = (st.st_ino, st.st_mtime_ns)
+    cached = _cache.get(path)
+    if cached and cached[0] == stamp:
+        snapshot = cached[1]
+    else:
+        try:
+            snapshot = MonthSnapshot(path)
+        except (SnapshotError, ValueError, KeyError) as exc:
+            logger.warning("Ignoring unreadable snapshot %s: %s", path, exc)
+            return None
+        _cache[path] = (stamp, snapshot)
+    if snapshot.built_at <= _invalidated_at(month):
+        return None
+    return snapshot
+
+
+def _hot_columns(
+    start: datetime, end: datetime, after_id: int, upto_id: int = MAX_ID
+) -> Tuple[int, Dict[str, "np.ndarray"]]:
+    """``(max_id, columns)`` of hot rows in ``[start, end)`` with ``after_id < id <= upto_id``."""
+    with connection.cursor() as cursor:
+        cursor.execute(HOT_SQL, [start, end, after_id, upto_id])
+        rows = cursor.fetchall()
+    if not rows:
+        return after_id, {name: np.empty(0, dtype=dtype) for name, dtype in DTYPES.items()}
+    ids, employees, micros, log_types, work_dates = zip(*rows)
+    return max(ids), {
+        "employee_id": np.array(employees, dtype=DTYPES["employee_id"]),
+        "check_time": np.array(micros, dtype=DTYPES["check_time"]),
+        "log_type": np.array(log_types, dtype=DTYPES["log_type"]),
+        "work_date": np.array(work_dates, dtype=DTYPES["work_date"]),
+    }
+
+
+def _archived_columns(start: datetime, end: datetime) -> Dict[str, "np.ndarray"]:
+    rows = list(archive.rows(start, end, columns=("employee_id", "check_time", "log_type", "work_date")))
+    if not rows:
+        return {name: np.empty(0, dtype=dtype) for name, dtype in DTYPES.items()}
+    employees, check_times, log_types, work_dates = zip(*rows)
+    codes = DirectionField.CODES
+    epoch = date(1970, 1, 1)
+    return {
+        "employee_id": np.array(employees, dtype=DTYPES["employee_id"]),
+        "check_time": np.array([_to_micros(t) for t in check_times], dtype=DTYPES["check_time"]),
+        "log_type": np.array([codes[t] for t in log_types], dtype=DTYPES["log_type"]),
+        "work_date": np.array([(d - epoch).days for d in work_dates], dtype=DTYPES["work_date"]),
+    }
+
+
+def _concat(parts: Sequence[Dict[str, "np.ndarray"]]) -> Dict[str, "np.ndarray"]:
+    parts = [p for p in parts if len(p["employee_id"])]
+    if not parts:
+        return {name: np.empty(0, dtype=dtype) for name, dtype in DTYPES.items()}
+    if len(parts) == 1:
+        return parts[0]
+    return {name: np.concatenate([p[name] for p in parts]) for name in DTYPES}
+
+
+def _sorted(columns: Dict[str, "np.ndarray"]) -> Dict[str, "np.ndarray"]:
+    # log_type last so IN sorts before OUT at the same instant, as in ``pair_sessions``.
+    order = np.lexsort((columns["log_type"], columns["check_time"], columns["employee_id"]))
+    return {name: values[order] for name, values in columns.items()}
+
+
+def build_month(month: date) -> Optional[MonthSnapshot]:
+    """Write the snapshot of ``month`` from the hot table and the cold archive.
+
+    Returns None when the month was invalidated while it was being read.
+    """
+    started = time.time()
+    start, end = month_bounds(month)
+    settled = watermark.settled_id()
+    archived = _archived_columns(start, end)
+    _, hot = _hot_columns(start, end, 0, settled)
+    columns = _sorted(_concat([archived, hot]))
+    rows = len(columns["employee_id"])
+
+    header = {
+        "version": 1,
+        "month": month.strftime("%Y-%m"),
+        "rows": rows,
+        "max_id": settled,
+        "built_at": started,
+        "columns": {},
+    }
+    # Offsets depend on the header length, so size the header with placeholders first.
+    for name, dtype in DTYPES.items():
+        header["columns"][name] = {"dtype": dtype, "offset": 0}
+    prefix = len(MAGIC) + 4 + len(json.dumps(header).encode()) + 16 * len(DTYPES)
+    offset = -(-prefix // ALIGN) * ALIGN
+    blobs = []
+    for name, dtype in DTYPES.items():
+        data = np.ascontiguousarray(columns[name], dtype=dtype).tobytes()
+        header["columns"][name]["offset"] = offset
+        blobs.append((offset, data))
+        offset = -(-(offset + len(data)) // ALIGN) * ALIGN
+    raw_header = json.dumps(header).encode()
+
+    path = _path(month)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(MAGIC + struct.pack("<I", len(raw_header)) + raw_header)
+        for position, data in blobs:
+            fh.seek(position)
+            fh.write(data)
+        fh.truncate(max(offset, fh.tell()))
+    os.replace(tmp, path)
+    snapshot = load(month)
+    if snapshot is None and started > _invalidated_at(month):
+        raise SnapshotError(f"snapshot {path} could not be read back")
+    return snapshot
+
+
+_queued: Dict[date, float] = {}
+
+
+def schedule(month: date) -> None:
+    """Have the maintenance worker (re)build ``month``; asked at most once per refresh interval per process."""
+    now = time.monotonic()
+    if month in _queued and now - _queued[month] < _refresh_seconds():
+        return
+    _queued[month] = now
+    from apps.attendance.tasks.snapshots import build_snapshot_task
+
+    try:
+        build_snapshot_task.delay(month.isoformat())
+    except Exception as exc:
+        # Reports keep using the rollup; the next read or batch asks again.
+        _queued.pop(month, None)
+        logger.warning("Snapshot of %s not scheduled: %s", f"{month:%Y-%m}", exc)
+
+
+def invalidate(months: Iterable[date]) -> None:
+    """Stop every process from using the snapshots of ``months`` until they are rebuilt."""
+    for month in sorted(set(months)):
+        marker = _stale_path(month)
+        marker.parent.mkdir(parents=True, exist_ok=True)
+        marker.touch()
+        # File times come from a coarse clock; stamp the precise one builds compare with.
+        now = time.time()
+        os.utime(marker, (now, now))
+        _path(month).unlink(missing_ok=True)
+        _cache.pop(_path(month), None)
+        _queued.pop(month, None)
+
+
+def discard(before: Optional[datetime] = None) -> List[str]:
+    """Delete snapshot files of months that start before ``before`` (all if None)."""
+    removed = []
+    for path in sorted(snapshot_dir().glob(f"attendance_*{SUFFIX}")):
+        try:
+            year, month = path.name[len("attendance_"):-len(SUFFIX)].split("_")
+            first = date(int(year), int(month), 1)
+        except ValueError:
+            continue
+        if before is None or month_bounds(first)[0] < before:
+            path.unlink(missing_ok=True)
+            _stale_path(first).unlink(missing_ok=True)
+            _cache.pop(path, None)
+            removed.append(path.name)
+    return removed
+
+
+def month_columns(month: date) -> Optional[Dict[str, "np.ndarray"]]:
+    """All punches of ``month``: the mapped snapshot plus rows committed since it was built.
+
+    The snapshot holds every row up to ``max_id`` (a ``watermark.settled_id``),
+    so ``id > max_id`` is exactly what it has not seen yet. Without a snapshot
+    a build is scheduled and None returned; requests never build one.
+    """
+    snapshot = load(month)
+    if snapshot is None:
+        schedule(month)
+        return None
+    start, end = month_bounds(month)
+    _, newer = _hot_columns(start, end, snapshot.max_id)
+    if not len(newer["employee_id"]):
+        return snapshot.columns
+    return _sorted(_concat([snapshot.columns, newer]))
+
+
+def _months(start: datetime, end: datetime) -> List[date]:
+    months = []
+    month = _month_of(start)
+    while month <= _month_of(end):
+        months.append(month)
+        month = add_months(month, 1)
+    return months
+
+
+def employee_totals(
+    start: datetime, end: datetime, department_id: Optional[str] = None
+) -> Optional[Dict[int, Dict[str, object]]]:
+    """Same result as ``rollup.employee_totals``, computed with array operations.
+
+    None when a month of the range has no snapshot yet (see ``month_columns``).
+
+    Sessions pair punches within one employee's work day exactly like
+    ``REFRESH_SQL``: a run of rows ending in an OUT is one candidate session
+    from its first IN to that OUT.
+    """
+    months = [month_columns(month) for month in _months(start, end)]
+    if any(columns is None for columns in months):
+        return None
+    parts = []
+    for columns in months:
+        times = columns["check_time"]
+        keep = (times >= _to_micros(start)) & (times <= _to_micros(end))
+        parts.append({name: values[keep] for name, values in columns.items()})
+    # Each month is sorted by (employee, time) and months follow each other in time.
+    data = _sorted(_concat(parts)) if len(parts) > 1 else _concat(parts)
+    if department_id:
+        keys = Employee.objects.filter(department_id=department_id).values_list("log_key", flat=True)
+        keep = np.isin(data["employee_id"], np.fromiter(keys, dtype=np.int64))
+        data = {name: values[keep] for name, values in data.items()}
+
+    employees = data["employee_id"]
+    if not len(employees):
+        return {}
+    times = data["check_time"]
+    is_in = data["log_type"] == DirectionField.CODES["IN"]
+    is_out = data["log_type"] == DirectionField.CODES["OUT"]
+    in_times = np.where(is_in, times, _NONE_MIN)
+    out_times = np.where(is_out, times, _NONE_MAX)
+
+    new_employee = np.empty(len(employees), dtype=bool)
+    new_employee[0] = True
+    np.not_equal(employees[1:], employees[:-1], out=new_employee[1:])
+    firsts = np.flatnonzero(new_employee)
+    lasts = np.r_[firsts[1:], len(employees)] - 1
+
+    # Candidate sessions start at every new (employee, work day) and after every OUT.
+    new_day = new_employee.copy()
+    new_day[1:] |= data["work_date"][1:] != data["work_date"][:-1]
+    starts = np.flatnonzero(new_day | np.r_[False, is_out[:-1]])
+    opened = np.minimum.reduceat(in_times, starts)
+    closed = np.maximum.reduceat(out_times, starts)
+    paired = (opened != _NONE_MIN) & (closed != _NONE_MAX)
+    seconds = (np.where(paired, closed, 0) - np.where(paired, opened, 0)) // 1_000_000
+    owner = np.searchsorted(firsts, starts, side="right") - 1
+    sessions = np.bincount(owner, weights=paired, minlength=len(firsts)).astype(np.int64)
+    worked = np.bincount(owner, weights=seconds, minlength=len(firsts)).astype(np.int64)
+
+    first_in = np.minimum.reduceat(in_times, firsts)
+    last_out = np.maximum.reduceat(out_times, firsts)
+    totals: Dict[int, Dict[str, object]] = {}
+    for i, key in enumerate(employees[firsts].tolist()):
+        totals[key] = {
+            "punch_count": int(lasts[i] - firsts[i] + 1),
+            "first_in": None if first_in[i] == _NONE_MIN else _from_micros(first_in[i]),
+            "last_out": None if last_out[i] == _NONE_MAX else _from_micros(last_out[i]),
+            "first_seen": _from_micros(times[firsts[i]]),
+            "last_seen": _from_micros(times[lasts[i]]),
+            "sessions": int(sessions[i]),
+            "worked_seconds": int(worked[i]),
+        }
+    return totals
+
+
+class MonthSnapshots(Projection):
+    """Schedules a rebuild of each month an ingest batch touched, after commit.
+
+    A snapshot younger than ``ATTENDANCE_SNAPSHOT_REFRESH_SECONDS`` is left as
+    is: readers add the rows committed since it was built, so frequent push
+    batches do not rewrite the month every time.
+    """
+
+    name = "attendance_snapshot"
+    after_commit = True
+
+    def apply(self, rows: Sequence[tuple]) -> None:
+        if np is None:
+            return
+        refresh = _refresh_seconds()
+        for month in sorted({_month_of(row[2]) for row in rows}):
+            snapshot = load(month)
+            if snapshot is None or time.time() - snapshot.built_at >= refresh:
+                schedule(month)
+
+    def reset(self, start: datetime, end: datetime) -> None:
+        invalidate(_months(start, end - _MICRO))
+
+
+def logs_changed(logs) -> None:
+    """Invalidate, once the transaction commits, the months holding rows of the ``logs`` queryset.
+
+    Call it before the rows are deleted or rewritten, inside the transaction
+    that changes them.
+    """
+    if not available():
+        return
+    span = logs.aggregate(first=Min("check_time"), last=Max("check_time"))
+    if span["first"] is not None:
+        months = _months(span["first"], span["last"])
+        transaction.on_commit(lambda: invalidate(months))
+
+
+# Ingest, retention and archiving keep snapshots current by themselves; these
+# catch rows rewritten through the ORM. Deletes go through ``logs_changed``
+# (the admin does): a delete receiver on AttendanceLog would make every
+# employee delete load each log it cascades to.
+@receiver(pre_save, sender=AttendanceLog)
+def _log_saving(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None or not available():
+        return
+    old = sender.objects.filter(pk=instance.pk).values_list("check_time", flat=True).first()
+    if old is not None:
+        instance._snapshot_months = {_month_of(old), _month_of(instance.check_time)}
+
+
+@receiver(post_save, sender=AttendanceLog)
+def _log_saved(sender, instance, created=False, **kwargs):
+    # New rows reach readers through their id; only edits rewrite a month.
+    months = instance.__dict__.pop("_snapshot_months", None)
+    if months and not created:
+        transaction.on_commit(lambda: invalidate(months))
+
+
+@receiver(pre_delete, sender=Employee)
+def _employee_deleting(sender, instance, **kwargs):
+    logs_changed(AttendanceLog.objects.filter(employee=instance))
@@ -0,0 +1,127 @@
+from __future__ import annotations
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple
+
+from django.conf import settings
+
+from apps.integrations.fingertec.adapters import LogRecord
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = ".seg"
+ACK_FILE = "ack.json"
+
+
+def _fsync_dir(path: Path) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class Spool:
+    """Durable local buffer between the source fetch and the database write.
+
+    Each fetched batch is written to its own append-only segment file (one JSON
+    array per record) and fsync'd before the write phase starts. ``ack.json``
+    records the segment and byte offset that has been committed to Postgres; it
+    is replaced atomically and fsync'd after every committed chunk. A crash
+    between the database commit and the ack only causes a re-delivery, which the
+    idempotent ingest writer absorbs.
+    """
+
+    def __init__(self, directory: Path | str) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_settings(cls) -> "Spool":
+        return cls(settings.ATTENDANCE_SPOOL_DIR)
+
+    def _segments(self) -> List[Tuple[int, Path]]:
+        segments = []
+        for path in self.directory.glob(f"*{SEGMENT_SUFFIX}"):
+            try:
+                segments.append((int(path.stem), path))
+            except ValueError:
+                continue
+        return sorted(segments)
+
+    def _read_ack(self) -> Tuple[int, int]:
+        try:
+            data = json.loads((self.directory / ACK_FILE).read_text())
+            return int(data["segment"]), int(data["offset"])
+        except FileNotFoundError:
+            return 0, 0
+
+    def ack(self, segment: int, offset: int) -> None:
+        tmp = self.directory / f"{ACK_FILE}.tmp"
+        with open(tmp, "w") as fh:
+            json.dump({"segment": segment, "offset": offset}, fh)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self.directory / ACK_FILE)
+        _fsync_dir(self.directory)
+        path = self.directory / f"{segment:012d}{SEGMENT_SUFFIX}"
+        if path.exists() and offset >= path.stat().st_size:
+            path.unlink()
+
+    def append(self, records: Iterable[LogRecord]) -> int:
+        """Persist a fetched batch as a new segment and return the number of records.
+
+        ``records`` may be a lazy stream; nothing becomes visible until the whole
+        batch is on disk, and an empty batch leaves no segment behind.
+        """
+        segments = self._segments()
+        last_acked, _ = self._read_ack()
+        seq = max([last_acked] + [s for s, _ in segments]) + 1
+        path = self.directory / f"{seq:012d}{SEGMENT_SUFFIX}"
+        tmp = path.with_suffix(".tmp")
+        count = 0
+        try:
+            with open(tmp, "wb") as fh:
+                for rec in records:
+                    fh.write(json.dumps(
+                        [rec.employee_id, rec.timestamp.isoformat(), rec.type],
+                        separators=(",", ":"),
+                    ).encode())
+                    fh.write(b"\n")
+                    count += 1
+                fh.flush()
+                os.fsync(fh.fileno())
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        if not count:
+            tmp.unlink()
+            return 0
+        os.replace(tmp, path)
+        _fsync_dir(self.directory)
+        logger.info("Spooled %d attendance logs to segment %d.", count, seq)
+        return count
+
+    def pending(self, chunk_size: int) -> Iterator[Tuple[int, int, List[LogRecord]]]:
+        """Yield ``(segment, end_offset, records)`` chunks not yet acknowledged, in order."""
+        acked_segment, acked_offset = self._read_ack()
+        for seq, path in self._segments():
+            if seq < acked_segment or (seq == acked_segment and acked_offset >= path.stat().st_size):
+                path.unlink()
+                continue
+            offset = acked_offset if seq == acked_segment else 0
+            with open(path, "rb") as fh:
+                fh.seek(offset)
+                chunk: List[LogRecord] = []
+                for line in fh:
+                    offset += len(line)
+                    employee_id, ts, log_type = json.loads(line)
+                    chunk.append(LogRecord(employee_id, datetime.fromisoformat(ts), log_type))
+                    if len(chunk) >= chunk_size:
+                        yield seq, offset, chunk
+                        chunk = []
+                if chunk or offset == 0:
+                    yield seq, offset, chunk
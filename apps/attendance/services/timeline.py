@@ -0,0 +1,40 @@
+from __future__ import annotations
+from datetime import datetime
+from typing import Dict, List, Sequence
+
+from apps.attendance.models import AttendanceLog
+from apps.attendance.services import archive
+
+# values() names of AttendanceLog that archived rows can provide.
+_ARCHIVE_NAMES = {"source__name": "source"}
+
+
+def punches(
+    log_keys: Sequence[int], start: datetime, end: datetime, columns: Sequence[str]
+) -> Dict[int, List[dict]]:
+    """Punches of every employee in ``log_keys`` with ``start <= check_time <= end``.
+
+    Returns ``{log_key: [row, ...]}`` with each row a dict of the ``values()``
+    names in ``columns``, oldest first; employees without punches map to an
+    empty list. The hot table is read with one query that seeks
+    ``idx_att_emp_time_cov`` per employee and partition; archived months
+    overlapping the range are read from their files first.
+    """
+    grouped: Dict[int, List[dict]] = {key: [] for key in log_keys}
+    if not grouped:
+        return grouped
+
+    fields = [_ARCHIVE_NAMES.get(name, name) for name in columns]
+    for row in archive.rows(start, end, end_inclusive=True, employee_ids=grouped):
+        values = dict(zip(archive.COLUMNS, row))
+        values["source"] = values["source"] or None
+        grouped[values["employee_id"]].append(dict(zip(columns, (values[f] for f in fields))))
+
+    rows = (
+        AttendanceLog.objects.filter(employee_id__in=list(grouped), check_time__gte=start, check_time__lte=end)
+        .order_by("employee_id", "check_time", "id")
+        .values_list("employee_id", *columns)
+    )
+    for employee_id, *values in rows:
+        grouped[employee_id].append(dict(zip(columns, values)))
+    return grouped
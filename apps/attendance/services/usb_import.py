@@ -0,0 +1,62 @@
+from __future__ import annotations
+import logging
+import mmap
+import uuid
+from pathlib import Path
+from typing import IO, Iterable, Iterator
+
+from django.conf import settings
+
+from apps.attendance.push.parser import iter_attlog_batches
+from .ingest import IngestResult, write_logs
+
+logger = logging.getLogger(__name__)
+
+
+def _mapped_lines(fh: IO[bytes]) -> Iterator[bytes]:
+    # Empty files cannot be mapped.
+    if Path(fh.name).stat().st_size == 0:
+        return
+    with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        yield from iter(mm.readline, b"")
+
+
+def import_lines(lines: Iterable[bytes], source: str) -> IngestResult:
+    """Load ``ATTLOG`` lines through the bulk writer, batch by batch."""
+    batch_size = int(getattr(settings, "ATTENDANCE_INGEST_BATCH_SIZE", 5000) or 5000)
+    total = IngestResult()
+    for batch in iter_attlog_batches(lines, batch_size):
+        result = write_logs(batch, source=source)
+        total.received += result.received
+        total.unknown_employees += result.unknown_employees
+        total.duplicates += result.duplicates
+        total.inserted.extend(result.inserted)
+    return total
+
+
+def import_export_file(path: Path | str, source: str | None = None) -> IngestResult:
+    """Import a terminal USB export (``*_attlog.dat`` or text) via a memory-mapped reader."""
+    path = Path(path)
+    source = source or f"usb:{path.name}"
+    with open(path, "rb") as fh:
+        result = import_lines(_mapped_lines(fh), source=source)
+    logger.info(
+        "Imported %s: %d lines, %d new, %d duplicates, %d unknown employees.",
+        path.name,
+        result.received,
+        result.inserted_count,
+        result.duplicates,
+        result.unknown_employees,
+    )
+    return result
+
+
+def stage_upload(upload) -> Path:
+    """Copy an uploaded export into ``ATTENDANCE_IMPORT_DIR`` for the import task."""
+    directory = Path(settings.ATTENDANCE_IMPORT_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{uuid.uuid4().hex}_{Path(upload.name).name}"
+    with open(path, "wb") as fh:
+        for chunk in upload.chunks():
+            fh.write(chunk)
+    return path
@@ -0,0 +1,56 @@
+"""Which ``attendance_logs`` ids are final, for readers that page by ``id``.
+
+Concurrent ingest transactions draw ids from one sequence and may commit out
+of order, so a reader that remembers the largest id it has seen could skip a
+slower transaction's lower ids. Instead of making writers take turns, every
+ingest transaction holds a shared advisory lock keyed by the sequence value
+read just before its INSERT (``hold``); all of its ids are above that value.
+``settled_id`` is the lowest such value still locked, capped by the sequence:
+every id at or below it has committed, or never will.
+
+The change feed, the webhook outbox, month snapshots, the presence rebuild and
+live ``punches`` frames page up to ``settled_id``. Rows written outside
+``services/ingest.write_logs`` (the admin) are not tracked.
+"""
+from __future__ import annotations
+
+from django.db import connection
+
+SEQUENCE = "attendance_logs_id_seq"
+
+# Lock keys are IN_FLIGHT_BASE + sequence value, far above the small constant
+# advisory lock keys used elsewhere. In pg_locks a bigint key is split into
+# classid (high 32 bits) and objid (low 32 bits), with objsubid = 1.
+IN_FLIGHT_BASE = 1 << 62
+
+HOLD_SQL = f"SELECT pg_advisory_xact_lock_shared(%s + COALESCE(pg_sequence_last_value('{SEQUENCE}'), 0))"
+
+LAST_ID_SQL = f"SELECT COALESCE(pg_sequence_last_value('{SEQUENCE}'), 0)"
+
+# Waiting requests count as in flight too; nothing takes these keys exclusively.
+OLDEST_IN_FLIGHT_SQL = """
+    SELECT min(((classid::bigint << 32) | objid::bigint) - %s)
+    FROM pg_locks
+    WHERE locktype = 'advisory' AND objsubid = 1 AND classid::bigint >= %s
+      AND database = (SELECT oid FROM pg_database WHERE datname = current_database())
+"""
+
+
+def hold(cursor) -> None:
+    """Mark the current transaction in flight until it ends; call right before inserting logs."""
+    cursor.execute(HOLD_SQL, [IN_FLIGHT_BASE])
+
+
+def settled_id() -> int:
+    """Highest id at or below which no log is still being written.
+
+    The sequence is read before the locks: an id it has handed out belongs to a
+    transaction whose lock was already taken, so either the lock is seen here
+    or the transaction has ended and the next query sees its rows.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(LAST_ID_SQL)
+        last = cursor.fetchone()[0]
+        cursor.execute(OLDEST_IN_FLIGHT_SQL, [IN_FLIGHT_BASE, IN_FLIGHT_BASE >> 32])
+        oldest = cursor.fetchone()[0]
+    return last if oldest is None else min(last, oldest)
@@ -0,0 +1,107 @@
+from __future__ import annotations
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+
+# SQL twin of ``work_date()`` for set-based updates; takes ``sql_params()``.
+WORK_DATE_SQL = "((check_time AT TIME ZONE %(tz)s) - %(cutover)s::interval)::date"
+
+# Re-derives work_date for the punches of %(employees)s with check_time in
+# [%(start)s, %(end)s]: an OUT whose previous punch is an IN of an earlier work
+# day, at most %(max_shift)s before it, moves to that IN's day, so a night
+# shift is one session on the day it started. Everything else gets its own
+# work_date. Rows up to max_shift before %(start)s are read as predecessors only.
+# Returns (employee_id, old work_date, new work_date) of each changed row.
+SHIFT_SQL = f"""
+WITH punches AS (
+    SELECT id, employee_id, check_time, work_date, log_type,
+           {WORK_DATE_SQL} AS own_date,
+           lag(log_type) OVER w AS prev_type,
+           lag(check_time) OVER w AS prev_time,
+           lag(work_date) OVER w AS prev_date
+    FROM attendance_logs
+    WHERE employee_id = ANY(%(employees)s::int[])
+      AND check_time >= %(start)s::timestamptz - %(max_shift)s::interval
+      AND check_time <= %(end)s
+    WINDOW w AS (PARTITION BY employee_id ORDER BY check_time, log_type)
+),
+derived AS (
+    SELECT id, check_time, work_date AS old_date,
+           CASE WHEN log_type = %(out)s AND prev_type = %(in)s AND prev_date < own_date
+                     AND check_time - prev_time <= %(max_shift)s::interval
+                THEN prev_date ELSE own_date END AS new_date
+    FROM punches
+    WHERE check_time >= %(start)s
+)
+UPDATE attendance_logs l
+SET work_date = d.new_date
+FROM derived d
+WHERE l.id = d.id AND l.check_time = d.check_time AND l.work_date <> d.new_date
+RETURNING l.employee_id, d.old_date, d.new_date
+"""
+
+
+def cutover() -> timedelta:
+    """``ATTENDANCE_WORKDAY_CUTOVER`` ("HH:MM" local time) as an offset from midnight.
+
+    Punches before the cutover belong to the previous work day, so a night
+    shift ending at 02:00 is counted on the day it started.
+    """
+    value = str(getattr(settings, "ATTENDANCE_WORKDAY_CUTOVER", "") or "00:00")
+    try:
+        hours, _, minutes = value.partition(":")
+        offset = timedelta(hours=int(hours), minutes=int(minutes or 0))
+    except ValueError:
+        raise ImproperlyConfigured(f"ATTENDANCE_WORKDAY_CUTOVER must be HH:MM, got {value!r}")
+    if not timedelta(0) <= offset < timedelta(days=1):
+        raise ImproperlyConfigured(f"ATTENDANCE_WORKDAY_CUTOVER must be within one day, got {value!r}")
+    return offset
+
+
+def max_shift() -> timedelta:
+    """``ATTENDANCE_MAX_SHIFT_HOURS``: how long after an IN an OUT on the next work day still closes it.
+
+    0 turns this off: every punch then stays on its own work day.
+    """
+    value = getattr(settings, "ATTENDANCE_MAX_SHIFT_HOURS", 16) or 0
+    try:
+        hours = float(value)
+    except (TypeError, ValueError):
+        raise ImproperlyConfigured(f"ATTENDANCE_MAX_SHIFT_HOURS must be a number, got {value!r}")
+    if not 0 <= hours <= 24:
+        raise ImproperlyConfigured(f"ATTENDANCE_MAX_SHIFT_HOURS must be between 0 and 24, got {value!r}")
+    return timedelta(hours=hours)
+
+
+def work_date(check_time: datetime, offset: Optional[timedelta] = None) -> date:
+    """The work day a punch belongs to: its local date, one day earlier before the cutover."""
+    return (timezone.localtime(check_time) - (cutover() if offset is None else offset)).date()
+
+
+def day_start(day: date) -> datetime:
+    """The aware instant work day ``day`` begins (its local date at the cutover)."""
+    return timezone.make_aware(datetime.combine(day, time.min) + cutover())
+
+
+def sql_params() -> Dict[str, object]:
+    return {"tz": timezone.get_current_timezone_name(), "cutover": cutover(), "max_shift": max_shift()}
+
+
+def attribute_shifts(cursor, employees: Sequence[int], start: datetime, end: datetime) -> List[Tuple[int, date, date]]:
+    """Run ``SHIFT_SQL``; returns the ``(employee_id, old, new)`` work days of the punches it moved."""
+    from apps.attendance.models import DirectionField
+
+    cursor.execute(
+        SHIFT_SQL,
+        dict(
+            sql_params(),
+            employees=list(employees),
+            start=start,
+            end=end,
+            **{"in": DirectionField.CODES["IN"], "out": DirectionField.CODES["OUT"]},
+        ),
+    )
+    return cursor.fetchall()
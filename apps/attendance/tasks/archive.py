@@ -0,0 +1,15 @@
+from __future__ import annotations
+import logging
+
+from celery import shared_task
+
+from apps.attendance.services.archive import archive_old_months
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="attendance.archive_months")
+def archive_months_task() -> None:
+    archived = archive_old_months()
+    if archived:
+        logger.info("Archived partitions: %s", archived)
@@ -0,0 +1,22 @@
+from __future__ import annotations
+import logging
+
+from celery import shared_task
+
+from apps.attendance.services.outbox import dispatch_outbox
+from .sync import pg_advisory_lock
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = 814_216  # next to the sync job lock
+
+
+@shared_task(name="attendance.dispatch_outbox")
+def dispatch_outbox_task() -> None:
+    with pg_advisory_lock(LOCK_KEY) as acquired:
+        if not acquired:
+            logger.info("Outbox dispatcher is already running. Skipping this run.")
+            return
+        delivered = dispatch_outbox()
+        if delivered:
+            logger.info("Delivered %d attendance logs to webhooks.", delivered)
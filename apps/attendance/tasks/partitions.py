@@ -0,0 +1,14 @@
+from __future__ import annotations
+import logging
+
+from celery import shared_task
+
+from apps.attendance.services.partitions import maintain_partitions
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="attendance.maintain_partitions")
+def maintain_partitions_task() -> None:
+    created, detached = maintain_partitions()
+    logger.info("Partition maintenance: created=%s detached=%s", created, detached)
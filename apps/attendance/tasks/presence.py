@@ -0,0 +1,16 @@
+from __future__ import annotations
+import logging
+
+from celery import shared_task
+
+from apps.attendance.services import presence
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="attendance.rebuild_presence")
+def rebuild_presence_task() -> None:
+    if not presence.available():
+        return
+    seen = presence.rebuild()
+    logger.info("Presence rebuilt for %s: %d employee(s) seen.", presence.today(), seen)
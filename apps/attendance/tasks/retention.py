@@ -0,0 +1,25 @@
+from __future__ import annotations
+import logging
+
+from celery import shared_task
+
+from apps.attendance.services.retention import purge_all
+from .sync import pg_advisory_lock
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = 814_218  # next to the sync, outbox and ingest locks
+
+
+@shared_task(name="attendance.purge_retention")
+def purge_retention_task() -> None:
+    with pg_advisory_lock(LOCK_KEY) as acquired:
+        if not acquired:
+            logger.info("Retention purge is already running. Skipping this run.")
+            return
+        for result in purge_all():
+            if result.deleted or result.dropped:
+                logger.info(
+                    "Retention %s < %s: deleted=%d dropped=%s finished=%s",
+                    result.table, result.cutoff, result.deleted, result.dropped, result.finished,
+                )
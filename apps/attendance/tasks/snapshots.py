@@ -0,0 +1,30 @@
+from __future__ import annotations
+import logging
+import time
+from datetime import date
+
+from celery import shared_task
+from django.conf import settings
+
+from apps.attendance.services import snapshots
+from .sync import pg_advisory_lock
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = 814_219  # next to the retention lock; one lock per month below it
+
+
+@shared_task(name="attendance.build_snapshot")
+def build_snapshot_task(month: str) -> None:
+    first = date.fromisoformat(month)
+    with pg_advisory_lock((LOCK_KEY << 32) + first.year * 12 + first.month - 1) as acquired:
+        if not acquired:
+            logger.info("Snapshot of %s is already being built. Skipping this run.", month)
+            return
+        # Several batches or readers may have asked for the same rebuild.
+        current = snapshots.load(first)
+        refresh = float(getattr(settings, "ATTENDANCE_SNAPSHOT_REFRESH_SECONDS", 60))
+        if current is not None and time.time() - current.built_at < refresh:
+            return
+        if snapshots.build_month(first) is None:
+            logger.info("Snapshot of %s was invalidated while it was built.", month)
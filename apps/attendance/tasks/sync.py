@@ -4,11 +4,14 @@ from contextlib import contextmanager
 from datetime import datetime, timezone
 
 from django.conf import settings
-from django.db import connection, transaction
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Q
 from celery import shared_task
 
-from apps.attendance.models import AttendanceLog, SyncState
-from apps.employees.models import Employee
+from apps.attendance.models import SyncState
+from apps.attendance.services import live
+from apps.attendance.services.ingest import ensure_aware, write_logs
+from apps.attendance.services.spool import Spool
 from apps.integrations.fingertec.adapters import (
     create_adapter_from_settings,
     ConnectionError,
@@ -35,8 +38,12 @@ def pg_advisory_lock(lock_key: int):
         yield True
     finally:
         if acquired:
-            with connection.cursor() as cursor:
-                cursor.execute("SELECT pg_advisory_unlock(%s);", [lock_key])
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_advisory_unlock(%s);", [lock_key])
+            except DatabaseError:
+                # Session locks die with the connection; nothing left to release.
+                logger.warning("Could not release sync advisory lock; connection lost.")
 
 
 def get_last_sync_time() -> datetime | None:
@@ -45,9 +52,25 @@ def get_last_sync_time() -> datetime | None:
 
 
 def set_last_sync_time(ts: datetime) -> None:
-    SyncState.objects.update_or_create(
-        key="attendance", defaults={"last_sync_time": ts}
-    )
+    """Move the sync cursor forward to ``ts``; an older ``ts`` leaves it as it is.
+
+    A spool drained late (a worker restarted on a host that had stale
+    segments) must not make the next run fetch everything after its batch again.
+    """
+    SyncState.objects.get_or_create(key="attendance")
+    SyncState.objects.filter(key="attendance").filter(
+        Q(last_sync_time__isnull=True) | Q(last_sync_time__lt=ts)
+    ).update(last_sync_time=ts)
+
+
+def _finished(status: str, inserted: int = 0, detail: str | None = None) -> None:
+    """Tell live listeners how a sync run ended ("ok", "idle" or "failed")."""
+    live.publish("sync", {
+        "status": status,
+        "inserted": inserted,
+        "detail": detail,
+        "finished_at": datetime.now(timezone.utc),
+    })
 
 
 def run_sync_job() -> None:
@@ -59,66 +82,64 @@ def run_sync_job() -> None:
             logger.info("Sync job is already running. Skipping this run.")
             return
 
+        spool = Spool.from_settings()
+        # Deliver anything fetched by a previous run before touching the source again.
+        try:
+            drained = drain_spool(spool)
+        except DatabaseError as exc:
+            logger.error("Failed to deliver spooled attendance logs.", exc_info=exc)
+            send_critical("Attendance database unavailable; logs kept in local spool.")
+            _finished("failed", detail="database unavailable")
+            return
+        if drained:
+            logger.info("Delivered %d spooled attendance logs.", drained)
+
         last_sync = get_last_sync_time()
         if last_sync is None:
             last_sync = datetime(2000, 1, 1, tzinfo=timezone.utc)
         logger.info("Starting sync for logs after: %s", last_sync.isoformat())
 
+        # Records stream from the source straight into a durable spool segment.
         try:
             adapter = create_adapter_from_settings(settings)
             adapter.connect()
-            raw_logs = adapter.fetch_logs_since(since=last_sync)
+            fetched = spool.append(adapter.fetch_logs_since(since=last_sync))
         except ConnectionError as exc:
             logger.error("Failed to connect to FingerTec integration.", exc_info=exc)
             send_critical("FingerTec integration offline!")
+            _finished("failed", drained, detail="FingerTec integration offline")
             return
 
-        raw_logs = list(raw_logs or [])
-        if not raw_logs:
+        if not fetched:
             logger.info("No new attendance logs found.")
+            _finished("idle", drained)
+            return
+
+        try:
+            new_logs_count = drain_spool(spool)
+        except DatabaseError as exc:
+            logger.error("Failed to write attendance logs; kept in local spool.", exc_info=exc)
+            send_critical("Attendance database unavailable; logs kept in local spool.")
+            _finished("failed", drained, detail="database unavailable")
             return
 
-        new_logs_count = 0
-        latest_log_time: datetime | None = None
-
-        with transaction.atomic():
-            for raw in raw_logs:
-                employee_id = str(raw.get("employee_id"))
-                timestamp = raw.get("timestamp")
-                log_type = str(raw.get("type", "IN")).upper()
-
-                emp = Employee.objects.filter(employee_id=employee_id).first()
-                if not emp:
-                    logger.warning(
-                        "Skipping log for unknown employee ID: %s", employee_id
-                    )
-                    continue
-
-                exists = AttendanceLog.objects.filter(
-                    employee=emp, check_time=timestamp
-                ).exists()
-                if exists:
-                    logger.info(
-                        "Skipping duplicate log for employee %s at %s",
-                        emp.employee_id,
-                        timestamp,
-                    )
-                    continue
-
-                AttendanceLog.objects.create(
-                    employee=emp,
-                    check_time=timestamp,
-                    log_type=log_type,
-                    source="FingerTec",
-                )
-                new_logs_count += 1
-                latest_log_time = (
-                    max(latest_log_time, timestamp)
-                    if latest_log_time is not None
-                    else timestamp
-                )
-
-            if new_logs_count > 0 and latest_log_time is not None:
-                set_last_sync_time(latest_log_time)
-
-        logger.info("Successfully synced %d new attendance logs.", new_logs_count)
\ No newline at end of file
+        logger.info("Successfully synced %d new attendance logs.", new_logs_count)
+        _finished("ok", drained + new_logs_count)
+
+
+def drain_spool(spool: Spool) -> int:
+    """Write pending spool chunks to the database, acknowledging each after commit.
+
+    The sync cursor advances to the newest *fetched* timestamp of each chunk, so
+    a batch is never read from the source again once it is in the spool.
+    """
+    batch_size = int(getattr(settings, "ATTENDANCE_INGEST_BATCH_SIZE", 5000) or 5000)
+    inserted = 0
+    for segment, offset, records in spool.pending(batch_size):
+        if records:
+            with transaction.atomic():
+                result = write_logs(records, source="FingerTec")
+                set_last_sync_time(max(ensure_aware(r.timestamp) for r in records))
+            inserted += result.inserted_count
+        spool.ack(segment, offset)
+    return inserted
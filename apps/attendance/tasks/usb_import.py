@@ -0,0 +1,16 @@
+from __future__ import annotations
+import logging
+from pathlib import Path
+
+from celery import shared_task
+
+from apps.attendance.services.usb_import import import_export_file
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name="attendance.import_usb_file")
+def import_usb_file_task(path: str, source: str) -> None:
+    """Import a staged admin upload; the file is removed once it is in the database."""
+    import_export_file(path, source=source)
+    Path(path).unlink(missing_ok=True)
@@ -0,0 +1,194 @@
+"""Fast JSON bodies for read-only list and report endpoints.
+
+DRF builds a list response by calling ``to_representation`` on every field of
+every row and then walks the result again with the stdlib encoder. Views that
+opt in compile their serializer once into a ``Plan`` of
+``(key, source, converter)``, read rows with ``values()`` and encode the plain
+dicts with orjson when it is installed. The converters produce what the DRF
+fields produce (ISO 8601 datetimes in the current time zone, UUID strings,
+choice values) and ``dumps`` writes what ``JSONRenderer`` writes, so the body
+is byte-for-byte the DRF one. Only plain ``application/json`` requests take this
+path; the browsable API, ``indent=`` and ``FAST_JSON_RESPONSES=0`` keep DRF.
+"""
+from __future__ import annotations
+import json
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
+_ORJSON_OPTIONS = 0
+if orjson is not None:
+    # Dates go through DRF's encoder so naive/aware and "Z" come out the same.
+    _ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+_encoder = encoders.JSONEncoder()
+_renderer = JSONRenderer()
+
+
+def dumps(data: Any) -> bytes:
+    """``JSONRenderer().render(data)`` without ``indent``: compact, UTF-8, U+2028/U+2029 escaped."""
+    if orjson is None:
+        return _renderer.render(data)
+    out = orjson.dumps(data, default=_encoder.default, option=_ORJSON_OPTIONS)
+    if b"\xe2\x80\xa8" in out or b"\xe2\x80\xa9" in out:
+        out = out.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+    return out
+
+
+def accepts(request) -> bool:
+    """True when the negotiated response is plain, unindented ``JSONRenderer`` output."""
+    if not getattr(settings, "FAST_JSON_RESPONSES", True):
+        return False
+    renderer = getattr(request, "accepted_renderer", None)
+    return type(renderer) is JSONRenderer and "indent" not in (request.accepted_media_type or "")
+
+
+def response(data: Any, status: int = 200) -> HttpResponse:
+    return HttpResponse(dumps(data), status=status, content_type="application/json")
+
+
+def json_response(request, data: Any):
+    """``Response(data)`` for payloads that need no serializer (dates, UUIDs and numbers only)."""
+    if accepts(request):
+        return response(data)
+    return Response(data)
+
+
+def serialized_response(request, serializer_class, instance: Any, many: bool = False):
+    """``Response(serializer_class(instance, many=many).data)`` through the compiled plan."""
+    if not accepts(request):
+        return Response(serializer_class(instance, many=many).data)
+    plan = plan_for(serializer_class)
+    return response(plan.many(instance) if many else plan.one(instance))
+
+
+def _float(value):
+    value = float(value)
+    text = repr(value)
+    # orjson spells 1e+16 as 1e16 and nan/inf as null; keep the stdlib
+    # spelling, and its ValueError under STRICT_JSON.
+    if orjson is not None and ("e" in text or "n" in text):
+        return orjson.Fragment(json.dumps(value, allow_nan=not api_settings.STRICT_JSON))
+    return value
+
+
+def _datetime(field: serializers.DateTimeField) -> Callable[[Any], str]:
+    tz = field.timezone if hasattr(field, "timezone") else field.default_timezone()
+
+    def convert(value) -> str:
+        if isinstance(value, str):
+            return value
+        if tz is not None:
+            value = value.astimezone(tz) if timezone.is_aware(value) else timezone.make_aware(value, tz)
+        text = value.isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+    return convert
+
+
+def _choice(field: serializers.ChoiceField) -> Callable[[Any], Any]:
+    choices = field.choice_strings_to_values
+
+    def convert(value):
+        if value == "":
+            return value
+        return choices.get(str(value), value)
+
+    return convert
+
+
+def _converter(field: serializers.Field) -> Callable[[Any], Any]:
+    """The ``to_representation`` of ``field`` for non-null values, without the field object."""
+    if isinstance(field, serializers.ListSerializer):
+        return plan_for(type(field.child)).many
+    if isinstance(field, serializers.Serializer):
+        return plan_for(type(field)).one
+    if isinstance(field, serializers.DateTimeField):
+        if getattr(field, "format", api_settings.DATETIME_FORMAT) in (ISO_8601, ISO_8601.upper()):
+            return _datetime(field)
+    elif isinstance(field, serializers.DateField):
+        if getattr(field, "format", api_settings.DATE_FORMAT) in (ISO_8601, ISO_8601.upper()):
+            return lambda value: value.isoformat()
+    elif isinstance(field, serializers.UUIDField):
+        if field.uuid_format == "hex_verbose":
+            return str
+    elif isinstance(field, serializers.ChoiceField):
+        return _choice(field)
+    elif isinstance(field, serializers.CharField):
+        return str
+    elif isinstance(field, serializers.IntegerField):
+        return int
+    elif isinstance(field, serializers.FloatField):
+        return _float
+    elif isinstance(field, (serializers.SerializerMethodField, serializers.HiddenField)):
+        raise ImproperlyConfigured(f"{type(field).__name__} cannot be rendered from values()")
+    return field.to_representation
+
+
+class Plan:
+    """Output key, source key and converter for every readable field of a serializer.
+
+    The source key joins ``field.source`` with ``__``, so a ``values(*plan.sources)``
+    row and a report dict keyed by field name are both read directly.
+    ``fields`` keeps only those field names (``?fields=``). Datetime converters
+    capture the time zone, so ``plan_for`` caches one plan per serializer
+    class, field selection and active zone.
+    """
+
+    def __init__(self, serializer_class, fields: Optional[Tuple[str, ...]] = None) -> None:
+        self.serializer_class = serializer_class
+        serializer = serializer_class()
+        items: List[Tuple[str, str, Callable[[Any], Any]]] = []
+        for name, field in serializer.fields.items():
+            if field.write_only or (fields is not None and name not in fields):
+                continue
+            if not field.source_attrs:
+                raise ImproperlyConfigured(f"{serializer_class.__name__}.{name}: source='*' is not supported")
+            items.append((name, "__".join(field.source_attrs), _converter(field)))
+        self.items = tuple(items)
+        self.sources: Tuple[str, ...] = tuple(source for _, source, _ in items)
+
+    def one(self, row) -> Dict[str, Any]:
+        if not isinstance(row, dict):
+            row = {source: _attribute(row, source) for source in self.sources}
+        out = {}
+        for name, source, convert in self.items:
+            value = row[source]
+            out[name] = None if value is None else convert(value)
+        return out
+
+    def many(self, rows: Iterable) -> List[Dict[str, Any]]:
+        one = self.one
+        return [one(row) for row in rows]
+
+
+def _attribute(instance, source: str):
+    for attr in source.split("__"):
+        if instance is None:
+            return None
+        instance = getattr(instance, attr)
+    return instance
+
+
+@lru_cache(maxsize=1024)
+def _plan(serializer_class, fields: Optional[Tuple[str, ...]], zone: Optional[str]) -> Plan:
+    return Plan(serializer_class, fields)
+
+
+def plan_for(serializer_class, fields: Optional[Tuple[str, ...]] = None) -> Plan:
+    zone = timezone.get_current_timezone_name() if settings.USE_TZ else None
+    return _plan(serializer_class, fields, zone)
+
@@ -0,0 +1,98 @@
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+from apps.core import fastjson
+
+
+@lru_cache(maxsize=None)
+def _field_sources(serializer_class) -> Dict[str, Tuple[str, ...]]:
+    """Readable field name -> ``source_attrs`` of ``serializer_class``, in declared order."""
+    fields = serializer_class().fields
+    return {name: tuple(field.source_attrs) for name, field in fields.items() if not field.write_only}
+
+
+def _loading(model, sources) -> Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]]:
+    """``(select_related, only)`` paths that load exactly ``sources``, or None if one
+    of them is not a plain model field (a property, ``source='*'``...)."""
+    related, only = {}, {}
+    for attrs in sources:
+        if not attrs:
+            return None
+        current = model
+        for depth, attr in enumerate(attrs):
+            try:
+                field = current._meta.get_field(attr)
+            except FieldDoesNotExist:
+                return None
+            path = "__".join(attrs[: depth + 1])
+            only[path] = None
+            if depth < len(attrs) - 1:
+                if not field.is_relation or field.many_to_many or field.one_to_many:
+                    return None
+                related[path] = None
+                current = field.related_model
+    return tuple(related), tuple(only)
+
+
+class SparseFieldsMixin:
+    """``?fields=id,check_time`` on GET: only those serializer fields are rendered,
+    and the queryset loads only their columns and joins only their relations.
+
+    Names are the serializer's field names; the output keeps the serializer's
+    order. ``sparse_loaded_fields`` are model fields loaded regardless (the
+    pagination key, for instance). Writes always use the full serializer.
+    """
+
+    fields_query_param = "fields"
+    sparse_loaded_fields: Tuple[str, ...] = ()
+
+    def get_requested_fields(self) -> Optional[Tuple[str, ...]]:
+        if self.request.method not in SAFE_METHODS:
+            return None
+        raw = self.request.query_params.get(self.fields_query_param)
+        if raw is None:
+            return None
+        requested = {name.strip() for name in raw.split(",") if name.strip()}
+        available = _field_sources(self.get_serializer_class())
+        unknown = sorted(requested - set(available))
+        if unknown or not requested:
+            raise ValidationError({
+                self.fields_query_param: f"unknown field(s) {', '.join(unknown) or '(none)'}; "
+                f"available: {', '.join(available)}"
+            })
+        return tuple(name for name in available if name in requested)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_requested_fields()
+        if fields is None:
+            return queryset
+        sources = _field_sources(self.get_serializer_class())
+        loading = _loading(
+            queryset.model,
+            [sources[name] for name in fields] + [(name,) for name in self.sparse_loaded_fields],
+        )
+        if loading is None:
+            return queryset
+        related, only = loading
+        queryset = queryset.select_related(None).only(*only)
+        # select_related() without arguments would follow every foreign key.
+        return queryset.select_related(*related) if related else queryset
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fields = self.get_requested_fields()
+        if fields is not None:
+            target = getattr(serializer, "child", serializer)
+            for name in list(target.fields):
+                if name not in fields:
+                    target.fields.pop(name)
+        return serializer
+
+    def get_fast_plan(self) -> fastjson.Plan:
+        """``fastjson`` plan for the requested fields."""
+        return fastjson.plan_for(self.get_serializer_class(), self.get_requested_fields())
@@ -0,0 +1,45 @@
+from functools import reduce
+from operator import and_, or_
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import Q
+from rest_framework import filters
+
+from apps.core.text import normalize
+
+
+class NormalizedSearchFilter(filters.SearchFilter):
+    """``?search=`` over normalized ``search_text`` columns (see ``apps/core/text.py``).
+
+    Each term must appear in one of ``view.search_fields``. Fields named
+    ``search_text`` are matched with the normalized term using ``LIKE``, which
+    their pg_trgm GIN index serves; any other field keeps ``icontains``. When
+    the view sets ``search_rank_field`` and no explicit ordering applies, the
+    matches come back best first by trigram word similarity.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        terms = self.get_search_terms(request)
+        if not search_fields or not terms:
+            return queryset
+
+        conditions = []
+        for term in terms:
+            normalized = normalize(term)
+            lookups = [
+                Q(**{f"{field}__contains": normalized})
+                if field.rsplit("__", 1)[-1] == "search_text"
+                else Q(**{f"{field}__icontains": term})
+                for field in search_fields
+            ]
+            conditions.append(reduce(or_, lookups))
+        queryset = queryset.filter(reduce(and_, conditions))
+
+        rank_field = getattr(view, "search_rank_field", None)
+        if rank_field:
+            query = normalize(" ".join(terms))
+            queryset = queryset.annotate(
+                search_rank=TrigramWordSimilarity(query, rank_field)
+            ).order_by("-search_rank", *queryset.model._meta.ordering)
+        return queryset
@@ -16,4 +16,11 @@ class IsAuditorOrReadOnly(BasePermission):
 
 class IsDeptManagerReadOnly(BasePermission):
     def has_permission(self, request, view):
-        return user_has_role(request.user, ROLE_DEPT_MANAGER) or user_has_role(request.user, ROLE_HR_ADMIN)
\ No newline at end of file
+        return user_has_role(request.user, ROLE_DEPT_MANAGER) or user_has_role(request.user, ROLE_HR_ADMIN)
+
+
+class IsAuditorOrHRAdmin(BasePermission):
+    """The read access of IsAuditorOrReadOnly, for POST endpoints that only read (batched lookups)."""
+
+    def has_permission(self, request, view):
+        return user_has_role(request.user, ROLE_AUDITOR) or user_has_role(request.user, ROLE_HR_ADMIN)
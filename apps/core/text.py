@@ -0,0 +1,25 @@
+import re
+import unicodedata
+
+# Arabic spelling variants folded to one form, so "أحمد", "احمد" and "إحمد" or
+# "فاطمة" and "فاطمه" match each other. Harakat and tatweel are dropped.
+_FOLD = str.maketrans({
+    "أ": "ا",
+    "إ": "ا",
+    "آ": "ا",
+    "ٱ": "ا",
+    "ة": "ه",
+    "ى": "ي",
+    "\u0640": None,  # tatweel
+})
+_MARKS = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(text) -> str:
+    """Search form of ``text``: NFKC, case-folded, Arabic variants folded, single spaces."""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", str(text)).casefold()
+    text = _MARKS.sub("", text).translate(_FOLD)
+    return _SPACES.sub(" ", text).strip()
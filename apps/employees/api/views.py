@@ -1,16 +1,24 @@
 from rest_framework import viewsets, filters
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from apps.core.fieldsets import SparseFieldsMixin
+from apps.core.filters import NormalizedSearchFilter
+from apps.employees import suggest as typeahead
 from apps.employees.models import Employee
 from .serializers import EmployeeSerializer
 from apps.core.permissions import IsAuditorOrReadOnly, IsDeptManagerReadOnly
 
 
-class EmployeeViewSet(viewsets.ModelViewSet):
+class EmployeeViewSet(SparseFieldsMixin, viewsets.ModelViewSet):
     queryset = Employee.objects.select_related("department").all()
     serializer_class = EmployeeSerializer
     permission_classes = [IsAuthenticated, IsAuditorOrReadOnly, IsDeptManagerReadOnly]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ["employee_id", "full_name", "job_title", "department__name"]
+    filter_backends = [NormalizedSearchFilter, filters.OrderingFilter]
+    # employee_id, full_name, job_title and department name, normalized.
+    search_fields = ["search_text"]
+    search_rank_field = "search_text"
     ordering_fields = ["employee_id", "full_name", "created_at"]
 
     def get_queryset(self):
@@ -24,4 +32,18 @@ class EmployeeViewSet(viewsets.ModelViewSet):
                 qs = qs.filter(is_active=True)
             elif is_active.lower() in ("0", "false", "no"):
                 qs = qs.filter(is_active=False)
-        return qs
\ No newline at end of file
+        return qs
+
+    @action(detail=False, methods=["get"], url_path="suggest")
+    def suggest(self, request):
+        """Typeahead: top ``limit`` employees whose id or name words start with ``q``.
+
+        Served from the in-process prefix index (``apps/employees/suggest.py``),
+        not the database.
+        """
+        query = request.query_params.get("q", "")
+        try:
+            limit = int(request.query_params.get("limit", typeahead.DEFAULT_LIMIT))
+        except ValueError:
+            return Response({"detail": "limit must be an integer"}, status=400)
+        return Response({"query": query, "results": typeahead.suggest(query, limit)})
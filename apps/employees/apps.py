@@ -4,4 +4,8 @@ from django.apps import AppConfig
 class EmployeesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.employees"
-    verbose_name = "Employees"
\ No newline at end of file
+    verbose_name = "Employees"
+
+    def ready(self):
+        # Signal receivers that keep the typeahead index fresh.
+        from apps.employees import suggest  # noqa: F401
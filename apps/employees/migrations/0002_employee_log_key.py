@@ -0,0 +1,25 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            "CREATE SEQUENCE IF NOT EXISTS employees_log_key_seq AS integer",
+            "DROP SEQUENCE IF EXISTS employees_log_key_seq",
+        ),
+        # The volatile default numbers existing employees while adding the column.
+        migrations.AddField(
+            model_name='employee',
+            name='log_key',
+            field=models.IntegerField(db_default=models.Func(models.Value('employees_log_key_seq'), function='nextval'), editable=False, unique=True),
+        ),
+        migrations.RunSQL(
+            "ALTER SEQUENCE employees_log_key_seq OWNED BY employees.log_key",
+            migrations.RunSQL.noop,
+        ),
+    ]
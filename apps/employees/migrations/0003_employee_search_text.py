@@ -0,0 +1,38 @@
+# Generated by Django 5.0.6 on 2026-10-19 15:21
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+from apps.core.text import normalize
+
+
+def fill_search_text(apps, schema_editor):
+    # Same as Employee.build_search_text(); historical models have no methods.
+    Employee = apps.get_model("employees", "Employee")
+    employees = list(Employee.objects.select_related("department"))
+    for e in employees:
+        department = e.department.name if e.department_id else ""
+        e.search_text = normalize(" ".join(filter(None, [e.employee_id, e.full_name, e.job_title, department])))
+    Employee.objects.bulk_update(employees, ["search_text"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0002_employee_log_key'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='employee',
+            name='search_text',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.RunPython(fill_search_text, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='employee',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_text'], name='idx_employee_search_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -1,6 +1,9 @@
 import uuid
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 
+from apps.core.text import normalize
+
 
 class Department(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -14,10 +17,30 @@ class Department(models.Model):
     def __str__(self) -> str:
         return self.name
 
+    # The department name is part of every member's Employee.search_text.
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        renamed = not self._state.adding and (update_fields is None or "name" in update_fields)
+        super().save(*args, **kwargs)
+        if renamed:
+            _refresh_search_text(self.employees.all(), self)
+
+    def delete(self, *args, **kwargs):
+        members = list(self.employees.all())
+        result = super().delete(*args, **kwargs)
+        _refresh_search_text(members, None)
+        return result
+
 
 class Employee(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     employee_id = models.CharField(max_length=20, unique=True)
+    # Compact surrogate referenced by attendance_logs instead of the 16-byte UUID.
+    log_key = models.IntegerField(
+        unique=True,
+        editable=False,
+        db_default=models.Func(models.Value("employees_log_key_seq"), function="nextval"),
+    )
     full_name = models.CharField(max_length=100)
     job_title = models.CharField(max_length=100, blank=True, null=True)
     department = models.ForeignKey(
@@ -25,13 +48,36 @@ class Employee(models.Model):
     )
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Normalized employee_id, name, job title and department name (apps/core/text.py),
+    # kept current on save; the API search filters and ranks on it.
+    search_text = models.TextField(default="", editable=False)
 
     class Meta:
         db_table = "employees"
         indexes = [
             models.Index(fields=["employee_id"], name="idx_employee_identifier"),
+            GinIndex(fields=["search_text"], opclasses=["gin_trgm_ops"], name="idx_employee_search_trgm"),
         ]
         ordering = ["full_name"]
 
     def __str__(self) -> str:
-        return f"{self.full_name} ({self.employee_id})"
\ No newline at end of file
+        return f"{self.full_name} ({self.employee_id})"
+
+    def build_search_text(self) -> str:
+        department = self.department.name if self.department_id else ""
+        return normalize(" ".join(filter(None, [self.employee_id, self.full_name, self.job_title, department])))
+
+    def save(self, *args, **kwargs):
+        self.search_text = self.build_search_text()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "search_text" not in update_fields:
+            kwargs["update_fields"] = [*update_fields, "search_text"]
+        super().save(*args, **kwargs)
+
+
+def _refresh_search_text(employees, department) -> None:
+    employees = list(employees)
+    for employee in employees:
+        employee.department = department
+        employee.search_text = employee.build_search_text()
+    Employee.objects.bulk_update(employees, ["search_text"], batch_size=500)
@@ -0,0 +1,194 @@
+"""In-process prefix index behind ``/api/employees/suggest/``.
+
+Every worker keeps sorted arrays of normalized keys (employee_id, full name
+and each later word of the name) pointing at a list of employees; a lookup is
+a few ``bisect`` calls plus short scans and never touches the database. Saving or
+deleting an employee or department bumps a generation counter in the default
+cache after commit; workers compare it at most every ``CHECK_SECONDS`` and
+rebuild when it moved, or when the index is older than ``MAX_AGE_SECONDS``
+(bulk updates send no signals).
+
+The counter only reaches other workers through a shared cache (Redis, set by
+``REDIS_URL``). With the per-process ``LocMemCache`` fallback an edit shows up
+at once in the worker that made it and within ``MAX_AGE_SECONDS`` elsewhere;
+``check_shared_cache`` warns about that outside DEBUG.
+"""
+from __future__ import annotations
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.core.text import normalize
+from apps.employees.models import Department, Employee
+
+GENERATION_KEY = "employees:suggest:generation"
+CHECK_SECONDS = 1.0
+MAX_AGE_SECONDS = 300.0
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+# Cache backends private to one process; the generation counter cannot reach other workers.
+LOCAL_CACHE_BACKENDS = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    id: str
+    employee_id: str
+    full_name: str
+    department_name: Optional[str]
+    is_active: bool
+    words: Tuple[str, ...]
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "id": self.id,
+            "employee_id": self.employee_id,
+            "full_name": self.full_name,
+            "department_name": self.department_name,
+            "is_active": self.is_active,
+        }
+
+
+class PrefixIndex:
+    """Sorted key arrays in rank order: exact employee_id, then employee_id
+    prefix, full-name prefix and later-word prefix, active employees first in
+    each. A lookup walks the tiers and stops after ``limit`` employees, so its
+    cost does not grow with the number of matches.
+    """
+
+    def __init__(self, employees: List[Suggestion]) -> None:
+        self.employees = employees
+        self.exact = {normalize(e.employee_id): i for i, e in enumerate(employees)}
+        tiers: List[List[Tuple[str, int]]] = [[] for _ in range(6)]
+        for i, employee in enumerate(employees):
+            offset = 0 if employee.is_active else 1
+            tiers[0 + offset].append((normalize(employee.employee_id), i))
+            tiers[2 + offset].append((" ".join(employee.words), i))
+            for w in range(1, len(employee.words)):
+                tiers[4 + offset].append((" ".join(employee.words[w:]), i))
+        self.tiers = []
+        for entries in tiers:
+            entries.sort()
+            self.tiers.append(([key for key, _ in entries], [owner for _, owner in entries]))
+
+    def _collect(self, prefix: str, found: Dict[int, None], limit: int, accept=None) -> None:
+        for keys, owners in self.tiers:
+            i = bisect_left(keys, prefix)
+            while i < len(keys) and keys[i].startswith(prefix):
+                owner = owners[i]
+                if owner not in found and (accept is None or accept(owner)):
+                    found[owner] = None
+                    if len(found) >= limit:
+                        return
+                i += 1
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> List[Suggestion]:
+        query = normalize(query)
+        if not query or limit < 1:
+            return []
+        found: Dict[int, None] = {}
+        if query in self.exact:
+            found[self.exact[query]] = None
+        self._collect(query, found, limit)
+        tokens = query.split(" ")
+        if len(tokens) > 1 and len(found) < limit:
+            # Words in any order: every token must start some word of the name.
+            def accept(owner: int) -> bool:
+                words = self.employees[owner].words
+                return all(any(w.startswith(t) for w in words) for t in tokens)
+
+            self._collect(tokens[0], found, limit, accept)
+        return [self.employees[owner] for owner in list(found)[:limit]]
+
+
+def build() -> PrefixIndex:
+    employees = [
+        Suggestion(
+            id=str(pk),
+            employee_id=employee_id,
+            full_name=full_name,
+            department_name=department_name,
+            is_active=is_active,
+            words=tuple(normalize(full_name).split(" ")),
+        )
+        for pk, employee_id, full_name, department_name, is_active in Employee.objects.values_list(
+            "id", "employee_id", "full_name", "department__name", "is_active"
+        ).order_by()
+    ]
+    return PrefixIndex(employees)
+
+
+_lock = threading.Lock()
+_state = {"index": None, "generation": None, "built_at": 0.0, "checked_at": 0.0}
+
+
+def _generation():
+    return cache.get(GENERATION_KEY, 0)
+
+
+def get_index() -> PrefixIndex:
+    now = time.monotonic()
+    if _state["index"] is not None and now - _state["checked_at"] < CHECK_SECONDS:
+        return _state["index"]
+    generation = _generation()
+    with _lock:
+        stale = (
+            _state["index"] is None
+            or generation != _state["generation"]
+            or now - _state["built_at"] >= MAX_AGE_SECONDS
+        )
+        if stale:
+            _state["index"] = build()
+            _state["generation"] = generation
+            _state["built_at"] = now
+        _state["checked_at"] = now
+        return _state["index"]
+
+
+def suggest(query: str, limit: int = DEFAULT_LIMIT) -> List[Dict[str, object]]:
+    return [employee.as_dict() for employee in get_index().search(query, max(1, min(limit, MAX_LIMIT)))]
+
+
+def invalidate() -> None:
+    """Make every worker rebuild its index on its next check."""
+    if not cache.add(GENERATION_KEY, 1, timeout=None):
+        try:
+            cache.incr(GENERATION_KEY)
+        except ValueError:
+            cache.set(GENERATION_KEY, 1, timeout=None)
+    _state["checked_at"] = 0.0
+
+
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+def _employees_changed(sender, **kwargs):
+    transaction.on_commit(invalidate)
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs=None, **kwargs):
+    backend = settings.CACHES.get("default", {}).get("BACKEND")
+    if settings.DEBUG or backend not in LOCAL_CACHE_BACKENDS:
+        return []
+    return [
+        checks.Warning(
+            "The default cache is private to each process, so employee suggestions in other "
+            f"workers can lag edits by up to {MAX_AGE_SECONDS:.0f} seconds.",
+            hint="Set REDIS_URL to share the cache between workers.",
+            id="employees.W001",
+        )
+    ]
@@ -1,7 +1,7 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Iterable, Dict, Any, Optional, List, Set
+from typing import Iterable, Iterator, Dict, Any, Optional, Set
 
 from django.conf import settings
 
@@ -17,18 +17,32 @@ class ConnectionError(Exception):
     pass
 
 
-@dataclass
+@dataclass(slots=True)
 class LogRecord:
+    """The one record type every adapter and ingest path produces."""
+
     employee_id: str
     timestamp: datetime
     type: str  # 'IN' or 'OUT'
 
 
+IN = "IN"
+OUT = "OUT"
+# Device/DB direction codes understood without configuration.
+DEFAULT_TYPE_MAP: Dict[Any, str] = {
+    None: IN,
+    "IN": IN, "I": IN, "0": IN,
+    "OUT": OUT, "O": OUT, "1": OUT,
+}
+# Raw spellings of known codes (int 1, "out ") remembered by ``_map_type``.
+TYPE_MEMO_LIMIT = 256
+
+
 class FingerTecAdapter:
     def connect(self) -> None:  # pragma: no cover - interface
         raise NotImplementedError
 
-    def fetch_logs_since(self, since: datetime) -> Iterable[Dict[str, Any]]:  # pragma: no cover - interface
+    def fetch_logs_since(self, since: datetime) -> Iterable[LogRecord]:  # pragma: no cover - interface
         raise NotImplementedError
 
 
@@ -44,7 +58,7 @@ class SDKAdapter(FingerTecAdapter):
         # TODO: Implement actual SDK connection
         self.connected = True
 
-    def fetch_logs_since(self, since: datetime) -> Iterable[Dict[str, Any]]:
+    def fetch_logs_since(self, since: datetime) -> Iterable[LogRecord]:
         # TODO: Implement actual SDK fetching
         return []
 
@@ -70,6 +84,10 @@ class DBAdapter(FingerTecAdapter):
         self._engine: Optional[Engine] = None
         self.in_values = {v.strip().upper() for v in (in_values or set())}
         self.out_values = {v.strip().upper() for v in (out_values or set())}
+        # Configured values win over the defaults, IN over OUT (as before).
+        self._type_map: Dict[Any, str] = dict(DEFAULT_TYPE_MAP)
+        self._type_map.update(dict.fromkeys(self.out_values, OUT))
+        self._type_map.update(dict.fromkeys(self.in_values, IN))
 
     def connect(self) -> None:
         if not self.db_url:
@@ -100,50 +118,55 @@ class DBAdapter(FingerTecAdapter):
         return None
 
     def _map_type(self, raw_type: Any) -> str:
-        if raw_type is None:
-            return "IN"
-        val = str(raw_type).strip().upper()
-        if self.in_values and val in self.in_values:
-            return "IN"
-        if self.out_values and val in self.out_values:
-            return "OUT"
-        # Fallbacks
-        if val in {"IN", "I", "0"}:
-            return "IN"
-        if val in {"OUT", "O", "1"}:
-            return "OUT"
-        return "IN"
-
-    def fetch_logs_since(self, since: datetime) -> Iterable[Dict[str, Any]]:
+        try:
+            return self._type_map[raw_type]
+        except (KeyError, TypeError):
+            pass
+        code = str(raw_type).strip().upper()
+        if code not in self._type_map:
+            return IN
+        mapped = self._type_map[code]
+        # Remember spellings of known codes so each is normalized once; unknown
+        # values are not kept, so arbitrary source data cannot grow the map.
+        if len(self._type_map) < TYPE_MEMO_LIMIT:
+            try:
+                self._type_map[raw_type] = mapped
+            except TypeError:
+                pass
+        return mapped
+
+    def fetch_logs_since(self, since: datetime) -> Iterator[LogRecord]:
         if not self._engine:
             raise ConnectionError("DBAdapter not connected")
         sql = self._build_query_if_needed()
         if not sql:
             # No query and insufficient metadata: return empty
-            return []
-        rows: List[Dict[str, Any]] = []
+            return
+        type_map = self._type_map
+        map_type = self._map_type
         with self._engine.connect() as conn:
-            result = conn.execute(text(sql), {"since": since})
-            for row in result.mappings():
-                employee_id = str(row.get("employee_id"))
-                ts = row.get("timestamp")
-                if isinstance(ts, datetime):
-                    timestamp = ts
-                else:
+            result = conn.execution_options(stream_results=True, yield_per=5000).execute(
+                text(sql), {"since": since}
+            )
+            keys = list(result.keys())
+            if "employee_id" not in keys or "timestamp" not in keys:
+                raise ConnectionError("FingerTec query must return employee_id and timestamp columns")
+            i_emp = keys.index("employee_id")
+            i_time = keys.index("timestamp")
+            i_type = keys.index("type") if "type" in keys else None
+            for row in result.tuples():
+                ts = row[i_time]
+                if not isinstance(ts, datetime):
                     try:
-                        timestamp = datetime.fromisoformat(str(ts))
-                    except Exception:
+                        ts = datetime.fromisoformat(str(ts))
+                    except ValueError:
                         continue
-                raw_type = row.get("type")
-                log_type = self._map_type(raw_type)
-                rows.append(
-                    {
-                        "employee_id": employee_id,
-                        "timestamp": timestamp,
-                        "type": log_type,
-                    }
-                )
-        return rows
+                raw_type = row[i_type] if i_type is not None else None
+                try:
+                    log_type = type_map[raw_type]
+                except (KeyError, TypeError):
+                    log_type = map_type(raw_type)
+                yield LogRecord(str(row[i_emp]), ts, log_type)
 
 
 def create_adapter_from_settings(django_settings) -> FingerTecAdapter:
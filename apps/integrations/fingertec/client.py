@@ -1,20 +1,14 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from datetime import datetime, timezone
-from typing import Iterable, List, Dict, Any
+from datetime import datetime
+from typing import Iterable, Dict, Any
+
+from .adapters import DEFAULT_TYPE_MAP, IN, LogRecord
 
 
 class ConnectionError(Exception):
     pass
 
 
-@dataclass
-class FingerTecLog:
-    employee_id: str
-    timestamp: datetime
-    type: str  # 'IN' or 'OUT'
-
-
 class FingerTecClient:
     def __init__(self, ip: str, port: int, timeout: float = 5.0) -> None:
         self.ip = ip
@@ -28,15 +22,15 @@ class FingerTecClient:
             raise ConnectionError("Invalid device configuration")
         self.connected = True
 
-    def get_new_logs(self, since: datetime) -> Iterable[Dict[str, Any]]:
+    def get_new_logs(self, since: datetime) -> Iterable[LogRecord]:
         # TODO: Replace with actual SDK fetch logic
         # For now, return an empty list to avoid side effects
         return []
 
     @staticmethod
-    def parse(raw: Dict[str, Any]) -> FingerTecLog:
-        return FingerTecLog(
+    def parse(raw: Dict[str, Any]) -> LogRecord:
+        return LogRecord(
             employee_id=str(raw.get("employee_id")),
             timestamp=raw.get("timestamp"),
-            type=str(raw.get("type", "IN")),
+            type=DEFAULT_TYPE_MAP.get(str(raw.get("type", IN)).strip().upper(), IN),
         )
\ No newline at end of file
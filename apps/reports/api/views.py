@@ -3,15 +3,17 @@ from typing import Any, Dict, List
 import csv
 from io import StringIO
 
-from django.db.models import Min, Max, Count, Q
-from django.utils.dateparse import parse_datetime
+from django.db.models import F
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.decorators import api_view, permission_classes
 from django.http import HttpResponse
 
-from apps.attendance.models import AttendanceLog
+from apps.attendance.services import cube
+from apps.attendance.services.rollup import employee_totals
+from apps.core import fastjson
 from apps.employees.models import Employee
 from apps.core.permissions import IsDeptManagerReadOnly, IsAuditorOrReadOnly
 from .serializers import (
@@ -37,36 +39,26 @@ class MonthlyReportView(APIView):
         if not start or not end or start > end:
             return Response({"detail": "invalid start/end"}, status=400)
 
-        logs = AttendanceLog.objects.select_related("employee", "employee__department").filter(
-            check_time__gte=start, check_time__lte=end
+        # Whole days come from the attendance_days rollup (see services/rollup.py)
+        totals = employee_totals(start, end, department_id)
+        # Ordered by the database so names sort by its collation, as before the rollup.
+        employees = (
+            Employee.objects.select_related("department")
+            .filter(log_key__in=list(totals))
+            .order_by("full_name")
         )
-        if department_id:
-            logs = logs.filter(employee__department_id=department_id)
-
-        # Aggregate per employee
-        agg = logs.values(
-            "employee_id",
-            "employee__employee_id",
-            "employee__full_name",
-            "employee__department__name",
-        ).annotate(
-            total_logs=Count("id"),
-            first_seen=Min("check_time"),
-            last_seen=Max("check_time"),
-            first_check_in=Min("check_time", filter=Q(log_type="IN")),
-            last_check_out=Max("check_time", filter=Q(log_type="OUT")),
-        ).order_by("employee__full_name")
 
         results: List[Dict[str, Any]] = []
-        for row in agg:
+        for emp in employees:
+            row = totals[emp.log_key]
             results.append({
-                "employee_id": row["employee_id"],
-                "employee_identifier": row["employee__employee_id"],
-                "full_name": row["employee__full_name"],
-                "department_name": row["employee__department__name"],
-                "total_logs": row["total_logs"],
-                "first_check_in": row["first_check_in"],
-                "last_check_out": row["last_check_out"],
+                "employee_id": emp.id,
+                "employee_identifier": emp.employee_id,
+                "full_name": emp.full_name,
+                "department_name": emp.department.name if emp.department else None,
+                "total_logs": row["punch_count"],
+                "first_check_in": row["first_in"],
+                "last_check_out": row["last_out"],
                 "first_seen": row["first_seen"],
                 "last_seen": row["last_seen"],
             })
@@ -81,8 +73,7 @@ class MonthlyReportView(APIView):
             "count": len(results),
             "results": results,
         }
-        serializer = MonthlyReportResponseSerializer(payload)
-        return Response(serializer.data)
+        return fastjson.serialized_response(request, MonthlyReportResponseSerializer, payload)
 
     def _export_csv(self, results: List[Dict[str, Any]], start, end, department_id):
         buffer = StringIO()
@@ -128,28 +119,34 @@ class DepartmentMonthlySummaryView(APIView):
         if not start or not end or start > end:
             return Response({"detail": "invalid start/end"}, status=400)
 
-        logs = AttendanceLog.objects.select_related("employee", "employee__department").filter(
-            check_time__gte=start, check_time__lte=end
+        totals = employee_totals(start, end)
+        # ORDER BY department name in the database (its collation), employees without one last.
+        employees = (
+            Employee.objects.select_related("department")
+            .filter(log_key__in=list(totals))
+            .order_by(F("department__name").asc(nulls_last=True))
         )
-        agg = logs.values("employee__department__id", "employee__department__name").annotate(
-            employees_count=Count("employee", distinct=True),
-            logs_count=Count("id"),
-            first_seen=Min("check_time"),
-            last_seen=Max("check_time"),
-        ).order_by("employee__department__name")
-
-        data = [
-            {
-                "department_id": row["employee__department__id"],
-                "department_name": row["employee__department__name"],
-                "employees_count": row["employees_count"],
-                "logs_count": row["logs_count"],
-                "first_seen": row["first_seen"],
-                "last_seen": row["last_seen"],
-            }
-            for row in agg
-        ]
-        return Response({
+
+        departments: Dict[Any, Dict[str, Any]] = {}
+        for emp in employees:
+            row = totals[emp.log_key]
+            dept = departments.setdefault(emp.department_id, {
+                "department_id": emp.department_id,
+                "department_name": emp.department.name if emp.department else None,
+                "employees_count": 0,
+                "logs_count": 0,
+                "first_seen": None,
+                "last_seen": None,
+            })
+            dept["employees_count"] += 1
+            dept["logs_count"] += row["punch_count"]
+            if dept["first_seen"] is None or row["first_seen"] < dept["first_seen"]:
+                dept["first_seen"] = row["first_seen"]
+            if dept["last_seen"] is None or row["last_seen"] > dept["last_seen"]:
+                dept["last_seen"] = row["last_seen"]
+        # Departments were first seen in name order.
+        data = list(departments.values())
+        return fastjson.json_response(request, {
             "start": start,
             "end": end,
             "count": len(data),
@@ -171,40 +168,25 @@ class WorkHoursMonthlyReportView(APIView):
         if not start or not end or start > end:
             return Response({"detail": "invalid start/end"}, status=400)
 
-        logs_qs = AttendanceLog.objects.select_related("employee", "employee__department").filter(
-            check_time__gte=start, check_time__lte=end
+        totals = employee_totals(start, end, department_id)
+        employees = (
+            Employee.objects.select_related("department")
+            .filter(log_key__in=list(totals))
+            .order_by("id")
         )
-        if department_id:
-            logs_qs = logs_qs.filter(employee__department_id=department_id)
-
-        # Pull all logs ordered by employee and time
-        logs_qs = logs_qs.order_by("employee_id", "check_time")
 
         results: List[Dict[str, Any]] = []
-        # Iterate per employee
-        current_emp = None
-        buffer: List[AttendanceLog] = []
-        for log in logs_qs.iterator():
-            if current_emp is None:
-                current_emp = log.employee_id
-            if log.employee_id != current_emp:
-                # process buffer
-                results.append(self._summarize(buffer))
-                buffer = []
-                current_emp = log.employee_id
-            buffer.append(log)
-        if buffer:
-            results.append(self._summarize(buffer))
-
-        # Fill identity fields from first log of each buffer
-        for r in results:
-            emp = Employee.objects.select_related("department").get(id=r["employee_id"])  # guaranteed by logs
-            r.update(
-                employee_identifier=emp.employee_id,
-                full_name=emp.full_name,
-                department_name=(emp.department.name if emp.department else None),
-                total_hours=round(r["total_seconds"] / 3600.0, 2),
-            )
+        for emp in employees:
+            row = totals[emp.log_key]
+            results.append({
+                "employee_id": emp.id,
+                "employee_identifier": emp.employee_id,
+                "full_name": emp.full_name,
+                "department_name": (emp.department.name if emp.department else None),
+                "sessions": row["sessions"],
+                "total_seconds": row["worked_seconds"],
+                "total_hours": round(row["worked_seconds"] / 3600.0, 2),
+            })
 
         payload = {
             "department": department_id,
@@ -213,29 +195,56 @@ class WorkHoursMonthlyReportView(APIView):
             "count": len(results),
             "results": results,
         }
-        serializer = WorkHoursReportResponseSerializer(payload)
-        return Response(serializer.data)
-
-    def _summarize(self, logs: List[AttendanceLog]) -> Dict[str, Any]:
-        seconds = 0
-        sessions = 0
-        i = 0
-        while i < len(logs):
-            if logs[i].log_type == "IN":
-                # find next OUT
-                j = i + 1
-                while j < len(logs) and logs[j].log_type != "OUT":
-                    j += 1
-                if j < len(logs) and logs[j].log_type == "OUT":
-                    delta = (logs[j].check_time - logs[i].check_time).total_seconds()
-                    if delta > 0:
-                        seconds += int(delta)
-                        sessions += 1
-                    i = j + 1
-                    continue
-            i += 1
-        return {
-            "employee_id": logs[0].employee_id if logs else None,
-            "sessions": sessions,
-            "total_seconds": seconds,
-        }
\ No newline at end of file
+        return fastjson.serialized_response(request, WorkHoursReportResponseSerializer, payload)
+
+
+class CubeReportView(APIView):
+    """Punch counts grouped by any of ``cube.DIMENSIONS``, answered from ``attendance_cube``.
+
+    ``?start=YYYY-MM-DD&end=YYYY-MM-DD`` (work days, inclusive) is required;
+    ``group_by=department,day,hour`` picks the dimensions (none gives the
+    grand total) and ``department``, ``direction`` (IN/OUT), ``hour_from``
+    and ``hour_to`` filter.
+    """
+
+    permission_classes = [IsAuthenticated, IsDeptManagerReadOnly, IsAuditorOrReadOnly]
+
+    def get(self, request, *args, **kwargs):
+        params = request.query_params
+        start = parse_date(params.get("start") or "")
+        end = parse_date(params.get("end") or "")
+        if not start or not end or start > end:
+            return Response({"detail": "start and end are required ISO dates"}, status=400)
+
+        group_by = [d.strip() for d in params.get("group_by", "").split(",") if d.strip()]
+        unknown = [d for d in group_by if d not in cube.DIMENSIONS]
+        if unknown or len(set(group_by)) != len(group_by):
+            return Response(
+                {"detail": f"group_by accepts: {', '.join(cube.DIMENSIONS)}"}, status=400
+            )
+
+        direction = params.get("direction")
+        if direction and direction not in ("IN", "OUT"):
+            return Response({"detail": "direction must be IN or OUT"}, status=400)
+        try:
+            hours = (int(params.get("hour_from", 0)), int(params.get("hour_to", 23)))
+        except ValueError:
+            return Response({"detail": "hour_from/hour_to must be integers"}, status=400)
+        if not 0 <= hours[0] <= hours[1] <= 23:
+            return Response({"detail": "invalid hour_from/hour_to"}, status=400)
+
+        results = cube.query(
+            group_by,
+            start,
+            end,
+            department_id=params.get("department"),
+            direction=direction,
+            hours=None if hours == (0, 23) else hours,
+        )
+        return fastjson.json_response(request, {
+            "start": start,
+            "end": end,
+            "group_by": group_by,
+            "count": len(results),
+            "results": results,
+        })
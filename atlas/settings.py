@@ -85,6 +85,98 @@ else:
 # Celery
 CELERY_BROKER_URL = REDIS_URL or "redis://127.0.0.1:6379/0"
 CELERY_RESULT_BACKEND = REDIS_URL or "redis://127.0.0.1:6379/0"
+# Task modules live in apps/attendance/tasks/ (no package __init__), so list them explicitly.
+CELERY_IMPORTS = (
+    "apps.attendance.tasks.sync",
+    "apps.attendance.tasks.outbox",
+    "apps.attendance.tasks.partitions",
+    "apps.attendance.tasks.archive",
+    "apps.attendance.tasks.retention",
+    "apps.attendance.tasks.presence",
+    "apps.attendance.tasks.usb_import",
+    "apps.attendance.tasks.snapshots",
+)
+# Long maintenance jobs run on their own worker so they never hold up sync.
+CELERY_TASK_ROUTES = {
+    "attendance.purge_retention": {"queue": "maintenance"},
+    "attendance.import_usb_file": {"queue": "maintenance"},
+    "attendance.build_snapshot": {"queue": "maintenance"},
+}
+
+# Attendance ingest
+ATTENDANCE_INGEST_BATCH_SIZE = int(os.getenv("ATTENDANCE_INGEST_BATCH_SIZE", "5000"))
+# Projections updated from every ingested batch (see services/projections.py).
+ATTENDANCE_PROJECTIONS: list[str] = [
+    "apps.attendance.services.rollup.DailyRollup",
+    "apps.attendance.services.cube.CubeProjection",
+    # Redis-backed "who is in now"; inert without REDIS_URL.
+    "apps.attendance.services.presence.PresenceProjection",
+]
+# Local time ("HH:MM") at which a work day starts; earlier punches count for the
+# previous day (see services/workdays.py). Changing it only affects new punches
+# until `recompute_work_dates` and `rebuild_projection attendance_day` are run.
+ATTENDANCE_WORKDAY_CUTOVER = os.getenv("ATTENDANCE_WORKDAY_CUTOVER", "00:00")
+# An OUT at most this many hours after an IN of the previous work day belongs to
+# that IN's day, so night shifts are one session (0 = off, at most 24). Same
+# recompute steps as the cutover when changed.
+ATTENDANCE_MAX_SHIFT_HOURS = float(os.getenv("ATTENDANCE_MAX_SHIFT_HOURS", "16"))
+# /api/attendance-logs/ keyset pages (?page_size=, see api/pagination.py)
+ATTENDANCE_LOGS_PAGE_SIZE = int(os.getenv("ATTENDANCE_LOGS_PAGE_SIZE", "100"))
+ATTENDANCE_LOGS_MAX_PAGE_SIZE = int(os.getenv("ATTENDANCE_LOGS_MAX_PAGE_SIZE", "1000"))
+# Plain JSON list/report responses skip DRF field serialization and use orjson
+# when installed (see apps/core/fastjson.py); the body is unchanged.
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "true").lower() in {"1", "true", "yes", "on"}
+# Employees per POST /api/attendance-logs/timeline/ lookup
+ATTENDANCE_TIMELINE_MAX_EMPLOYEES = int(os.getenv("ATTENDANCE_TIMELINE_MAX_EMPLOYEES", "500"))
+# /api/attendance-logs/changes/ page size cap
+CHANGE_FEED_MAX_LIMIT = int(os.getenv("CHANGE_FEED_MAX_LIMIT", "10000"))
+# /api/live event streams: a comment line after this many idle seconds keeps
+# proxies from closing the connection
+LIVE_EVENTS_KEEPALIVE_SECONDS = float(os.getenv("LIVE_EVENTS_KEEPALIVE_SECONDS", "15"))
+# Webhook outbox (see services/outbox.py)
+OUTBOX_DISPATCH_INTERVAL_SECONDS = int(os.getenv("OUTBOX_DISPATCH_INTERVAL_SECONDS", "30"))
+OUTBOX_BATCH_MAX_LOGS = int(os.getenv("OUTBOX_BATCH_MAX_LOGS", "5000"))
+OUTBOX_WEBHOOK_TIMEOUT = float(os.getenv("OUTBOX_WEBHOOK_TIMEOUT", "10"))
+# Undelivered events are kept this long, also while no endpoint is active
+OUTBOX_RETENTION_HOURS = float(os.getenv("OUTBOX_RETENTION_HOURS", "72"))
+# Monthly partitions of attendance_logs (see services/partitions.py). Detaching
+# is opt-in: the default 0 retention keeps every month attached.
+ATTENDANCE_PARTITION_MONTHS_AHEAD = int(os.getenv("ATTENDANCE_PARTITION_MONTHS_AHEAD", "3"))
+ATTENDANCE_PARTITION_RETENTION_MONTHS = int(os.getenv("ATTENDANCE_PARTITION_RETENTION_MONTHS", "0"))
+# Fetched batches are fsync'd here before the database write (see services/spool.py).
+# Pending segments are only drained by a sync worker that sees this directory:
+# run the sync queue on one host, or put it on shared durable storage.
+ATTENDANCE_SPOOL_DIR = os.getenv("ATTENDANCE_SPOOL_DIR", str(BASE_DIR / "var" / "spool"))
+# USB exports uploaded in the admin wait here for the import task; the
+# maintenance worker must see the same directory.
+ATTENDANCE_IMPORT_DIR = os.getenv("ATTENDANCE_IMPORT_DIR", str(BASE_DIR / "var" / "imports"))
+# Cold archive of old month partitions (see services/archive.py); 0 disables.
+# The directory must be durable storage that is backed up with the database.
+ATTENDANCE_ARCHIVE_DIR = os.getenv("ATTENDANCE_ARCHIVE_DIR", str(BASE_DIR / "var" / "archive"))
+ATTENDANCE_ARCHIVE_AFTER_MONTHS = int(os.getenv("ATTENDANCE_ARCHIVE_AFTER_MONTHS", "0"))
+# Memory-mapped month snapshots read by the reports (see services/snapshots.py);
+# off by default. Needs NumPy and a maintenance worker, which builds the files;
+# reports use the daily rollup for a month until its snapshot is built.
+# Every web and worker process must see the same directory; a month is rewritten
+# at most once per refresh interval, newer punches are read from the table.
+if os.getenv("ATTENDANCE_SNAPSHOTS", "false").lower() in {"1", "true", "yes", "on"}:
+    ATTENDANCE_PROJECTIONS.insert(2, "apps.attendance.services.snapshots.MonthSnapshots")
+ATTENDANCE_SNAPSHOT_DIR = os.getenv("ATTENDANCE_SNAPSHOT_DIR", str(BASE_DIR / "var" / "snapshots"))
+ATTENDANCE_SNAPSHOT_REFRESH_SECONDS = float(os.getenv("ATTENDANCE_SNAPSHOT_REFRESH_SECONDS", "60"))
+# Retention (see services/retention.py): days to keep per table; 0 keeps forever.
+# The attendance_days and attendance_cube rollups follow the logs unless kept longer on purpose.
+ATTENDANCE_LOG_RETENTION_DAYS = int(os.getenv("ATTENDANCE_LOG_RETENTION_DAYS", "0"))
+ATTENDANCE_RETENTION_DAYS = {
+    "attendance_logs": ATTENDANCE_LOG_RETENTION_DAYS,
+    "attendance_days": int(os.getenv("ATTENDANCE_DAY_RETENTION_DAYS") or ATTENDANCE_LOG_RETENTION_DAYS),
+    "attendance_cube": int(os.getenv("ATTENDANCE_DAY_RETENTION_DAYS") or ATTENDANCE_LOG_RETENTION_DAYS),
+}
+ATTENDANCE_RETENTION_BATCH_SIZE = int(os.getenv("ATTENDANCE_RETENTION_BATCH_SIZE", "5000"))
+ATTENDANCE_RETENTION_PAUSE_SECONDS = float(os.getenv("ATTENDANCE_RETENTION_PAUSE_SECONDS", "0.2"))
+ATTENDANCE_RETENTION_MAX_SECONDS = float(os.getenv("ATTENDANCE_RETENTION_MAX_SECONDS", "600"))
+# Push (ADMS/iclock) terminals allowed to upload; empty rejects every terminal.
+ICLOCK_ALLOWED_SERIALS = [s.strip() for s in os.getenv("ICLOCK_ALLOWED_SERIALS", "").split(",") if s.strip()]
+ICLOCK_TRANS_INTERVAL = int(os.getenv("ICLOCK_TRANS_INTERVAL", "1"))
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -5,8 +5,14 @@ from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 from apps.employees.api.views import EmployeeViewSet
-from apps.attendance.api.views import AttendanceLogViewSet
-from apps.reports.api.views import MonthlyReportView, DepartmentMonthlySummaryView, WorkHoursMonthlyReportView
+from apps.attendance.api.live import LiveEventsView
+from apps.attendance.api.views import AttendanceLogViewSet, PresenceView
+from apps.reports.api.views import (
+    CubeReportView,
+    DepartmentMonthlySummaryView,
+    MonthlyReportView,
+    WorkHoursMonthlyReportView,
+)
 
 
 def healthz(_request):
@@ -20,10 +26,14 @@ router.register(r"attendance-logs", AttendanceLogViewSet, basename="attendance-l
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("_healthz", healthz),
+    path("iclock/", include("apps.attendance.push.urls")),
     path("api/", include(router.urls)),
+    path("api/presence", PresenceView.as_view()),
+    path("api/live", LiveEventsView.as_view()),
     path("api/reports/monthly", MonthlyReportView.as_view()),
     path("api/reports/monthly-by-department", DepartmentMonthlySummaryView.as_view()),
     path("api/reports/work-hours", WorkHoursMonthlyReportView.as_view()),
+    path("api/reports/cube", CubeReportView.as_view()),
     path("api/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
 ]
\ No newline at end of file
@@ -0,0 +1,72 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from apps.attendance.models import AttendanceLog
+from apps.attendance.services import archive
+from apps.attendance.services.ingest import write_logs
+from apps.attendance.services.partitions import create_partition
+from apps.employees.models import Employee
+from apps.integrations.fingertec.adapters import LogRecord
+
+MONTH = date(2020, 1, 1)
+T0 = datetime(2020, 1, 6, 8, 0, tzinfo=timezone.utc)
+HOT = datetime(2020, 2, 3, 8, 0, tzinfo=timezone.utc)
+URL = "/api/attendance-logs/"
+
+
+@pytest.fixture
+def archived(transactional_db):
+    Employee.objects.create(employee_id="1001", full_name="First Employee")
+    Employee.objects.create(employee_id="1002", full_name="Second Employee")
+    create_partition(MONTH)
+    write_logs(
+        [LogRecord("1001" if i % 2 else "1002", T0 + timedelta(days=i), "IN") for i in range(5)], "device"
+    )
+    assert archive.archive_month(MONTH) is not None
+    write_logs([LogRecord("1001", HOT + timedelta(days=i), "OUT") for i in range(3)], "device")
+
+
+def test_redelivered_archived_punches_are_skipped(archived):
+    result = write_logs(
+        [LogRecord("1001", T0 + timedelta(days=1), "IN"), LogRecord("1001", T0 + timedelta(hours=9), "OUT")],
+        "device",
+    )
+
+    assert result.duplicates == 1
+    assert [row[2] for row in result.inserted] == [T0 + timedelta(hours=9)]
+    times = [row[2] for row in archive.rows(columns=("id", "employee_id", "check_time"))]
+    hot = list(AttendanceLog.objects.filter(check_time__lt=HOT).values_list("check_time", flat=True))
+    assert hot == [T0 + timedelta(hours=9)] and hot[0] not in times
+
+
+def _walk(client, params):
+    seen, url, data = [], URL, params
+    while url:
+        body = client.get(url, data).json()
+        seen += [datetime.fromisoformat(row["check_time"]) for row in body["results"]]
+        url, data = body["next"], None
+    return seen
+
+
+@pytest.mark.parametrize("ordering", ["-check_time", "check_time"])
+def test_pages_run_across_archived_and_hot_rows(admin_client, archived, ordering):
+    params = {"start": "2020-01-01T00:00:00Z", "page_size": 2, "ordering": ordering}
+    expected = [(T0 + timedelta(days=i)) for i in range(5)] + [(HOT + timedelta(days=i)) for i in range(3)]
+    if ordering.startswith("-"):
+        expected.reverse()
+
+    assert _walk(admin_client, params) == expected
+
+
+def test_archived_rows_are_filtered_like_hot_rows(admin_client, archived):
+    params = {"start": "2020-01-01T00:00:00Z", "end": "2020-01-31T00:00:00Z", "search": "second"}
+    body = admin_client.get(URL, params).json()
+    assert [row["employee_employee_id"] for row in body["results"]] == ["1002"] * 3
+
+
+def test_archived_ranges_cannot_be_ordered_by_created_at(admin_client, archived):
+    response = admin_client.get(URL, {"start": "2020-01-01T00:00:00Z", "ordering": "created_at"})
+    assert response.status_code == 400
+    # The hot table alone can still be ordered any way.
+    assert admin_client.get(URL, {"start": "2020-02-01T00:00:00Z", "ordering": "created_at"}).status_code == 200
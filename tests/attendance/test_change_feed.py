@@ -0,0 +1,57 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from django.db import connection, transaction
+
+from apps.attendance.services.ingest import write_logs
+from apps.employees.models import Employee
+from apps.integrations.fingertec.adapters import LogRecord
+
+T0 = datetime(2024, 5, 1, 8, 0, tzinfo=timezone.utc)
+URL = "/api/attendance-logs/changes/"
+
+
+@pytest.fixture
+def employees(transactional_db):
+    Employee.objects.create(employee_id="1001", full_name="First Employee")
+    Employee.objects.create(employee_id="1002", full_name="Second Employee")
+
+
+@pytest.mark.parametrize("limit", ["0", "-5"])
+def test_limit_below_one_is_rejected(admin_client, limit):
+    response = admin_client.get(URL, {"limit": limit})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "limit must be at least 1"}
+
+
+def test_feed_stops_below_a_batch_still_being_written(admin_client, employees):
+    written, release = threading.Event(), threading.Event()
+
+    def slow_batch():
+        try:
+            with transaction.atomic():
+                write_logs([LogRecord("1001", T0, "IN")], "slow")
+                written.set()
+                release.wait(10)
+        finally:
+            connection.close()
+
+    worker = threading.Thread(target=slow_batch)
+    worker.start()
+    try:
+        assert written.wait(10)
+        # Another employee's batch (in another cube cell) is not held up,
+        # but its higher id is not settled yet.
+        write_logs([LogRecord("1002", T0 + timedelta(hours=3), "IN")], "fast")
+        body = admin_client.get(URL).json()
+        assert body["rows"] == []
+        assert body["next_cursor"] == 0
+    finally:
+        release.set()
+        worker.join()
+
+    body = admin_client.get(URL).json()
+    assert [row[5] for row in body["rows"]] == ["slow", "fast"]
+    assert body["next_cursor"] == body["rows"][-1][0]
+    assert admin_client.get(URL, {"cursor": body["next_cursor"]}).json()["rows"] == []
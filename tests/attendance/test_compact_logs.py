@@ -0,0 +1,28 @@
+from datetime import datetime, timedelta, timezone
+
+from django.db import connection
+
+from apps.attendance.models import AttendanceLog, LogSource
+from apps.attendance.services.ingest import write_logs
+from apps.employees.models import Employee
+from apps.integrations.fingertec.adapters import LogRecord
+
+T0 = datetime(2024, 5, 1, 8, 0, tzinfo=timezone.utc)
+
+
+def test_compact_columns_keep_the_api_shape(admin_client, db):
+    employee = Employee.objects.create(employee_id="1001", full_name="Test Employee")
+    write_logs([LogRecord("1001", T0, "IN"), LogRecord("1001", T0 + timedelta(hours=8), "OUT")], "iclock:SN-1")
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT employee_id, log_type, source_id FROM attendance_logs ORDER BY check_time")
+        stored = cursor.fetchall()
+    source_id = LogSource.objects.get(name="iclock:SN-1").id
+    assert stored == [(employee.log_key, 1, source_id), (employee.log_key, 2, source_id)]
+
+    out = AttendanceLog.objects.get(log_type="OUT")
+    assert out.log_type == "OUT" and out.employee == employee
+    body = admin_client.get(f"/api/attendance-logs/{out.id}/").json()
+    assert body["employee"] == str(employee.id)
+    assert body["employee_employee_id"] == "1001"
+    assert (body["log_type"], body["source"]) == ("OUT", "iclock:SN-1")
@@ -0,0 +1,58 @@
+import csv
+import json
+from datetime import datetime, timedelta, timezone
+from io import StringIO
+
+import pytest
+
+from apps.attendance.api import export
+from apps.attendance.services.ingest import write_logs
+from apps.employees.models import Employee
+from apps.integrations.fingertec.adapters import LogRecord
+
+T0 = datetime(2024, 5, 1, 8, 0, tzinfo=timezone.utc)
+URL = "/api/attendance-logs/export/"
+
+
+@pytest.fixture
+def logs(db, monkeypatch):
+    # Small chunks so the export spans several of them.
+    monkeypatch.setattr(export, "CHUNK_ROWS", 2)
+    Employee.objects.create(employee_id="1001", full_name="أحمد")
+    Employee.objects.create(employee_id="1002", full_name="Ali, Jr.")
+    write_logs(
+        [LogRecord(code, T0 + timedelta(hours=h), kind) for h, kind in ((0, "IN"), (8, "OUT")) for code in ("1001", "1002")]
+        + [LogRecord("1001", T0 + timedelta(days=40), "IN")],
+        "iclock:SN-1",
+    )
+
+
+def _body(response):
+    assert response.status_code == 200
+    return b"".join(response.streaming_content).decode()
+
+
+def test_ndjson_export_streams_the_list_rows_oldest_first(admin_client, logs):
+    response = admin_client.get(URL, {"format": "ndjson", "start": "2024-05-01T00:00:00Z", "end": "2024-05-31T00:00:00Z"})
+    assert response["Content-Type"] == "application/x-ndjson"
+    assert response["Content-Disposition"] == "attachment; filename=attendance-logs_2024-05-01_2024-05-31.ndjson"
+    lines = [json.loads(line) for line in _body(response).splitlines()]
+
+    listed = admin_client.get(
+        "/api/attendance-logs/", {"ordering": "check_time", "start": "2024-05-01T00:00:00Z", "end": "2024-05-31T00:00:00Z"}
+    ).json()["results"]
+    assert lines == listed and len(lines) == 4
+
+
+def test_csv_export_has_a_header_and_one_record_per_log(admin_client, logs):
+    response = admin_client.get(URL, {"format": "csv", "fields": "employee_employee_id,log_type"})
+    assert response["Content-Type"] == "text/csv; charset=utf-8"
+    records = list(csv.reader(StringIO(_body(response))))
+    assert records == [
+        ["employee_employee_id", "log_type"],
+        ["1001", "IN"],
+        ["1002", "IN"],
+        ["1001", "OUT"],
+        ["1002", "OUT"],
+        ["1001", "IN"],
+    ]
@@ -0,0 +1,18 @@
+from django.db import connection
+
+INDEX_SQL = """
+    SELECT c.relname, i.indisvalid
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    JOIN pg_class t ON t.oid = i.indrelid
+    WHERE t.relname = 'attendance_logs'
+"""
+
+
+def test_log_indexes_are_valid_and_brin_is_gone(db):
+    with connection.cursor() as cursor:
+        cursor.execute(INDEX_SQL)
+        indexes = dict(cursor.fetchall())
+    assert {"idx_att_emp_time_cov", "idx_att_time", "idx_att_emp_workdate"} <= set(indexes)
+    assert "brin_att_time" not in indexes
+    assert all(indexes.values())
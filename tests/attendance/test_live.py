@@ -0,0 +1,89 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from apps.attendance.api import live as live_api
+from apps.attendance.services import live
+from apps.employees.models import Employee
+
+URL = "/api/live"
+T0 = datetime(2024, 5, 1, 8, 0, tzinfo=timezone.utc)
+
+
+def test_frame_puts_the_event_line_first():
+    assert live.frame("sync", {"ok": True}) == b'event: sync\ndata: {"ok":true}\n\n'
+    frame = live.frame("punches", {"rows": [["علي"]]}, event_id=42)
+    assert frame == 'event: punches\nid: 42\ndata: {"rows":[["علي"]]}\n\n'.encode()
+    assert live.event_name(frame) == "punches"
+
+
+def test_stream_errors_come_out_as_error_events(admin_client, settings):
+    response = admin_client.get(URL, HTTP_ACCEPT="text/event-stream")
+    assert response.status_code == 503
+    assert response.content == b'event: error\ndata: {"detail":"live events need REDIS_URL"}\n\n'
+
+    assert admin_client.get(URL, {"events": "punches,nope"}, HTTP_ACCEPT="text/event-stream").status_code == 400
+    settings.REDIS_URL = "redis://localhost:6379/0"
+    # The test client is WSGI; the stream is only served under ASGI.
+    assert admin_client.get(URL, HTTP_ACCEPT="text/event-stream").status_code == 501
+
+
+def test_publish_punches_sends_one_frame_per_batch(db, settings, monkeypatch):
+    employee = Employee.objects.create(employee_id="1001", full_name="Test Employee")
+    published = []
+    monkeypatch.setattr(live, "publish", lambda *args, **kwargs: published.append((args, kwargs)))
+
+    live.publish_punches([(7, employee.log_key, T0, "IN")], "iclock:SN-1")
+    assert published == []  # no REDIS_URL
+
+    settings.REDIS_URL = "redis://localhost:6379/0"
+    live.publish_punches([(7, employee.log_key, T0, "IN")], "iclock:SN-1")
+    ((event, data), kwargs), = published
+    assert event == "punches" and data["columns"] == live.PUNCH_COLUMNS
+    assert data["rows"] == [[7, employee.id, "1001", T0, "IN", "iclock:SN-1"]]
+    assert "event_id" in kwargs
+
+
+class FakePubSub:
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.closed = False
+
+    async def subscribe(self, channel):
+        assert channel == live.CHANNEL
+
+    async def get_message(self, ignore_subscribe_messages, timeout):
+        return {"data": self.messages.pop(0)} if self.messages else None
+
+    async def aclose(self):
+        self.closed = True
+
+
+class FakeRedis:
+    def __init__(self, pubsub):
+        self._pubsub = pubsub
+
+    def pubsub(self):
+        return self._pubsub
+
+    async def aclose(self):
+        pass
+
+
+def test_frames_relays_selected_events_and_keeps_alive(settings, monkeypatch):
+    settings.REDIS_URL = "redis://localhost:6379/0"
+    pubsub = FakePubSub([live.frame("sync", {}), live.frame("punches", {"rows": []}, event_id=3)])
+    monkeypatch.setattr(live_api.aioredis.Redis, "from_url", lambda url: FakeRedis(pubsub))
+
+    async def first(count):
+        frames = live_api._frames(frozenset({"punches"}), keepalive=0)
+        out = [await frames.__anext__() for _ in range(count)]
+        await frames.aclose()
+        return out
+
+    out = asyncio.run(first(3))
+    assert out[0] == f"retry: {live_api.RETRY_MS}\n\n".encode()
+    # The sync frame is filtered out; with nothing relayed a keepalive goes out instead.
+    assert out[1:] == [b": keepalive\n\n", live.frame("punches", {"rows": []}, event_id=3)]
+    assert pubsub.closed
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from django.utils import timezone as dj_timezone
+
+from apps.attendance.models import OutboxEvent, WebhookEndpoint
+from apps.attendance.services import outbox
+from apps.attendance.services.ingest import write_logs
+from apps.employees.models import Employee
+from apps.integrations.fingertec.adapters import LogRecord
+
+T0 = datetime(2024, 5, 1, 8, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def posts(monkeypatch):
+    sent = []
+    monkeypatch.setattr(outbox, "_post", lambda endpoint, body: sent.append((endpoint.name, body)))
+    return sent
+
+
+@pytest.fixture
+def employee(transactional_db):
+    return Employee.objects.create(employee_id="1001", full_name="Test Employee")
+
+
+def test_events_wait_for_an_endpoint_configured_later(employee, posts):
+    write_logs([LogRecord("1001", T0, "IN"), LogRecord("1001", T0 + timedelta(hours=8), "OUT")], "test")
+
+    assert outbox.dispatch_outbox() == 0
+    assert OutboxEvent.objects.count() == 1
+
+    endpoint = WebhookEndpoint.objects.create(name="hr", url="http://example.invalid/hook")
+    assert outbox.dispatch_outbox() == 2
+    assert [name for name, _ in posts] == ["hr"]
+    endpoint.refresh_from_db()
+    assert endpoint.failures == 0 and endpoint.last_event_id > 0
+    # Delivered to every active endpoint, so pruned.
+    assert not OutboxEvent.objects.exists()
+
+
+def test_events_past_retention_are_pruned(employee, posts, settings):
+    settings.OUTBOX_RETENTION_HOURS = 1
+    write_logs([LogRecord("1001", T0, "IN")], "test")
+    write_logs([LogRecord("1001", T0 + timedelta(hours=8), "OUT")], "test")
+    old, recent = OutboxEvent.objects.order_by("id")
+    OutboxEvent.objects.filter(id=old.id).update(created_at=dj_timezone.now() - timedelta(hours=2))
+
+    outbox.dispatch_outbox()
+
+    assert list(OutboxEvent.objects.values_list("id", flat=True)) == [recent.id]
+    assert posts == []
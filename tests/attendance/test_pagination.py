@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from apps.attendance.services.ingest import write_logs
+from apps.employees.models import Employee
+from apps.integrations.fingertec.adapters import LogRecord
+
+T0 = datetime(2024, 5, 1, 8, 0, tzinfo=timezone.utc)
+URL = "/api/attendance-logs/"
+
+
+@pytest.fixture
+def logs(db):
+    for code in ("1001", "1002", "1003"):
+        Employee.objects.create(employee_id=code, full_name=f"Employee {code}")
+    # Three punches share each instant, so pages must break ties on id.
+    write_logs(
+        [LogRecord(code, T0 + timedelta(minutes=m), "IN") for m in range(3) for code in ("1001", "1002", "1003")],
+        "test",
+    )
+
+
+def _pages(client, url, params=None, link="next"):
+    pages = []
+    while url:
+        body = client.get(url, params).json()
+        pages.append([(row["check_time"], row["id"]) for row in body["results"]])
+        url, params = body[link], None
+    return pages
+
+
+def test_pages_walk_every_row_once_in_key_order(admin_client, logs):
+    pages = _pages(admin_client, URL, {"page_size": 4})
+    assert [len(page) for page in pages] == [4, 4, 1]
+    rows = [row for page in pages for row in page]
+    keys = [(datetime.fromisoformat(t), i) for t, i in rows]
+    assert keys == sorted(keys, reverse=True) and len(set(keys)) == 9
+
+    ascending = [row for page in _pages(admin_client, URL, {"page_size": 4, "ordering": "check_time"}) for row in page]
+    assert ascending == rows[::-1]
+
+
+def test_previous_link_returns_the_page_before(admin_client, logs):
+    first = admin_client.get(URL, {"page_size": 4}).json()
+    assert first["previous"] is None
+    second = admin_client.get(first["next"]).json()
+    back = admin_client.get(second["previous"]).json()
+    assert [row["id"] for row in back["results"]] == [row["id"] for row in first["results"]]
+
+
+@pytest.mark.parametrize("params", [{"cursor": "not-a-cursor"}, {"page_size": 0}, {"page_size": "ten"}])
+def test_bad_cursor_or_page_size_is_rejected(admin_client, logs, params):
+    assert admin_client.get(URL, params).status_code == 400
+
+
+def test_page_size_is_capped(admin_client, logs, settings):
+    settings.ATTENDANCE_LOGS_MAX_PAGE_SIZE = 2
+    body = admin_client.get(URL, {"page_size": 500}).json()
+    assert len(body["results"]) == 2 and body["next"]
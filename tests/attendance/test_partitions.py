@@ -0,0 +1,37 @@
+from datetime import date, datetime, timezone
+
+from django.db import connection
+
+from apps.attendance.services import partitions
+from apps.attendance.services.ingest import write_logs
+from apps.attendance.services.partitions import DEFAULT_PARTITION, create_partition, maintain_partitions
+from apps.employees.models import Employee
+from apps.integrations.fingertec.adapters import LogRecord
+
+
+def _count(table):
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT count(*) FROM {table}")
+        return cursor.fetchone()[0]
+
+
+def test_create_partition_moves_rows_out_of_the_default_partition(db):
+    Employee.objects.create(employee_id="1001", full_name="Test Employee")
+    month = date(2035, 3, 1)
+    write_logs([LogRecord("1001", datetime(2035, 3, 10, 8, 0, tzinfo=timezone.utc), "IN")], "test")
+    assert _count(DEFAULT_PARTITION) == 1
+
+    assert create_partition(month) is True
+    assert create_partition(month) is False
+    assert _count(DEFAULT_PARTITION) == 0
+    assert _count(partitions.partition_name(month)) == 1
+
+
+def test_detaching_is_opt_in(db):
+    old = date(2001, 1, 1)
+    create_partition(old)
+
+    _, detached = maintain_partitions(months_ahead=0)
+
+    assert detached == []
+    assert (partitions.partition_name(old), old) in partitions.list_partitions()
@@ -0,0 +1,77 @@
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from apps.attendance.services import presence
+from apps.attendance.services.ingest import write_logs
+from apps.employees.models import Department, Employee
+from apps.integrations.fingertec.adapters import LogRecord
+
+TZ = ZoneInfo("Asia/Baghdad")
+DAY = date(2024, 5, 1)
+URL = "/api/presence"
+
+
+@pytest.fixture
+def sales(db, monkeypatch):
+    monkeypatch.setattr(presence, "today", lambda: DAY)
+    sales = Department.objects.create(name="Sales")
+    Department.objects.create(name="HR")
+    Employee.objects.create(employee_id="1001", full_name="Bassam", department=sales)
+    Employee.objects.create(employee_id="1002", full_name="Ali", department=sales)
+    Employee.objects.create(employee_id="1003", full_name="Zaid", department=sales)
+    Employee.objects.create(employee_id="2001", full_name="No Department")
+    write_logs(
+        [
+            LogRecord("1001", datetime(2024, 5, 1, 8, tzinfo=TZ), "IN"),
+            LogRecord("1002", datetime(2024, 5, 1, 9, tzinfo=TZ), "IN"),
+            LogRecord("1003", datetime(2024, 5, 1, 8, tzinfo=TZ), "IN"),
+            LogRecord("1003", datetime(2024, 5, 1, 12, tzinfo=TZ), "OUT"),
+            LogRecord("2001", datetime(2024, 5, 1, 7, tzinfo=TZ), "IN"),
+            # Yesterday's punch does not count for today.
+            LogRecord("1001", datetime(2024, 4, 30, 8, tzinfo=TZ), "OUT"),
+        ],
+        "test",
+    )
+    return sales
+
+
+def test_presence_from_the_database_without_redis(admin_client, sales):
+    body = admin_client.get(URL).json()
+    assert (body["work_date"], body["source"], body["inside"]) == ("2024-05-01", "database", 3)
+    rows = {row["department_name"]: row for row in body["departments"]}
+    assert (rows["Sales"]["inside"], rows["Sales"]["seen"]) == (2, 3)
+    assert [m["employee_full_name"] for m in rows["Sales"]["members"]] == ["Ali", "Bassam"]
+    assert (rows["HR"]["inside"], rows["HR"]["seen"]) == (0, 0)
+    assert [m["employee_employee_id"] for m in rows[None]["members"]] == ["2001"]
+
+
+def test_presence_of_one_department_without_members(admin_client, sales):
+    body = admin_client.get(URL, {"department": str(sales.pk), "members": "0"}).json()
+    assert body["departments"] == [
+        {"department_id": str(sales.pk), "department_name": "Sales", "inside": 2, "seen": 3, "members": []}
+    ]
+    assert admin_client.get(URL, {"department": "not-a-uuid"}).status_code == 400
+
+
+def test_night_shift_out_closes_the_day_the_in_opened(admin_client, sales):
+    # 1002 came in at 09:00 on May 1st; a night worker clocks in at 22:00 and out at 06:00 on May 2nd.
+    night = Employee.objects.create(employee_id="1004", full_name="Night", department=sales)
+    result = write_logs(
+        [
+            LogRecord("1004", datetime(2024, 5, 1, 22, tzinfo=TZ), "IN"),
+            LogRecord("1004", datetime(2024, 5, 2, 6, tzinfo=TZ), "OUT"),
+        ],
+        "test",
+    )
+    rows = {row["department_name"]: row for row in admin_client.get(URL).json()["departments"]}
+    assert (rows["Sales"]["inside"], rows["Sales"]["seen"]) == (2, 4)
+
+    # Redis updates bucket the same batch by the same stored work day.
+    assert [row[2] for row in presence._rows_of_day(DAY, result.inserted)] == [
+        datetime(2024, 5, 1, 22, tzinfo=TZ),
+        datetime(2024, 5, 2, 6, tzinfo=TZ),
+    ]
+    assert presence._rows_of_day(date(2024, 5, 2), result.inserted) == []
+    assert presence._state_from_database(DAY)[night.log_key][1] == "OUT"
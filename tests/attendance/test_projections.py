@@ -0,0 +1,90 @@
+from datetime import date, datetime, timedelta, timezone
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import transaction
+
+from apps.attendance.services import archive, projections
+from apps.attendance.services.ingest import write_logs
+from apps.attendance.services.partitions import create_partition
+from apps.attendance.services.projections import Projection, replay
+from apps.employees.models import Employee
+from apps.integrations.fingertec.adapters import LogRecord
+
+T0 = datetime(2024, 5, 1, 8, 0, tzinfo=timezone.utc)
+
+
+class Recorder(Projection):
+    name = "test_recorder"
+    after_commit = True
+
+    def __init__(self):
+        self.calls = []
+
+    def apply(self, rows):
+        self.calls.append(("apply", [row[0] for row in rows]))
+
+    def reset(self, start, end):
+        self.calls.append(("reset", start, end))
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    projection = Recorder()
+    monkeypatch.setattr(projections, "get_projections", lambda: {projection.name: projection})
+    return projection
+
+
+@pytest.fixture
+def employee(transactional_db):
+    return Employee.objects.create(employee_id="1001", full_name="Test Employee")
+
+
+class Boom(Exception):
+    pass
+
+
+def test_after_commit_projection_sees_only_committed_batches(employee, recorder):
+    with pytest.raises(Boom), transaction.atomic():
+        write_logs([LogRecord("1001", T0, "IN")], "test")
+        raise Boom
+    assert recorder.calls == []
+
+    result = write_logs([LogRecord("1001", T0, "IN")], "test")
+    assert recorder.calls == [("apply", [result.inserted[0][0]])]
+
+
+def test_replay_defers_after_commit_projection_until_commit(employee, recorder):
+    ids = [row[0] for row in write_logs(
+        [LogRecord("1001", T0 + timedelta(hours=i), "IN") for i in range(3)], "test"
+    ).inserted]
+    recorder.calls.clear()
+    start, end = T0 - timedelta(days=1), T0 + timedelta(days=1)
+
+    with pytest.raises(Boom), transaction.atomic():
+        assert replay(recorder, start, end, batch_size=2) == 0
+        raise Boom
+    assert recorder.calls == []
+
+    with transaction.atomic():
+        replay(recorder, start, end, batch_size=2)
+        assert recorder.calls == []
+    assert recorder.calls == [("reset", start, end), ("apply", ids[:2]), ("apply", ids[2:])]
+
+    recorder.calls.clear()
+    assert replay(recorder, start, end, batch_size=2) == 3
+    assert len(recorder.calls) == 3
+
+
+def test_rebuild_without_a_range_covers_archived_months(employee, recorder):
+    create_partition(date(2020, 1, 1))
+    archived = write_logs([LogRecord("1001", datetime(2020, 1, 6, 8, tzinfo=timezone.utc), "IN")], "test")
+    assert archive.archive_month(date(2020, 1, 1)) is not None
+    hot = write_logs([LogRecord("1001", T0, "IN")], "test")
+    recorder.calls.clear()
+
+    call_command("rebuild_projection", recorder.name, workers=1, stdout=StringIO())
+
+    applied = sorted(i for call in recorder.calls if call[0] == "apply" for i in call[1])
+    assert applied == [archived.inserted[0][0], hot.inserted[0][0]]
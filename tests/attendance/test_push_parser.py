@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from apps.attendance.push.parser import iter_attlog_batches, parse_attlog_line
+
+
+def test_parse_attlog_line_maps_status_to_direction():
+    rec = parse_attlog_line(b"1001\t2024-05-01 16:02:11\t1\t1\t0\t0\n")
+    assert rec.employee_id == "1001"
+    assert rec.timestamp == datetime(2024, 5, 1, 16, 2, 11)
+    assert rec.type == "OUT"
+
+
+def test_parse_attlog_line_skips_malformed():
+    assert parse_attlog_line(b"\n") is None
+    assert parse_attlog_line(b"1001\tnot-a-date\t0\n") is None
+
+
+def test_iter_attlog_batches_respects_batch_size():
+    lines = [f"{i}\t2024-05-01 08:00:00\t0\t1\n".encode() for i in range(5)]
+    batches = list(iter_attlog_batches(lines, batch_size=2))
+    assert [len(b) for b in batches] == [2, 2, 1]
+
+
+def test_parse_attlog_line_rejects_date_without_time():
+    assert parse_attlog_line(b"1001\t2024-05-01\t0\n") is None
+    assert parse_attlog_line(b"1001\t20240501\t0\n") is None
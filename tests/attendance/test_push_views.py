@@ -0,0 +1,52 @@
+import pytest
+
+from apps.attendance.models import AttendanceLog
+from apps.employees.models import Employee
+
+ATTLOG = b"1001\t2024-05-01 08:00:00\t0\t1\t0\t0\n1001\t2024-05-01 16:02:11\t1\t1\t0\t0\n"
+
+
+@pytest.fixture
+def allowed(settings):
+    settings.ICLOCK_ALLOWED_SERIALS = ["SN-OK"]
+
+
+def test_empty_allowlist_rejects_every_terminal(client, settings):
+    settings.ICLOCK_ALLOWED_SERIALS = []
+    assert client.get("/iclock/cdata", {"SN": "SN-OK"}).status_code == 403
+
+
+def test_unknown_or_missing_serial_is_rejected(client, allowed):
+    assert client.get("/iclock/cdata", {"SN": "SN-OTHER"}).status_code == 403
+    assert client.get("/iclock/cdata").status_code == 403
+    assert client.get("/iclock/getrequest", {"SN": "SN-OTHER"}).status_code == 403
+    assert client.post("/iclock/devicecmd?SN=SN-OTHER").status_code == 403
+
+
+def test_allowed_serial_gets_handshake(client, allowed):
+    response = client.get("/iclock/cdata", {"SN": "SN-OK"})
+    assert response.status_code == 200
+    assert response.content.startswith(b"GET OPTION FROM: SN-OK\n")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_allowed_serial_upload_is_ingested(client, allowed):
+    Employee.objects.create(employee_id="1001", full_name="Test Employee")
+    response = client.post(
+        "/iclock/cdata?SN=SN-OK&table=ATTLOG", data=ATTLOG, content_type="text/plain"
+    )
+    assert response.content == b"OK: 2"
+    assert list(AttendanceLog.objects.order_by("check_time").values_list("log_type", "source__name")) == [
+        ("IN", "iclock:SN-OK"),
+        ("OUT", "iclock:SN-OK"),
+    ]
+
+
+@pytest.mark.django_db
+def test_rejected_serial_writes_nothing(client, allowed):
+    Employee.objects.create(employee_id="1001", full_name="Test Employee")
+    response = client.post(
+        "/iclock/cdata?SN=SN-FORGED&table=ATTLOG", data=ATTLOG, content_type="text/plain"
+    )
+    assert response.status_code == 403
+    assert not AttendanceLog.objects.exists()
@@ -0,0 +1,47 @@
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from apps.attendance.models import AttendanceLog, RetentionCheckpoint
+from apps.attendance.services import retention
+from apps.attendance.services.ingest import write_logs
+from apps.attendance.services.partitions import create_partition, list_partitions
+from apps.employees.models import Employee
+from apps.integrations.fingertec.adapters import LogRecord
+
+TZ = ZoneInfo("Asia/Baghdad")
+TODAY = date(2024, 6, 20)
+POLICY = retention.Policy("attendance_logs", keep_days=30)
+
+
+@pytest.fixture
+def logs(transactional_db):
+    Employee.objects.create(employee_id="1001", full_name="Test Employee")
+    create_partition(date(2024, 4, 1))
+    create_partition(date(2024, 5, 1))
+    old = [datetime(2024, 4, 10, 8, tzinfo=TZ)] + [datetime(2024, 5, day, 8, tzinfo=TZ) for day in range(1, 6)]
+    kept = [datetime(2024, 5, 25, 8, tzinfo=TZ), datetime(2024, 6, 19, 8, tzinfo=TZ)]
+    write_logs([LogRecord("1001", t, "IN") for t in old + kept], "test")
+    return kept
+
+
+def test_purge_drops_whole_months_and_deletes_the_rest_in_batches(logs):
+    result = retention.purge(POLICY, today=TODAY, batch_size=2, pause=0, max_seconds=60)
+
+    assert result.finished
+    assert result.deleted == 5
+    assert "attendance_logs_2024_04" in result.dropped
+    assert ("attendance_logs_2024_04", date(2024, 4, 1)) not in list_partitions()
+    assert list(AttendanceLog.objects.order_by("check_time").values_list("check_time", flat=True)) == logs
+
+
+def test_an_interrupted_purge_resumes_from_its_checkpoint(logs):
+    first = retention.purge(POLICY, today=TODAY, batch_size=2, pause=0, max_seconds=0)
+    assert not first.finished and first.deleted == 2
+    assert RetentionCheckpoint.objects.get(table="attendance_logs").deleted == 2
+
+    second = retention.purge(POLICY, today=TODAY, batch_size=2, pause=0, max_seconds=60)
+    assert second.finished and second.deleted == 3
+    assert AttendanceLog.objects.filter(check_time__lt=datetime(2024, 5, 21, tzinfo=TZ)).count() == 0
+    assert AttendanceLog.objects.count() == len(logs)
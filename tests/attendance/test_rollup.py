@@ -0,0 +1,114 @@
+from datetime import date, datetime, timedelta
+from io import StringIO
+from zoneinfo import ZoneInfo
+
+import pytest
+from django.core.management import call_command
+
+from apps.attendance.models import AttendanceDay, AttendanceLog
+from apps.attendance.services import rollup, snapshots
+from apps.attendance.services.ingest import write_logs
+from apps.employees.models import Employee
+from apps.integrations.fingertec.adapters import LogRecord
+
+TZ = ZoneInfo("Asia/Baghdad")
+NIGHT_IN = datetime(2024, 5, 1, 22, 0, tzinfo=TZ)
+NIGHT_OUT = datetime(2024, 5, 2, 6, 0, tzinfo=TZ)
+
+
+@pytest.fixture
+def employee(db):
+    return Employee.objects.create(employee_id="1001", full_name="Night Worker")
+
+
+def _day(employee, day):
+    return AttendanceDay.objects.filter(employee=employee, work_date=day).values("sessions", "worked_seconds").first()
+
+
+def test_night_shift_counts_on_the_day_it_started(employee):
+    write_logs([LogRecord("1001", NIGHT_IN, "IN"), LogRecord("1001", NIGHT_OUT, "OUT")], "test")
+
+    assert _day(employee, date(2024, 5, 1)) == {"sessions": 1, "worked_seconds": 8 * 3600}
+    assert not AttendanceDay.objects.filter(employee=employee, work_date=date(2024, 5, 2)).exists()
+    totals = rollup.employee_totals(datetime(2024, 5, 1, tzinfo=TZ), datetime(2024, 5, 4, tzinfo=TZ))
+    assert totals[employee.log_key]["worked_seconds"] == 8 * 3600
+
+
+def test_night_shift_pairs_when_the_in_arrives_last(employee):
+    write_logs([LogRecord("1001", NIGHT_OUT, "OUT")], "test")
+    assert _day(employee, date(2024, 5, 2)) == {"sessions": 0, "worked_seconds": 0}
+
+    write_logs([LogRecord("1001", NIGHT_IN, "IN")], "test")
+
+    assert AttendanceLog.objects.get(log_type="OUT").work_date == date(2024, 5, 1)
+    assert _day(employee, date(2024, 5, 1)) == {"sessions": 1, "worked_seconds": 8 * 3600}
+    assert not AttendanceDay.objects.filter(employee=employee, work_date=date(2024, 5, 2)).exists()
+
+
+def test_out_long_after_the_in_stays_on_its_own_day(employee, settings):
+    settings.ATTENDANCE_MAX_SHIFT_HOURS = 6
+    write_logs([LogRecord("1001", NIGHT_IN, "IN"), LogRecord("1001", NIGHT_OUT, "OUT")], "test")
+
+    assert _day(employee, date(2024, 5, 1)) == {"sessions": 0, "worked_seconds": 0}
+    assert _day(employee, date(2024, 5, 2)) == {"sessions": 0, "worked_seconds": 0}
+
+
+@pytest.mark.skipif(snapshots.np is None, reason="NumPy is not installed")
+def test_snapshot_totals_match_the_rollup(employee):
+    day_in = NIGHT_IN + timedelta(days=2, hours=-14)
+    write_logs(
+        [
+            LogRecord("1001", NIGHT_IN, "IN"),
+            LogRecord("1001", NIGHT_OUT, "OUT"),
+            LogRecord("1001", day_in, "IN"),
+            LogRecord("1001", day_in + timedelta(hours=9), "OUT"),
+        ],
+        "test",
+    )
+    snapshots.build_month(date(2024, 5, 1))
+    start, end = datetime(2024, 5, 1, tzinfo=TZ), datetime(2024, 5, 10, tzinfo=TZ)
+    totals = snapshots.employee_totals(start, end)[employee.log_key]
+    assert (totals["sessions"], totals["worked_seconds"]) == (2, 17 * 3600)
+    assert totals == rollup.employee_totals(start, end)[employee.log_key]
+
+
+def test_recompute_work_dates_applies_the_shift_setting(employee, settings):
+    settings.ATTENDANCE_MAX_SHIFT_HOURS = 0
+    write_logs([LogRecord("1001", NIGHT_IN, "IN"), LogRecord("1001", NIGHT_OUT, "OUT")], "test")
+    assert AttendanceLog.objects.get(log_type="OUT").work_date == date(2024, 5, 2)
+
+    settings.ATTENDANCE_MAX_SHIFT_HOURS = 16
+    call_command("recompute_work_dates", stdout=StringIO())
+
+    assert AttendanceLog.objects.get(log_type="OUT").work_date == date(2024, 5, 1)
+
+
+EDGE_SHIFTS = [
+    (datetime(2024, 4, 30, 22, tzinfo=TZ), datetime(2024, 5, 1, 6, tzinfo=TZ)),
+    (datetime(2024, 5, 1, 22, tzinfo=TZ), datetime(2024, 5, 2, 6, tzinfo=TZ)),
+    (datetime(2024, 5, 3, 8, tzinfo=TZ), datetime(2024, 5, 3, 16, tzinfo=TZ)),
+    (datetime(2024, 5, 5, 22, tzinfo=TZ), datetime(2024, 5, 6, 6, tzinfo=TZ)),
+]
+
+
+@pytest.mark.parametrize(
+    "start, end, punches, sessions",
+    [
+        # Night shifts cross both edges: their outside half is left out.
+        (datetime(2024, 5, 1, tzinfo=TZ), datetime(2024, 5, 5, 23, 59, 59, tzinfo=TZ), 6, 2),
+        (datetime(2024, 5, 1, tzinfo=TZ), datetime(2024, 5, 2, 23, 59, 59, tzinfo=TZ), 3, 1),
+        # The range starts between a night shift's IN and its OUT.
+        (datetime(2024, 5, 2, tzinfo=TZ), datetime(2024, 5, 9, tzinfo=TZ), 5, 2),
+        (datetime(2024, 4, 30, tzinfo=TZ), datetime(2024, 5, 6, 23, 59, 59, tzinfo=TZ), 8, 4),
+    ],
+)
+def test_totals_count_each_punch_in_the_range_once(employee, start, end, punches, sessions):
+    write_logs([LogRecord("1001", t, kind) for shift in EDGE_SHIFTS for t, kind in zip(shift, ("IN", "OUT"))], "test")
+    assert AttendanceLog.objects.filter(check_time__gte=start, check_time__lte=end).count() == punches
+
+    totals = rollup.employee_totals(start, end)[employee.log_key]
+    assert (totals["punch_count"], totals["sessions"]) == (punches, sessions)
+    if snapshots.np is not None:
+        snapshots.build_month(date(2024, 4, 1))
+        snapshots.build_month(date(2024, 5, 1))
+        assert snapshots.employee_totals(start, end)[employee.log_key] == totals
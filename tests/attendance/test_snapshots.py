@@ -0,0 +1,76 @@
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from apps.attendance.models import AttendanceLog
+from apps.attendance.services import rollup, snapshots
+from apps.attendance.services.ingest import write_logs
+from apps.attendance.tasks import snapshots as snapshot_tasks
+from apps.employees.models import Employee
+from apps.integrations.fingertec.adapters import LogRecord
+
+pytestmark = pytest.mark.skipif(snapshots.np is None, reason="NumPy is not installed")
+
+TZ = ZoneInfo("Asia/Baghdad")
+MAY = date(2024, 5, 1)
+IN_AT = datetime(2024, 5, 6, 8, tzinfo=TZ)
+START, END = datetime(2024, 5, 1, tzinfo=TZ), datetime(2024, 5, 31, tzinfo=TZ)
+
+
+@pytest.fixture
+def scheduled(monkeypatch):
+    """Snapshots enabled; builds requested from the worker are recorded instead of queued."""
+    months = []
+    monkeypatch.setattr(snapshots, "available", lambda: True)
+    monkeypatch.setattr(snapshot_tasks.build_snapshot_task, "delay", months.append)
+    snapshots._queued.clear()
+    return months
+
+
+@pytest.fixture
+def employee(transactional_db):
+    employee = Employee.objects.create(employee_id="1001", full_name="Test Employee")
+    write_logs([LogRecord("1001", IN_AT, "IN"), LogRecord("1001", IN_AT + timedelta(hours=8), "OUT")], "test")
+    return employee
+
+
+def test_reports_use_the_rollup_until_the_worker_builds_the_month(employee, scheduled):
+    assert snapshots.employee_totals(START, END) is None
+    assert scheduled == ["2024-05-01"]
+    assert rollup.employee_totals(START, END)[employee.log_key]["worked_seconds"] == 8 * 3600
+    assert not snapshots._path(MAY).exists()
+
+    snapshot_tasks.build_snapshot_task(*scheduled)
+    assert snapshots.employee_totals(START, END)[employee.log_key]["worked_seconds"] == 8 * 3600
+
+
+def test_edits_and_employee_deletes_invalidate_the_month(employee, scheduled, admin_client):
+    snapshots.build_month(MAY)
+    out = AttendanceLog.objects.get(log_type="OUT")
+    out.check_time += timedelta(hours=1)
+    out.save()
+    assert snapshots.load(MAY) is None
+    assert snapshots.build_month(MAY).rows == 2
+
+    response = admin_client.post(f"/admin/attendance/attendancelog/{out.pk}/delete/", {"post": "yes"})
+    assert response.status_code == 302
+    assert snapshots.load(MAY) is None
+
+    snapshots.build_month(MAY)
+    employee.delete()
+    assert snapshots.load(MAY) is None
+    assert snapshots.build_month(MAY).rows == 0
+
+
+def test_a_build_that_started_before_an_invalidation_is_ignored(employee, scheduled, monkeypatch):
+    hot_columns = snapshots._hot_columns
+
+    def edited_meanwhile(*args, **kwargs):
+        columns = hot_columns(*args, **kwargs)
+        snapshots.invalidate([MAY])
+        return columns
+
+    monkeypatch.setattr(snapshots, "_hot_columns", edited_meanwhile)
+    assert snapshots.build_month(MAY) is None
+    assert snapshots.load(MAY) is None
@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from apps.attendance.models import AttendanceLog, SyncState
+from apps.attendance.services.spool import Spool
+from apps.attendance.tasks.sync import drain_spool, get_last_sync_time, set_last_sync_time
+from apps.employees.models import Employee
+from apps.integrations.fingertec.adapters import LogRecord
+
+T0 = datetime(2024, 5, 1, 8, 0, tzinfo=timezone.utc)
+
+
+def _records(n, start=T0):
+    return [LogRecord("1001", start + timedelta(minutes=i), "IN" if i % 2 == 0 else "OUT") for i in range(n)]
+
+
+def test_pending_chunks_survive_reopen_until_acked(tmp_path):
+    spool = Spool(tmp_path)
+    assert spool.append(_records(5)) == 5
+    assert spool.append(iter(())) == 0
+
+    segment, offset, chunk = next(Spool(tmp_path).pending(3))
+    assert [r.timestamp for r in chunk] == [T0 + timedelta(minutes=i) for i in range(3)]
+    spool.ack(segment, offset)
+
+    rest = list(Spool(tmp_path).pending(3))
+    assert [len(records) for _, _, records in rest] == [2]
+    spool.ack(*rest[0][:2])
+    assert list(Spool(tmp_path).pending(3)) == []
+
+
+@pytest.mark.django_db
+def test_sync_cursor_never_moves_backwards():
+    set_last_sync_time(T0)
+    set_last_sync_time(T0 - timedelta(days=1))
+    assert get_last_sync_time() == T0
+    set_last_sync_time(T0 + timedelta(hours=1))
+    assert get_last_sync_time() == T0 + timedelta(hours=1)
+    assert SyncState.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_drain_spool_writes_and_acknowledges(tmp_path, settings):
+    settings.ATTENDANCE_INGEST_BATCH_SIZE = 2
+    Employee.objects.create(employee_id="1001", full_name="Test Employee")
+    spool = Spool(tmp_path)
+    spool.append(_records(3))
+
+    assert drain_spool(spool) == 3
+    assert AttendanceLog.objects.count() == 3
+    assert get_last_sync_time() == T0 + timedelta(minutes=2)
+    # Draining again re-delivers nothing.
+    assert drain_spool(spool) == 0
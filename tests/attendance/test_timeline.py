@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from django.contrib.auth.models import Group, User
+
+from apps.attendance.services.ingest import write_logs
+from apps.core.auth import ROLE_AUDITOR, ROLE_DEPT_MANAGER
+from apps.employees.models import Employee
+from apps.integrations.fingertec.adapters import LogRecord
+
+T0 = datetime(2024, 5, 1, 8, 0, tzinfo=timezone.utc)
+URL = "/api/attendance-logs/timeline/"
+RANGE = {"start": "2024-05-01T00:00:00Z", "end": "2024-05-01T16:00:00Z"}
+
+
+@pytest.fixture
+def logs(db):
+    for code in ("1001", "1002", "1003"):
+        Employee.objects.create(employee_id=code, full_name=f"Employee {code}")
+    write_logs(
+        [
+            LogRecord("1001", T0 + timedelta(hours=8), "OUT"),
+            LogRecord("1001", T0, "IN"),
+            LogRecord("1002", T0 + timedelta(minutes=5), "IN"),
+            LogRecord("1002", T0 + timedelta(days=1), "IN"),
+        ],
+        "test",
+    )
+
+
+def _post(client, body):
+    return client.post(URL, body, content_type="application/json")
+
+
+def test_timeline_groups_punches_per_employee_in_request_order(admin_client, logs):
+    body = _post(admin_client, {"employee_ids": ["1002", "9999", "1001", "1003", "1002"], **RANGE}).json()
+    assert [r["employee_employee_id"] for r in body["results"]] == ["1002", "1001", "1003"]
+    assert body["unknown"] == ["9999"]
+    logs_of = {r["employee_employee_id"]: [log["log_type"] for log in r["logs"]] for r in body["results"]}
+    assert logs_of == {"1002": ["IN"], "1001": ["IN", "OUT"], "1003": []}
+    assert set(body["results"][0]["logs"][0]) == {"id", "check_time", "work_date", "log_type", "source", "created_at"}
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"employee_ids": [], **RANGE},
+        {"employee_ids": "1001", **RANGE},
+        {"employee_ids": ["1001"], "start": RANGE["start"]},
+        {"employee_ids": ["1001"], "start": RANGE["end"], "end": RANGE["start"]},
+    ],
+)
+def test_invalid_bodies_are_rejected(admin_client, logs, body):
+    assert _post(admin_client, body).status_code == 400
+
+
+def test_too_many_employees_are_rejected(admin_client, logs, settings):
+    settings.ATTENDANCE_TIMELINE_MAX_EMPLOYEES = 2
+    assert _post(admin_client, {"employee_ids": ["1001", "1002", "1003"], **RANGE}).status_code == 400
+
+
+def test_timeline_needs_read_access_not_write_access(client, logs):
+    user = User.objects.create_user("manager", password="x")
+    user.groups.add(Group.objects.get_or_create(name=ROLE_DEPT_MANAGER)[0])
+    client.force_login(user)
+    assert _post(client, {"employee_ids": ["1001"], **RANGE}).status_code == 403
+
+    user.groups.add(Group.objects.get_or_create(name=ROLE_AUDITOR)[0])
+    assert _post(client, {"employee_ids": ["1001"], **RANGE}).status_code == 200
@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from apps.attendance.models import AttendanceLog
+from apps.attendance.services.usb_import import import_export_file
+from apps.attendance.tasks import usb_import as usb_tasks
+from apps.employees.models import Employee
+
+EXPORT = (
+    b"1001\t2024-05-01 08:00:00\t0\t1\t0\t0\n"
+    b"1001\t2024-05-01\t1\t1\t0\t0\n"
+    b"9999\t2024-05-01 08:05:00\t0\t1\t0\t0\n"
+    b"1001\t2024-05-01 16:00:00\t1\t1\t0\t0\n"
+)
+
+
+@pytest.fixture
+def employee(db):
+    return Employee.objects.create(employee_id="1001", full_name="Test Employee")
+
+
+def test_import_skips_dateless_lines_and_is_idempotent(employee, tmp_path):
+    path = tmp_path / "1_attlog.dat"
+    path.write_bytes(EXPORT)
+
+    first = import_export_file(path)
+    assert (first.received, first.inserted_count, first.unknown_employees) == (3, 2, 1)
+    assert set(AttendanceLog.objects.values_list("source__name", flat=True)) == {"usb:1_attlog.dat"}
+
+    again = import_export_file(path)
+    assert (again.inserted_count, again.duplicates) == (0, 2)
+    assert AttendanceLog.objects.count() == 2
+
+
+def test_admin_upload_is_handed_to_the_import_task(employee, client, monkeypatch):
+    queued = []
+    monkeypatch.setattr(usb_tasks.import_usb_file_task, "delay", lambda *args: queued.append(args))
+    client.force_login(get_user_model().objects.create_superuser("admin", "a@example.com", "pw"))
+
+    response = client.post(
+        "/admin/attendance/attendancelog/import-usb/",
+        {"export_file": SimpleUploadedFile("1_attlog.dat", EXPORT)},
+    )
+    assert response.status_code == 302
+    assert not AttendanceLog.objects.exists()
+    [(path, source)] = queued
+    assert source == "usb:1_attlog.dat"
+
+    usb_tasks.import_usb_file_task(path, source)
+    assert AttendanceLog.objects.count() == 2
+    assert not Path(path).exists()
@@ -0,0 +1,40 @@
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from apps.attendance.models import AttendanceLog
+from apps.attendance.services import workdays
+from apps.attendance.services.ingest import write_logs
+from apps.employees.models import Employee
+from apps.integrations.fingertec.adapters import LogRecord
+
+TZ = ZoneInfo("Asia/Baghdad")
+
+
+def test_punches_before_the_cutover_belong_to_the_previous_day(db, settings):
+    settings.ATTENDANCE_WORKDAY_CUTOVER = "04:00"
+    employee = Employee.objects.create(employee_id="1001", full_name="Test Employee")
+    write_logs(
+        [
+            LogRecord("1001", datetime(2024, 5, 2, 3, 59, tzinfo=TZ), "IN"),
+            LogRecord("1001", datetime(2024, 5, 2, 4, 0, tzinfo=TZ), "IN"),
+        ],
+        "test",
+    )
+    assert list(AttendanceLog.objects.order_by("check_time").values_list("work_date", flat=True)) == [
+        date(2024, 5, 1),
+        date(2024, 5, 2),
+    ]
+
+    log = AttendanceLog(employee=employee, check_time=datetime(2024, 5, 3, 1, 0, tzinfo=TZ), log_type="OUT")
+    log.save()
+    assert log.work_date == date(2024, 5, 2)
+
+
+@pytest.mark.parametrize("value", ["25:00", "noon"])
+def test_invalid_cutover_is_rejected(settings, value):
+    settings.ATTENDANCE_WORKDAY_CUTOVER = value
+    with pytest.raises(ImproperlyConfigured):
+        workdays.cutover()
@@ -0,0 +1,11 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _isolated_storage(settings, tmp_path):
+    """Keep spool, archive and snapshot files in a per-test directory, and Redis off."""
+    settings.ATTENDANCE_SPOOL_DIR = str(tmp_path / "spool")
+    settings.ATTENDANCE_ARCHIVE_DIR = str(tmp_path / "archive")
+    settings.ATTENDANCE_SNAPSHOT_DIR = str(tmp_path / "snapshots")
+    settings.ATTENDANCE_IMPORT_DIR = str(tmp_path / "imports")
+    settings.REDIS_URL = None
@@ -0,0 +1,55 @@
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from apps.attendance.services.ingest import write_logs
+from apps.core import fastjson
+from apps.employees.models import Department, Employee
+from apps.integrations.fingertec.adapters import LogRecord
+
+T0 = datetime(2024, 5, 1, 8, 0, 0, 123456, tzinfo=timezone.utc)
+
+
+def test_dumps_writes_what_the_json_renderer_writes():
+    data = {
+        "when": T0,
+        "day": date(2024, 5, 1),
+        "id": uuid.UUID(int=7),
+        "amount": Decimal("1.50"),
+        "text": "علي line",
+        "nested": [None, True, 1.5, {"k": "v"}],
+    }
+    assert fastjson.dumps(data) == JSONRenderer().render(data)
+
+
+@pytest.fixture
+def staff(db):
+    department = Department.objects.create(name="المبيعات")
+    Employee.objects.create(employee_id="1001", full_name="أحمد علي", department=department)
+    Employee.objects.create(employee_id="1002", full_name="Ali")
+    write_logs(
+        [LogRecord(code, T0 + timedelta(hours=h), kind) for code in ("1001", "1002") for h, kind in ((0, "IN"), (8, "OUT"))],
+        "iclock:SN-1",
+    )
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/api/attendance-logs/?page_size=3",
+        "/api/attendance-logs/changes/?cursor=0",
+        "/api/reports/monthly?start=2024-05-01T00:00:00Z&end=2024-05-31T23:59:59Z",
+        "/api/reports/work-hours?start=2024-05-01T00:00:00Z&end=2024-05-31T23:59:59Z",
+    ],
+)
+def test_fast_bodies_are_byte_identical_to_drf(admin_client, staff, settings, url):
+    settings.FAST_JSON_RESPONSES = True
+    fast = admin_client.get(url)
+    settings.FAST_JSON_RESPONSES = False
+    slow = admin_client.get(url)
+    assert fast.status_code == slow.status_code == 200
+    assert fast["Content-Type"] == slow["Content-Type"]
+    assert fast.content == slow.content
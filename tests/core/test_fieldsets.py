@@ -0,0 +1,39 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from apps.attendance.services.ingest import write_logs
+from apps.employees.models import Department, Employee
+from apps.integrations.fingertec.adapters import LogRecord
+
+T0 = datetime(2024, 5, 1, 8, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def staff(db):
+    department = Department.objects.create(name="Sales")
+    employee = Employee.objects.create(employee_id="1001", full_name="Test Employee", department=department)
+    write_logs([LogRecord("1001", T0, "IN")], "test")
+    return employee
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_fields_limits_log_rows_in_serializer_order(admin_client, staff, settings, fast):
+    settings.FAST_JSON_RESPONSES = fast
+    body = admin_client.get("/api/attendance-logs/", {"fields": "log_type,employee_employee_id,id"}).json()
+    (row,) = body["results"]
+    assert list(row) == ["id", "employee_employee_id", "log_type"]
+    assert (row["employee_employee_id"], row["log_type"]) == ("1001", "IN")
+
+
+def test_fields_on_employee_list_and_detail(admin_client, staff):
+    assert admin_client.get("/api/employees/", {"fields": "employee_id"}).json() == [{"employee_id": "1001"}]
+    detail = admin_client.get(f"/api/employees/{staff.id}/", {"fields": "full_name,id"}).json()
+    assert detail == {"id": str(staff.id), "full_name": "Test Employee"}
+
+
+@pytest.mark.parametrize("fields", ["nope", "id,nope", ","])
+def test_unknown_fields_are_rejected(admin_client, staff, fields):
+    response = admin_client.get("/api/attendance-logs/", {"fields": fields})
+    assert response.status_code == 400
+    assert "available:" in response.json()["fields"]
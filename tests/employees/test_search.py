@@ -0,0 +1,59 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from apps.attendance.services.ingest import write_logs
+from apps.core.text import normalize
+from apps.employees.models import Department, Employee
+from apps.integrations.fingertec.adapters import LogRecord
+
+
+def test_normalize_folds_arabic_variants_and_case():
+    assert normalize("  أَحْمَـد  ") == normalize("احمد") == "احمد"
+    assert normalize("فاطمة") == normalize("فاطمه")
+    assert normalize("مصطفى") == normalize("مصطفي")
+    assert normalize("ＡＬＩ Hassan") == "ali hassan"
+
+
+@pytest.fixture
+def staff(db):
+    sales = Department.objects.create(name="المبيعات")
+    Employee.objects.create(employee_id="1001", full_name="أحمد علي", department=sales)
+    Employee.objects.create(employee_id="1002", full_name="فاطمة حسن")
+    Employee.objects.create(employee_id="1003", full_name="Ahmad Karim", job_title="Driver")
+    return sales
+
+
+def _names(client, search):
+    # The employee list is not paginated.
+    return [row["full_name"] for row in client.get("/api/employees/", {"search": search}).json()]
+
+
+def test_employee_search_matches_spelling_variants(admin_client, staff):
+    assert _names(admin_client, "احمد") == ["أحمد علي"]
+    assert _names(admin_client, "فاطمه") == ["فاطمة حسن"]
+    assert _names(admin_client, "DRIVER") == ["Ahmad Karim"]
+    # Every term must match; the department name is searchable too.
+    assert _names(admin_client, "احمد مبيعات") == ["أحمد علي"]
+    assert _names(admin_client, "احمد driver") == []
+
+
+def test_department_rename_refreshes_member_search_text(admin_client, staff):
+    staff.name = "الموارد"
+    staff.save()
+    assert _names(admin_client, "الموارد") == ["أحمد علي"]
+    assert _names(admin_client, "المبيعات") == []
+
+
+def test_log_search_goes_through_the_employee_column(admin_client, staff):
+    write_logs(
+        [
+            LogRecord("1001", datetime(2024, 5, 1, 8, tzinfo=timezone.utc), "IN"),
+            LogRecord("1002", datetime(2024, 5, 1, 9, tzinfo=timezone.utc), "IN"),
+        ],
+        "iclock:SN-1",
+    )
+    body = admin_client.get("/api/attendance-logs/", {"search": "إحمد"}).json()
+    assert [row["employee_employee_id"] for row in body["results"]] == ["1001"]
+    body = admin_client.get("/api/attendance-logs/", {"search": "sn-1"}).json()
+    assert len(body["results"]) == 2
@@ -0,0 +1,41 @@
+import pytest
+
+from apps.employees import suggest
+from apps.employees.models import Department, Employee
+
+
+@pytest.fixture
+def staff(db):
+    sales = Department.objects.create(name="Sales")
+    Employee.objects.create(employee_id="1001", full_name="أحمد علي", department=sales)
+    Employee.objects.create(employee_id="1002", full_name="علي حسن", is_active=False)
+    Employee.objects.create(employee_id="2001", full_name="Ahmad Karim")
+    suggest._state["index"] = None
+
+
+def _ids(client, q, **params):
+    body = client.get("/api/employees/suggest/", {"q": q, **params}).json()
+    return [row["employee_id"] for row in body["results"]]
+
+
+def test_suggest_ranks_id_then_name_then_later_words(admin_client, staff):
+    assert _ids(admin_client, "1001") == ["1001"]
+    assert _ids(admin_client, "10") == ["1001", "1002"]
+    # "علي" starts one name and is the second word of another.
+    assert _ids(admin_client, "علي") == ["1002", "1001"]
+    assert _ids(admin_client, "علي احمد") == ["1001"]
+    assert _ids(admin_client, "a", limit=1) == ["2001"]
+
+
+def test_edits_rebuild_the_index_after_commit(admin_client, staff, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        Employee.objects.create(employee_id="3001", full_name="Zaid")
+    assert _ids(admin_client, "zai") == ["3001"]
+
+
+def test_check_warns_about_a_per_process_cache(settings):
+    settings.DEBUG = False
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    assert [w.id for w in suggest.check_shared_cache()] == ["employees.W001"]
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://x"}}
+    assert suggest.check_shared_cache() == []
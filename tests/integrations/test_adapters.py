@@ -0,0 +1,50 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from apps.integrations.fingertec.adapters import TYPE_MEMO_LIMIT, DBAdapter, LogRecord
+
+
+def _adapter(**kwargs):
+    return DBAdapter(db_url="sqlite://", query=None, in_values={"IN", "I", "0"}, out_values={"OUT", "O", "1"}, **kwargs)
+
+
+def test_log_record_has_no_instance_dict():
+    record = LogRecord("1001", datetime(2024, 5, 1, 8), "IN")
+    assert not hasattr(record, "__dict__")
+    with pytest.raises(AttributeError):
+        record.extra = 1
+
+
+def test_map_type_normalizes_and_memoizes_known_codes_only():
+    adapter = _adapter()
+    assert adapter._map_type(1) == "OUT"
+    assert adapter._map_type(" out ") == "OUT"
+    assert adapter._map_type("x") == "IN"
+    assert 1 in adapter._type_map and " out " in adapter._type_map
+    assert "x" not in adapter._type_map
+
+
+def test_map_type_memo_is_bounded():
+    adapter = _adapter()
+    for i in range(TYPE_MEMO_LIMIT * 2):
+        assert adapter._map_type(" " * i + "o") == "OUT"
+        adapter._map_type(f"garbage-{i}")
+    assert len(adapter._type_map) <= TYPE_MEMO_LIMIT
+
+
+def test_fetch_logs_since_streams_records_from_table_metadata():
+    adapter = _adapter(table="att_logs", col_emp="emp_id", col_time="scan_time", col_type="direction")
+    adapter._engine = create_engine("sqlite://")
+    with adapter._engine.begin() as conn:
+        conn.execute(text("CREATE TABLE att_logs (emp_id INTEGER, scan_time TEXT, direction TEXT)"))
+        conn.execute(text(
+            "INSERT INTO att_logs VALUES (7, '2024-05-01 08:00:00', 'I'), (7, '2024-05-01 16:00:00', 1),"
+            " (8, 'garbage', 'O'), (7, '2024-04-30 09:00:00', 'O')"
+        ))
+    records = list(adapter.fetch_logs_since(datetime(2024, 5, 1)))
+    assert records == [
+        LogRecord("7", datetime(2024, 5, 1, 8), "IN"),
+        LogRecord("7", datetime(2024, 5, 1, 16), "OUT"),
+    ]
@@ -0,0 +1,76 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from apps.attendance.models import AttendanceCube, AttendanceLog
+from apps.attendance.services.ingest import write_logs
+from apps.employees.models import Department, Employee
+from apps.integrations.fingertec.adapters import LogRecord
+
+TZ = ZoneInfo("Asia/Baghdad")
+URL = "/api/reports/cube"
+
+
+@pytest.fixture
+def departments(db):
+    sales, hr = Department.objects.create(name="Sales"), Department.objects.create(name="HR")
+    Employee.objects.create(employee_id="1001", full_name="A", department=sales)
+    Employee.objects.create(employee_id="1002", full_name="B", department=sales)
+    Employee.objects.create(employee_id="2001", full_name="C", department=hr)
+    write_logs(
+        [
+            LogRecord("1001", datetime(2024, 5, 1, 8, 5, tzinfo=TZ), "IN"),
+            LogRecord("1002", datetime(2024, 5, 1, 8, 50, tzinfo=TZ), "IN"),
+            LogRecord("1001", datetime(2024, 5, 1, 16, 0, tzinfo=TZ), "OUT"),
+            LogRecord("2001", datetime(2024, 5, 2, 9, 0, tzinfo=TZ), "IN"),
+        ],
+        "test",
+    )
+    return sales, hr
+
+
+def test_cells_count_punches_per_department_day_hour_and_direction(departments):
+    sales, _ = departments
+    cell = AttendanceCube.objects.get(department=sales, hour=8)
+    assert (cell.work_date.isoformat(), cell.log_type, cell.punch_count) == ("2024-05-01", "IN", 2)
+
+    # A later batch adds to the existing cell.
+    write_logs([LogRecord("1001", datetime(2024, 5, 1, 8, 30, tzinfo=TZ), "IN")], "test")
+    cell.refresh_from_db()
+    assert cell.punch_count == 3
+
+
+def test_cube_report_groups_and_filters(admin_client, departments):
+    sales, hr = departments
+    body = admin_client.get(URL, {"start": "2024-05-01", "end": "2024-05-31", "group_by": "department,direction"}).json()
+    assert [(r["department_name"], r["direction"], r["punches"]) for r in body["results"]] == [
+        ("HR", "IN", 1),
+        ("Sales", "IN", 2),
+        ("Sales", "OUT", 1),
+    ]
+
+    body = admin_client.get(URL, {"start": "2024-05-01", "end": "2024-05-01", "hour_from": 9}).json()
+    assert body["results"] == [{"punches": 1}]
+    body = admin_client.get(URL, {"start": "2024-05-01", "end": "2024-05-31", "group_by": "day", "direction": "IN"}).json()
+    assert [(r["day"], r["punches"]) for r in body["results"]] == [("2024-05-01", 2), ("2024-05-02", 1)]
+
+    assert admin_client.get(URL, {"start": "2024-05-01", "end": "2024-05-31", "group_by": "day,day"}).status_code == 400
+    assert admin_client.get(URL, {"start": "2024-05-01", "end": "2024-05-31", "group_by": "shoe"}).status_code == 400
+    assert admin_client.get(URL, {"start": "2024-05-31", "end": "2024-05-01"}).status_code == 400
+
+
+def test_night_shift_out_counts_on_its_own_day(departments):
+    # The stored work_date attributes the OUT to the IN's day; the cube does not.
+    write_logs(
+        [
+            LogRecord("2001", datetime(2024, 5, 2, 22, 0, tzinfo=TZ), "IN"),
+            LogRecord("2001", datetime(2024, 5, 3, 6, 0, tzinfo=TZ), "OUT"),
+        ],
+        "test",
+    )
+    _, hr = departments
+    stored = AttendanceLog.objects.filter(employee=hr.employees.get(), log_type="OUT").values_list("work_date", flat=True)
+    assert [day.isoformat() for day in stored] == ["2024-05-02"]
+    cell = AttendanceCube.objects.get(department=hr, log_type="OUT")
+    assert (cell.work_date.isoformat(), cell.hour, cell.punch_count) == ("2024-05-03", 6, 1)
@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from apps.attendance.services.ingest import write_logs
+from apps.employees.models import Department, Employee
+from apps.integrations.fingertec.adapters import LogRecord
+
+T0 = datetime(2024, 5, 1, 8, 0, tzinfo=timezone.utc)
+NAMES = ["zeina", "Ali", "علي", "Bassam", "ahmad", "باسم"]
+RANGE = {"start": "2024-05-01T00:00:00Z", "end": "2024-05-31T23:59:59Z"}
+
+
+@pytest.fixture
+def staff(db):
+    departments = [Department.objects.create(name=name) for name in ("Sales", "hr", "الإدارة")]
+    for i, name in enumerate(NAMES):
+        Employee.objects.create(employee_id=str(1000 + i), full_name=name, department=departments[i % 3])
+    Employee.objects.create(employee_id="2000", full_name="No Department")
+    write_logs(
+        [LogRecord(str(1000 + i), T0 + timedelta(minutes=i), "IN") for i in range(len(NAMES))]
+        + [LogRecord("2000", T0, "IN")],
+        "test",
+    )
+
+
+def test_monthly_report_uses_database_name_order(admin_client, staff):
+    body = admin_client.get("/api/reports/monthly", RANGE).json()
+    expected = list(Employee.objects.order_by("full_name").values_list("full_name", flat=True))
+    assert [row["full_name"] for row in body["results"]] == expected
+
+
+def test_department_summary_uses_database_name_order(admin_client, staff):
+    body = admin_client.get("/api/reports/monthly-by-department", RANGE).json()
+    expected = list(Department.objects.order_by("name").values_list("name", flat=True)) + [None]
+    assert [row["department_name"] for row in body["results"]] == expected